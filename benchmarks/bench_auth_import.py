@@ -0,0 +1,62 @@
+"""Import cost of the sign-in path: native PKCE flow vs ``google_auth_oauthlib``.
+
+Run from the repository root::
+
+    python benchmarks/bench_auth_import.py [ROUNDS]
+
+Each measurement imports the modules in a fresh interpreter (default 5
+rounds, best of).  The library row is skipped when it is not installed.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETS = {
+    "native": ["http.server", "urllib.request", "webbrowser", "secrets", "hashlib"],
+    "library": ["google_auth_oauthlib.flow", "google.auth.transport.requests"],
+}
+
+_SNIPPET = """
+import sys, time
+t = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(time.perf_counter() - t, len(sys.modules))
+"""
+
+
+def measure(modules: list, rounds: int):
+    best, loaded = None, 0
+    for _ in range(rounds):
+        out = subprocess.run(
+            [sys.executable, "-c", _SNIPPET.format(modules=modules)],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+        )
+        if out.returncode:
+            return None
+        seconds, loaded = out.stdout.split()
+        best = float(seconds) if best is None else min(best, float(seconds))
+    return best, int(loaded)
+
+
+def main(argv: list) -> None:
+    rounds = int(argv[0]) if argv else 5
+    print(f"{'flow':>8} {'import ms':>10} {'modules':>8}")
+    for name, modules in SETS.items():
+        result = measure(modules, rounds)
+        if result is None:
+            print(f"{name:>8} {'(not installed)':>19}")
+            continue
+        seconds, loaded = result
+        print(f"{name:>8} {seconds * 1000:10.1f} {loaded:8d}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
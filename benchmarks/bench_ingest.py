@@ -0,0 +1,76 @@
+"""Compare the legacy ``resp.json()`` + ad-hoc coercion path with ``ingest``.
+
+Run from the repository root::
+
+    python benchmarks/bench_ingest.py [N ...]
+
+Defaults to 10k and 100k generated records.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from worklog.services import ingest  # noqa: E402
+
+
+def make_payload(n: int) -> bytes:
+    logs = [
+        {
+            "id": i,
+            # Mostly UTC, with some offset times that need normalising.
+            "record_time": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T{i % 24:02d}:15:00"
+            + ("+08:00" if i % 10 == 0 else "Z"),
+            "content": f"Worked on ticket #{i} — reviewed, tested and deployed ✓",
+            "tag_id": i % 7 or None,
+        }
+        for i in range(n)
+    ]
+    return json.dumps(logs, ensure_ascii=False).encode("utf-8")
+
+
+def legacy(body: bytes) -> list:
+    """What consumers did before: stdlib decode, then coerce fields on use."""
+    out = []
+    for rec in json.loads(body):
+        out.append((str(rec.get("id")), str(rec.get("record_time") or ""), str(rec.get("content", ""))))
+    return out
+
+
+def streamed(body: bytes) -> list:
+    chunks = (body[i:i + 64 * 1024] for i in range(0, len(body), 64 * 1024))
+    return ingest.ingest(ingest.iter_json_array(chunks))
+
+
+def measure(fn, body: bytes, repeat: int = 3) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv: list[str]) -> None:
+    sizes = [int(a) for a in argv] or [10_000, 100_000]
+    print(f"JSON backend: {ingest.JSON_BACKEND}")
+    print(f"{'records':>9} {'path':<10} {'best ms':>9} {'peak MiB':>9}")
+    for n in sizes:
+        body = make_payload(n)
+        for name, fn in (("legacy", legacy), ("ingest", ingest.parse_worklogs), ("streamed", streamed)):
+            secs, peak = measure(fn, body)
+            print(f"{n:>9} {name:<10} {secs * 1000:>9.1f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,237 @@
+"""Headless render benchmark for ``MainWindow`` and ``DayCard``.
+
+Builds the main window over a synthetic log cache (stub user store, no
+network), then measures:
+
+* time to first frame — constructing the window until the first frame with
+  the month grid has been painted;
+* month-switch latency — ``_shift_month`` until the next frame is painted;
+* widget counts — widgets in the month grid per visible log.
+
+Run from the repository root on any GTK 4 display.  Without one, the script
+starts ``gtk4-broadwayd`` (GTK's HTML5 backend, no browser needs to be
+attached) and renders there; ``xvfb-run`` works too::
+
+    python benchmarks/bench_render.py [--logs-per-month N] [--months M]
+    python benchmarks/bench_render.py --save-baseline benchmarks/render_baseline.json
+    python benchmarks/bench_render.py --baseline benchmarks/render_baseline.json
+
+The exit status is 1 when a measurement exceeds its absolute limit or, with
+``--baseline``, regresses by more than ``--tolerance`` against the saved run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Absolute limits; generous so they only trip on real regressions.
+MAX_FIRST_FRAME_MS = 2000.0
+MAX_SWITCH_MS = 500.0
+MAX_WIDGETS_PER_LOG = 10.0
+DEFAULT_TOLERANCE = 0.25
+_FRAME_TIMEOUT = 10.0
+
+
+@dataclass
+class RenderResult:
+    logs: int
+    first_frame_ms: float
+    switch_ms: float  # median over the switches
+    widgets: int
+    widgets_per_log: float
+
+
+class StubUserStore:
+    """Signed out as far as the window is concerned: ``refresh`` never fetches."""
+
+    token = None
+
+    def sign_out(self) -> None:
+        pass
+
+
+def make_logs(logs_per_month: int, months: int, *, newest: _dt.date) -> List[dict]:
+    logs = []
+    for m in range(months):
+        year, month = newest.year, newest.month - m
+        while month < 1:
+            month += 12
+            year -= 1
+        for i in range(logs_per_month):
+            day = i % 28 + 1
+            logs.append({
+                "id": f"{year}{month:02d}-{i}",
+                "record_time": f"{year}-{month:02d}-{day:02d}T{i % 10 + 8:02d}:{i % 4 * 15:02d}:00Z",
+                "content": f"**Ticket #{i}** — reviewed `patch {i}`, tested and deployed ✓",
+                "tag_id": str(i % 5) if i % 3 else None,
+            })
+    return logs
+
+
+def ensure_display() -> Optional[subprocess.Popen]:
+    """Start a Broadway server when no display is set; return it to stop later."""
+    if os.environ.get("WAYLAND_DISPLAY") or os.environ.get("DISPLAY") or os.environ.get("GDK_BACKEND"):
+        return None
+    daemon = shutil.which("gtk4-broadwayd") or shutil.which("broadwayd")
+    if daemon is None:
+        return None
+    display = ":" + str(40 + os.getpid() % 50)
+    proc = subprocess.Popen([daemon, display], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    os.environ["GDK_BACKEND"] = "broadway"
+    os.environ["BROADWAY_DISPLAY"] = display
+    return proc
+
+
+def count_widgets(widget: Any) -> int:
+    total = 1
+    child = widget.get_first_child()
+    while child is not None:
+        total += count_widgets(child)
+        child = child.get_next_sibling()
+    return total
+
+
+def _watch_paint(win: Any) -> List[float]:
+    """Record the time of every frame painted for ``win`` (from realization on)."""
+    painted: List[float] = []
+
+    def on_realize(*_args: Any) -> None:
+        win.get_frame_clock().connect("after-paint", lambda *_: painted.append(time.perf_counter()))
+
+    if win.get_realized():
+        on_realize()
+    else:
+        win.connect("realize", on_realize)
+    return painted
+
+
+def _wait_for_paint(painted: List[float], started: float) -> float:
+    """Iterate the main loop until a frame is painted; return ms since ``started``."""
+    from gi.repository import GLib
+
+    context = GLib.MainContext.default()
+    deadline = started + _FRAME_TIMEOUT
+    while not painted and time.perf_counter() < deadline:
+        if not context.iteration(False):
+            time.sleep(0.001)
+    if not painted:
+        raise RuntimeError("no frame was painted; is a display available?")
+    return (painted[0] - started) * 1000
+
+
+def run(logs_per_month: int = 60, months: int = 6, switches: int = 5) -> RenderResult:
+    import gi
+
+    gi.require_version("Gtk", "4.0")
+    from gi.repository import GLib
+
+    from worklog.services.sync_engine import SyncEngine
+    from worklog.stores.log_cache import LogCache
+    from worklog.stores.log_store import LogStore
+    from worklog.ui.main_window import MainWindow
+
+    newest = _dt.date.today().replace(day=1)
+    logs = make_logs(logs_per_month, months, newest=newest)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LogCache(Path(tmp) / "cache.sqlite3")
+        cache.replace_all(logs)
+        store = LogStore(cache)
+        store.replace([dict(rec) for rec in logs])
+        engine = SyncEngine(cache, lambda: None)
+
+        # Construction, grid building and markdown rendering all count
+        # towards the first frame.
+        started = time.perf_counter()
+        win = MainWindow(StubUserStore(), sync_engine=engine, log_store=store)
+        painted = _watch_paint(win)
+        win.present()
+        first = _wait_for_paint(painted, started)
+        visible = len(store.month(win._current_month))
+        widgets = count_widgets(win._flow)
+
+        timings = []
+        for i in range(switches):
+            painted.clear()
+            started = time.perf_counter()
+            win._shift_month(-1 if i % 2 == 0 else 1)
+            win.queue_draw()
+            timings.append(_wait_for_paint(painted, started))
+
+        win.destroy()
+        while GLib.MainContext.default().iteration(False):
+            pass
+        cache.close()
+
+    return RenderResult(
+        logs=visible,
+        first_frame_ms=first,
+        switch_ms=statistics.median(timings) if timings else 0.0,
+        widgets=widgets,
+        widgets_per_log=widgets / max(visible, 1),
+    )
+
+
+def check(result: RenderResult, baseline: Optional[dict] = None, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Return a message for every limit ``result`` exceeds."""
+    failures = []
+    for name, limit in (
+        ("first_frame_ms", MAX_FIRST_FRAME_MS),
+        ("switch_ms", MAX_SWITCH_MS),
+        ("widgets_per_log", MAX_WIDGETS_PER_LOG),
+    ):
+        value = getattr(result, name)
+        if value > limit:
+            failures.append(f"{name} {value:.1f} > limit {limit:.1f}")
+        if baseline and name in baseline and value > baseline[name] * (1 + tolerance):
+            failures.append(f"{name} {value:.1f} regressed from {baseline[name]:.1f} (>{tolerance:.0%})")
+    return failures
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs-per-month", type=int, default=60)
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--switches", type=int, default=5)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    broadway = ensure_display()
+    try:
+        result = run(args.logs_per_month, args.months, args.switches)
+    finally:
+        if broadway is not None:
+            broadway.terminate()
+
+    print(f"logs shown        {result.logs}")
+    print(f"first frame       {result.first_frame_ms:8.1f} ms")
+    print(f"month switch      {result.switch_ms:8.1f} ms (median)")
+    print(f"grid widgets      {result.widgets} ({result.widgets_per_log:.1f} per log)")
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(asdict(result), indent=2) + "\n")
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    failures = check(result, baseline, args.tolerance)
+    for failure in failures:
+        print("REGRESSION:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,12 +1,24 @@
 #!/usr/bin/env python3
 """Entry point for the Worklog desktop application."""
 
-from worklog.app import WorklogApplication
+import sys
+
+from worklog.cli import COMMANDS
+
+# Resolved lazily in main() so CLI subcommands never import GTK.
+WorklogApplication = None
 
 
 def main() -> None:
-    app = WorklogApplication()
-    app.run()
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        from worklog.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    app_cls = WorklogApplication
+    if app_cls is None:
+        from worklog.app import WorklogApplication as app_cls
+    app = app_cls()
+    app.run(sys.argv)
 
 
 if __name__ == "__main__":
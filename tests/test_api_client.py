@@ -10,11 +10,21 @@ requests_stub = types.SimpleNamespace(HTTPError=Exception)
 requests_stub.get = lambda *a, **k: None
 sys.modules['requests'] = requests_stub
 
+import threading
+import time
+
 import pytest
 from worklog.services import api_client
 import requests  # this will be the stub
 
 
+@pytest.fixture(autouse=True)
+def _fresh_reads():
+    api_client.invalidate_reads()
+    yield
+    api_client.invalidate_reads()
+
+
 class DummyResp:
     def __init__(self, status_code: int, data=None):
         self.status_code = status_code
@@ -37,7 +47,7 @@ def test_get_worklogs_sends_auth(monkeypatch):
         captured['params'] = params
         return DummyResp(200, {'data': []})
 
-    monkeypatch.setattr(api_client.requests, 'get', fake_get)
+    monkeypatch.setattr(api_client, '_http', lambda: SimpleNamespace(get=fake_get))
 
     result = api_client.get_worklogs('tok123', page=2)
     assert result == {'data': []}
@@ -55,8 +65,168 @@ def test_get_worklogs_signs_out_on_401(monkeypatch):
     def fake_sign_out():
         called['yes'] = True
 
-    monkeypatch.setattr(api_client.requests, 'get', fake_get)
+    monkeypatch.setattr(api_client, '_http', lambda: SimpleNamespace(get=fake_get))
 
     with pytest.raises(requests.HTTPError):
         api_client.get_worklogs('bad', sign_out=fake_sign_out)
     assert called.get('yes')
+
+
+def test_create_worklog_posts_payload(monkeypatch):
+    captured = {}
+
+    def fake_post(url, headers=None, json=None, timeout=10):
+        captured['url'] = url
+        captured['json'] = json
+        return DummyResp(201, {'id': 'w1', **json})
+
+    monkeypatch.setattr(api_client, '_http', lambda: SimpleNamespace(post=fake_post))
+
+    result = api_client.create_worklog('tok', content='hi', record_time='2025-07-01T10:00:00Z')
+    assert captured['url'] == 'https://work-log.cc/api/worklogs/'
+    assert captured['json'] == {'content': 'hi', 'record_time': '2025-07-01T10:00:00Z'}
+    assert result['id'] == 'w1'
+
+
+def test_concurrent_identical_gets_share_one_request(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def fake_get(url, headers=None, params=None, timeout=10):
+        calls.append(params)
+        release.wait(5)
+        return DummyResp(200, {'data': [{'id': '1'}]})
+
+    monkeypatch.setattr(api_client, '_http', lambda: SimpleNamespace(get=fake_get))
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(api_client.get_worklogs('tok', page=1)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    while not calls:
+        time.sleep(0.01)
+    time.sleep(0.05)  # let the others join the in-flight request
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{'data': [{'id': '1'}]}] * 5
+    results[0]['data'][0]['id'] = 'changed'  # each caller owns its copy
+    assert api_client.get_worklogs('tok', page=1) == {'data': [{'id': '1'}]}
+    assert len(calls) == 1  # served from the short-lived memo
+
+    api_client.get_worklogs('tok', page=2)
+    assert len(calls) == 2
+
+
+def test_read_in_flight_during_a_write_is_not_remembered(monkeypatch):
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+    content = ['old']
+
+    def fake_get(url, headers=None, params=None, timeout=10):
+        calls.append(url)
+        data = {'data': [{'id': '1', 'content': content[0]}]}
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+        return DummyResp(200, data)
+
+    def fake_delete(url, headers=None, timeout=10):
+        content[0] = 'new'
+        return DummyResp(204)
+
+    monkeypatch.setattr(api_client, '_http', lambda: SimpleNamespace(get=fake_get, delete=fake_delete))
+    stale = []
+    reader = threading.Thread(target=lambda: stale.append(api_client.get_worklogs('tok')))
+    reader.start()
+    started.wait(5)
+    api_client.delete_worklog('tok', 'w2')
+    # A read issued after the write does not join the older one.
+    assert api_client.get_worklogs('tok')['data'][0]['content'] == 'new'
+    release.set()
+    reader.join()
+
+    assert stale[0]['data'][0]['content'] == 'old'
+    assert api_client.get_worklogs('tok')['data'][0]['content'] == 'new'
+    assert len(calls) == 2
+
+
+def test_expired_reads_are_pruned(monkeypatch):
+    monkeypatch.setattr(api_client, 'MEMO_TTL', 0.01)
+    monkeypatch.setattr(
+        api_client, '_http',
+        lambda: SimpleNamespace(get=lambda url, headers=None, params=None, timeout=10: DummyResp(200, {'data': []})),
+    )
+    api_client.get_worklogs('tok', page=1)
+    time.sleep(0.02)
+    api_client.get_worklogs('tok', page=2)
+    assert len(api_client._memo) == 1
+
+
+def test_writes_and_errors_are_not_remembered(monkeypatch):
+    statuses = [500, 200, 200]
+    calls = []
+
+    def fake_get(url, headers=None, params=None, timeout=10):
+        calls.append(url)
+        return DummyResp(statuses.pop(0), {'data': []})
+
+    def fake_delete(url, headers=None, timeout=10):
+        return DummyResp(204)
+
+    monkeypatch.setattr(api_client, '_http', lambda: SimpleNamespace(get=fake_get, delete=fake_delete))
+    with pytest.raises(requests.HTTPError):
+        api_client.get_worklogs('tok')
+    api_client.get_worklogs('tok')
+    api_client.delete_worklog('tok', 'w1')
+    api_client.get_worklogs('tok')
+    assert len(calls) == 3
+
+
+def test_throttled_request_is_retried_after_retry_after(monkeypatch):
+    from worklog.services.rate_limit import RateLimiter
+
+    slept = []
+    monkeypatch.setattr(api_client, '_limiter', RateLimiter(sleep=slept.append))
+    responses = [DummyResp(429), DummyResp(200, {'data': []})]
+    responses[0].headers = {'Retry-After': '2'}
+
+    def fake_get(url, headers=None, params=None, timeout=10):
+        return responses.pop(0)
+
+    monkeypatch.setattr(api_client, '_http', lambda: SimpleNamespace(get=fake_get))
+    assert api_client.get_worklogs('tok') == {'data': []}
+    assert len(slept) == 1 and 1.9 < slept[0] <= 2
+    metrics = api_client.limiter_metrics()
+    assert (metrics.requests, metrics.throttled) == (2, 1)
+
+
+def test_record_reads_are_conditional_on_the_etag(monkeypatch):
+    body = b'[{"id": 1, "record_time": "2025-07-01T10:00:00Z", "content": "x"}]'
+    sent = []
+
+    class Resp(DummyResp):
+        def __init__(self, status_code):
+            super().__init__(status_code)
+            self.headers = {'ETag': '"v1"', 'Content-Length': str(len(body))}
+            self.content = body
+
+        def close(self):
+            pass
+
+    def fake_get(url, headers=None, params=None, timeout=10, stream=False):
+        sent.append(headers.get('If-None-Match'))
+        return Resp(304 if headers.get('If-None-Match') == '"v1"' else 200)
+
+    monkeypatch.setattr(api_client, '_http', lambda: SimpleNamespace(get=fake_get))
+    records = api_client.get_worklog_records('tok', space_id='team')
+    assert records == [{'id': '1', 'record_time': '2025-07-01T10:00:00Z', 'content': 'x'}]
+    assert records.etag == '"v1"'
+    with pytest.raises(api_client.NotModified):
+        api_client.get_worklog_records('tok', space_id='team', if_none_match=records.etag)
+    assert sent == [None, '"v1"']
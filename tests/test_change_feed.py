@@ -0,0 +1,175 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Provide a minimal requests stub so the module imports without network deps
+sys.modules.setdefault('requests', types.SimpleNamespace(HTTPError=Exception))
+
+import pytest
+
+from worklog.services.change_feed import Backoff, ChangeFeed, SSEMessage, iter_sse, to_change
+
+
+class FeedServer:
+    """Local stand-in for the backend's event stream.
+
+    Each connection pops the next script from ``scripts``: a list of raw SSE
+    frames to send, after which the connection is closed -- or held open
+    until the client goes away when the script ends with ``HOLD``.  A
+    ``None`` script (or running out of scripts) answers 503.
+    """
+
+    HOLD = object()
+
+    def __init__(self, scripts):
+        self.scripts = list(scripts)
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_args):
+                pass
+
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                script = server.scripts.pop(0) if server.scripts else None
+                if script is None:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                for frame in script:
+                    if frame is FeedServer.HOLD:
+                        try:
+                            while True:
+                                self.wfile.write(b': ping\n\n')
+                                self.wfile.flush()
+                                time.sleep(0.05)
+                        except OSError:
+                            return
+                    self.wfile.write(frame.encode())
+                    self.wfile.flush()
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}/worklogs/events'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _frame(event, data, eid=None):
+    head = f'id: {eid}\n' if eid is not None else ''
+    return f'{head}event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+REC = {'id': '7', 'record_time': '2025-07-01T10:00:00Z', 'content': 'from phone'}
+
+
+@pytest.fixture
+def make_server():
+    servers = []
+
+    def make(scripts):
+        server = FeedServer(scripts)
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+def _collect(changes, n, timeout=5.0):
+    return [changes.get(timeout=timeout) for _ in range(n)]
+
+
+def test_iter_sse_parses_fields():
+    lines = [
+        ': heartbeat\n', 'id: 1\n', 'event: update\n', 'data: {"a":\n', 'data:  1}\n', '\n',
+        'retry: 2500\n', 'data: x\n', '\n', 'event: ignored-without-data\n', '\n',
+    ]
+    msgs = list(iter_sse(lines))
+    assert msgs == [
+        SSEMessage('update', '{"a":\n 1}', '1'),
+        SSEMessage('message', 'x', '1', 2500),
+    ]
+
+
+def test_to_change_variants():
+    assert to_change(SSEMessage('worklog.updated', json.dumps(REC), '3')).record['content'] == 'from phone'
+    nested = to_change(SSEMessage('message', json.dumps({'type': 'created', 'worklog': dict(REC, id=8)})))
+    assert (nested.op, nested.worklog_id) == ('create', '8')
+    assert to_change(SSEMessage('delete', '{"id": 9}')).worklog_id == '9'
+    assert to_change(SSEMessage('delete', '{"id": 9, "space_id": 4}')).space_id == '4'
+    assert to_change(SSEMessage('update', '{"id": 9}')) is None  # no record_time
+    assert to_change(SSEMessage('ping', '{}')) is None
+    assert to_change(SSEMessage('update', 'not json')) is None
+
+
+def test_backoff_grows_and_caps():
+    backoff = Backoff(base=1, cap=10, rng=lambda: 1.0)
+    assert [backoff.next_delay() for _ in range(6)] == [1, 2, 4, 8, 10, 10]
+    backoff.reset()
+    assert backoff.next_delay() == 1
+
+
+def test_feed_applies_events_and_resumes_after_drop(make_server):
+    server = make_server([
+        [_frame('create', REC, 1), _frame('update', dict(REC, content='edited'), 2)],
+        [_frame('delete', {'id': '7'}, 3), FeedServer.HOLD],
+    ])
+    changes = queue.Queue()
+    feed = ChangeFeed(lambda: 'tok', changes.put, url=server.url, backoff=Backoff(base=0.01))
+    feed.start()
+    try:
+        got = _collect(changes, 3)
+    finally:
+        feed.stop()
+    assert [(c.op, c.worklog_id) for c in got] == [('create', '7'), ('update', '7'), ('delete', '7')]
+    assert got[1].record['content'] == 'edited'
+    assert server.requests[0]['Authorization'] == 'Bearer tok'
+    assert 'Last-Event-ID' not in server.requests[0]
+    assert server.requests[1]['Last-Event-ID'] == '2'
+    assert not feed.running
+
+
+def test_feed_backs_off_on_errors_and_resyncs_without_event_id(make_server):
+    server = make_server([[], None, [_frame('update', REC), FeedServer.HOLD]])
+    changes, resets = queue.Queue(), []
+    feed = ChangeFeed(
+        lambda: 'tok', changes.put, on_reset=lambda: resets.append(True),
+        url=server.url, backoff=Backoff(base=0.01),
+    )
+    feed.start()
+    try:
+        assert changes.get(timeout=5).op == 'update'
+    finally:
+        feed.stop()
+    assert len(server.requests) == 3
+    assert resets == [True]
+
+
+def test_stop_interrupts_a_held_stream(make_server):
+    server = make_server([[FeedServer.HOLD]])
+    feed = ChangeFeed(lambda: 'tok', lambda _c: None, url=server.url, read_timeout=30)
+    feed.start()
+    deadline = time.monotonic() + 5
+    while not feed.connected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert feed.connected
+    start = time.monotonic()
+    feed.stop()
+    assert time.monotonic() - start < 1.5
+    assert not feed.running
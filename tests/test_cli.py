@@ -0,0 +1,94 @@
+import base64
+import io
+import json
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Provide a minimal requests stub so the module imports without network deps
+sys.modules.setdefault('requests', types.SimpleNamespace(HTTPError=Exception))
+
+from worklog import cli
+from worklog.services import api_client
+from worklog.services.sync_engine import SyncEngine
+from worklog.stores.log_cache import LogCache
+
+LOGS = [
+    {'id': '1', 'record_time': '2025-07-15T18:01:00Z', 'content': 'Fix login bug'},
+    {'id': '2', 'record_time': '2025-06-30T09:00:00Z', 'content': 'Write spec'},
+    {'id': '3', 'record_time': '2025-07-01T10:00:00Z', 'content': 'Review LOGIN flow'},
+]
+
+
+def _run(monkeypatch, tmp_path, *argv):
+    monkeypatch.setenv('WORKLOG_TELEMETRY', '0')
+    engine = SyncEngine(LogCache(tmp_path / 'cache.sqlite3'), lambda: 'tok')
+    monkeypatch.setattr(cli, '_build_engine', lambda args: engine)
+    monkeypatch.setattr(api_client, 'get_worklog_records', lambda token, sign_out=None, **_k: [dict(r) for r in LOGS])
+    out = io.StringIO()
+    assert cli.main(list(argv), out=out) == 0
+    return [json.loads(line) for line in out.getvalue().splitlines()], engine
+
+
+def test_list_filters_month_newest_first(monkeypatch, tmp_path):
+    records, _ = _run(monkeypatch, tmp_path, 'list', '--month', '2025-07')
+    assert [r['id'] for r in records] == ['1', '3']
+
+
+def test_search_is_case_insensitive(monkeypatch, tmp_path):
+    records, _ = _run(monkeypatch, tmp_path, 'search', 'login')
+    assert [r['id'] for r in records] == ['1', '3']
+
+
+def test_add_prints_synced_record(monkeypatch, tmp_path):
+    monkeypatch.setattr(api_client, 'create_worklog', lambda token, **kw: {'id': 'new', **kw})
+    records, engine = _run(monkeypatch, tmp_path, 'add', 'hello', '--time', '2025-07-16T08:00:00Z')
+    assert records[0]['id'] == 'new'
+    assert records[0]['content'] == 'hello'
+    assert not engine.has_pending()
+
+
+def test_export_csv(monkeypatch, tmp_path):
+    dest = tmp_path / 'out.csv'
+    _run(monkeypatch, tmp_path, 'export', '--format', 'csv', '-o', str(dest))
+    lines = dest.read_text(encoding='utf-8').splitlines()
+    assert lines[0] == 'id,record_time,content,tag_id'
+    assert len(lines) == 4
+
+
+def _jwt(exp):
+    claims = base64.urlsafe_b64encode(json.dumps({'exp': exp}).encode()).decode().rstrip('=')
+    return f'h.{claims}.s'
+
+
+def test_token_expired():
+    assert not cli._token_expired(_jwt(time.time() + 3600))
+    assert cli._token_expired(_jwt(time.time() - 10))
+    assert cli._token_expired('garbage')
+    assert cli._token_expired(None)
+
+
+def test_engine_uses_the_selected_space(monkeypatch, tmp_path):
+    from worklog.services import spaces
+    from worklog.stores import log_cache, user_store
+
+    class SignedIn:
+        token, refresh_token, offline = 'tok', 'refresh', False
+
+        def __init__(self, auto_refresh=True):
+            pass
+
+    monkeypatch.setattr(user_store, 'UserStore', SignedIn)
+    monkeypatch.setattr(log_cache, '_get_cache_path', lambda: tmp_path / 'cache.sqlite3')
+    monkeypatch.setattr(spaces, 'load_last_space', lambda: 'team')
+
+    engine = cli._build_engine(cli.build_parser().parse_args(['list', '--offline']))
+    assert engine.space_id == 'team'
+    assert engine.cache._path == log_cache.space_cache_path('team')
+
+    engine = cli._build_engine(cli.build_parser().parse_args(['list', '--offline', '--space', 'ops']))
+    assert engine.space_id == 'ops'
+    assert engine.cache._path == tmp_path / 'spaces' / 'ops.sqlite3'
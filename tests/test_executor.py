@@ -0,0 +1,98 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from worklog.services import executor, telemetry
+from worklog.services.executor import BackgroundExecutor, SerialQueue
+from worklog.ui import tasks
+
+
+def test_work_is_bounded_and_queue_depth_is_reported():
+    pool = BackgroundExecutor(2)
+    gate = threading.Event()
+    futures = [pool.submit(gate.wait) for _ in range(5)]
+    deadline = time.monotonic() + 2
+    while pool.metrics().running < 2 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    metrics = pool.metrics()
+    assert (metrics.workers, metrics.running, metrics.queued) == (2, 2, 3)
+    assert metrics.peak_queued >= 3
+    gate.set()
+    assert all(f.result(timeout=2) for f in futures)
+    assert pool.shutdown()
+    assert pool.metrics().completed == 5
+
+
+def test_failures_are_counted_and_recorded(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(telemetry, 'record_error', lambda where, exc: recorded.append((where, type(exc))))
+    pool = BackgroundExecutor(1)
+
+    def explode():
+        raise ValueError('boom')
+
+    future = pool.submit(explode, name='sync.flush')
+    with pytest.raises(ValueError):
+        future.result(timeout=2)
+    assert pool.metrics().failed == 1
+    assert recorded == [('task.sync.flush', ValueError)]
+    pool.shutdown()
+
+
+def test_shutdown_waits_for_pending_work_then_refuses_more():
+    pool = BackgroundExecutor(1)
+    done = []
+    for i in range(3):
+        pool.submit(lambda i=i: (time.sleep(0.02), done.append(i)))
+    assert pool.shutdown(timeout=2)
+    assert done == [0, 1, 2]
+    with pytest.raises(RuntimeError):
+        pool.submit(print)
+
+
+def test_shutdown_reports_work_that_overruns_the_timeout():
+    pool = BackgroundExecutor(1)
+    gate = threading.Event()
+    pool.submit(gate.wait)
+    late = pool.submit(print)
+    assert not pool.shutdown(timeout=0.05)
+    assert late.cancelled()
+    gate.set()
+
+
+def test_serial_queue_keeps_order_on_the_shared_pool(monkeypatch):
+    monkeypatch.setattr(executor, '_shared', BackgroundExecutor(4))
+    queue = SerialQueue('drafts')
+    seen, active, overlap = [], [0], []
+
+    def write(i):
+        active[0] += 1
+        overlap.append(active[0])
+        time.sleep(0.001)
+        seen.append(i)
+        active[0] -= 1
+
+    for i in range(20):
+        queue.submit(write, i)
+    queue.submit(lambda: 1 / 0)  # logged, does not stop the queue
+    queue.submit(write, 20)
+    assert executor.shutdown_executor(timeout=2)
+    assert seen == list(range(21))
+    assert max(overlap) == 1
+
+
+def test_background_results_reach_the_callbacks(monkeypatch):
+    monkeypatch.setattr(executor, '_shared', BackgroundExecutor(2))
+    delivered = threading.Semaphore(0)
+    results, errors = [], []
+    tasks.run_in_background(lambda x: x * 2, 21, on_done=lambda r: (results.append(r), delivered.release()))
+    tasks.run_in_background(lambda: {}['missing'], on_error=lambda e: (errors.append(e), delivered.release()))
+    assert delivered.acquire(timeout=2) and delivered.acquire(timeout=2)
+    executor.shutdown_executor(timeout=2)
+    assert results == [42]
+    assert [type(e) for e in errors] == [KeyError]
@@ -24,3 +24,103 @@ def test_load_google_oauth_from_env(tmp_path, monkeypatch):
     monkeypatch.setattr(firebase, "_GOOGLE_OAUTH_PATH", tmp_path / "doesntexist.json")
     cfg = firebase.load_google_oauth_client()
     assert cfg["client_id"] == "xyz"
+
+
+class _FakeGoogle:
+    """Authorization server: /auth redirects to the app, /token checks PKCE."""
+
+    def __init__(self, error=None):
+        import base64
+        import hashlib
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlencode, urlparse
+
+        fake = self
+        self.auth_params = None
+        self.token_form = None
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.auth_params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                reply = {'error': error} if error else {'code': 'the-code'}
+                reply['state'] = fake.auth_params['state']
+                self.send_response(302)
+                self.send_header('Location', f"{fake.auth_params['redirect_uri']}?{urlencode(reply)}")
+                self.end_headers()
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                form = fake.token_form = {k: v[0] for k, v in parse_qs(body).items()}
+                digest = hashlib.sha256(form['code_verifier'].encode()).digest()
+                challenge = base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+                ok = form['code'] == 'the-code' and challenge == fake.auth_params['code_challenge']
+                payload = {'id_token': 'gid', 'refresh_token': 'grt'} if ok else {'error': 'invalid_grant'}
+                data = json.dumps(payload).encode()
+                self.send_response(200 if ok else 400)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *_a):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.client = {'client_id': 'cid', 'auth_uri': f'{base}/auth', 'token_uri': f'{base}/token'}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _browser(url):
+    """Follow the redirect chain in the background, like a real browser tab."""
+    import threading
+    import urllib.request
+
+    threading.Thread(target=lambda: urllib.request.urlopen(url, timeout=5).read(), daemon=True).start()
+
+
+def test_native_oauth_pkce_roundtrip():
+    from worklog.auth import google
+
+    fake = _FakeGoogle()
+    try:
+        assert google.native_oauth(client=fake.client, open_browser=_browser, timeout=5) == ('gid', 'grt')
+    finally:
+        fake.close()
+    assert fake.auth_params['code_challenge_method'] == 'S256'
+    assert fake.auth_params['scope'] == ' '.join(google.SCOPES)
+    assert fake.token_form['redirect_uri'] == fake.auth_params['redirect_uri']
+    assert fake.token_form['grant_type'] == 'authorization_code'
+    assert 'client_secret' not in fake.token_form
+
+
+def test_native_oauth_reports_denied_consent():
+    import pytest
+
+    from worklog.auth import google
+
+    fake = _FakeGoogle(error='access_denied')
+    try:
+        with pytest.raises(RuntimeError, match='access_denied'):
+            google.native_oauth(client=fake.client, open_browser=_browser, timeout=5)
+    finally:
+        fake.close()
+    assert fake.token_form is None
+
+
+def test_native_oauth_cancel_stops_waiting():
+    import threading
+
+    import pytest
+
+    from worklog.auth import google
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(google.OAuthCancelled):
+        google.native_oauth(cancel, client={'client_id': 'cid'}, open_browser=lambda _url: None)
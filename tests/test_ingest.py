@@ -0,0 +1,91 @@
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from worklog.services import ingest
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class FakeResp:
+    def __init__(self, body: bytes, length=True):
+        self._body = body
+        self.headers = {'Content-Length': str(len(body))} if length else {}
+        self.iterated = False
+
+    @property
+    def content(self):
+        return self._body
+
+    def iter_content(self, chunk_size=1):
+        self.iterated = True
+        return iter(_chunks(self._body, 7))
+
+
+def test_records_are_validated_and_coerced():
+    rec = ingest.to_log_record({'id': 42, 'record_time': '2024-05-01T10:00:00Z', 'content': None, 'tag_id': 7})
+    assert rec == {'id': '42', 'record_time': '2024-05-01T10:00:00Z', 'content': '', 'tag_id': '7'}
+
+
+def test_offset_times_are_normalised_to_utc():
+    rec = ingest.to_log_record({'id': 'a', 'record_time': '2024-05-01T08:00:00+08:00', 'content': 'x'})
+    assert rec['record_time'] == '2024-05-01T00:00:00Z'
+
+
+def test_invalid_items_are_skipped(caplog):
+    items = [
+        {'id': '1', 'record_time': '2024-05-01T10:00:00Z', 'content': 'ok'},
+        {'id': '2', 'record_time': 'yesterday'},
+        {'record_time': '2024-05-01T10:00:00Z'},
+        'not a record',
+    ]
+    with caplog.at_level(logging.WARNING):
+        records = ingest.ingest(items)
+    assert [r['id'] for r in records] == ['1']
+    assert 'Skipped 3' in caplog.text
+
+
+def test_parse_worklogs_accepts_wrapped_payload():
+    body = json.dumps({'data': [{'id': '1', 'record_time': '2024-05-01T10:00:00Z', 'content': 'a'}]})
+    assert [r['id'] for r in ingest.parse_worklogs(body)] == ['1']
+    with pytest.raises(ValueError):
+        ingest.parse_worklogs('{"unexpected": 1}')
+
+
+def test_iter_json_array_handles_tiny_chunks():
+    doc = [{'id': str(i), 'content': 'été ✓ 日本', 'n': i * 1.5} for i in range(20)] + [123456, 'tail']
+    data = json.dumps(doc, ensure_ascii=False).encode('utf-8')
+    for size in (1, 2, 3, 5, 64):
+        assert list(ingest.iter_json_array(_chunks(data, size))) == doc
+
+
+def test_iter_json_array_empty_and_truncated():
+    assert list(ingest.iter_json_array([b' [ ', b' ] '])) == []
+    with pytest.raises(ValueError):
+        list(ingest.iter_json_array([b'[{"id": 1}, ', b'{"id"']))
+    with pytest.raises(ValueError):
+        list(ingest.iter_json_array([b'{"data": []}']))
+
+
+def test_parse_worklogs_response_small_and_streamed(monkeypatch):
+    logs = [{'id': str(i), 'record_time': '2024-05-01T10:00:00Z', 'content': 'x'} for i in range(50)]
+    body = json.dumps(logs).encode()
+
+    small = FakeResp(body)
+    assert len(ingest.parse_worklogs_response(small)) == 50
+    assert not small.iterated
+
+    monkeypatch.setattr(ingest, 'STREAM_THRESHOLD', 100)
+    large = FakeResp(body)
+    assert len(ingest.parse_worklogs_response(large)) == 50
+    assert large.iterated
+
+    unknown = FakeResp(json.dumps({'data': logs}).encode(), length=False)
+    assert len(ingest.parse_worklogs_response(unknown)) == 50
@@ -0,0 +1,42 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Provide a minimal requests stub so the module imports without network deps
+sys.modules.setdefault('requests', types.SimpleNamespace(HTTPError=Exception))
+
+from worklog.services import api_client
+from worklog.services.sync_engine import SyncEngine
+from worklog.stores.log_cache import LogCache
+from worklog.ui.log_editor import _save_edit
+
+
+class _Rejected(Exception):
+    def __init__(self, status):
+        super().__init__(f'{status} err')
+        self.response = types.SimpleNamespace(status_code=status)
+
+
+def test_save_merges_with_a_concurrent_server_edit(monkeypatch, tmp_path):
+    engine = SyncEngine(LogCache(tmp_path / 'cache.sqlite3'), lambda: 'tok')
+    rec = {'id': '5', 'record_time': '2025-07-01T10:00:00Z', 'content': 'line1\nline2\nline3\n', 'etag': '"v1"'}
+    server = dict(rec, content='line1\nline2\nline3 THEIRS\n', etag='"v2"')
+    sent = []
+
+    def fake_update(token, wid, *, if_match=None, **payload):
+        sent.append(payload['content'])
+        if if_match == '"v1"':
+            raise _Rejected(412)
+        return dict(payload, id=wid)
+
+    monkeypatch.setattr(api_client, 'update_worklog', fake_update)
+    monkeypatch.setattr(api_client, 'get_worklog', lambda token, wid: dict(server))
+
+    def on_saved(text):  # what the day card does with its row's record
+        rec['content'] = text
+
+    _save_edit(rec, 'line1 MINE\nline2\nline3\n', on_saved, engine.update_worklog)
+    assert rec['content'] == 'line1 MINE\nline2\nline3\n'
+    assert sent[-1] == 'line1 MINE\nline2\nline3 THEIRS\n'
@@ -0,0 +1,118 @@
+import datetime as dt
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from worklog.stores.log_cache import LogCache
+from worklog.stores.log_store import LogStore, approx_record_size, record_date
+
+
+def _rec(i, month, day=1):
+    return {'id': str(i), 'record_time': f'2025-{month:02d}-{day:02d}T10:00:00Z', 'content': 'x' * 50}
+
+
+def _store(tmp_path, logs, budget):
+    cache = LogCache(tmp_path / 'cache.sqlite3')
+    cache.replace_all(logs)
+    store = LogStore(cache, budget_bytes=budget)
+    store.replace([dict(r) for r in logs])
+    return store
+
+
+def test_replace_keeps_newest_months_within_budget(tmp_path):
+    logs = [_rec(i, m) for i, m in enumerate([1, 2, 3, 4])]
+    one_month = approx_record_size(logs[0])
+    store = _store(tmp_path, logs, budget=2 * one_month)
+    stats = store.stats()
+    assert stats.months == 2
+    assert stats.records == 2
+    assert stats.approx_bytes <= 2 * one_month
+    assert store.newest_month() == dt.date(2025, 4, 1)
+
+
+def test_evicted_month_reloads_from_disk(tmp_path):
+    logs = [_rec(i, m) for i, m in enumerate([1, 2, 3])]
+    store = _store(tmp_path, logs, budget=approx_record_size(logs[0]))
+    assert store.stats().months == 1
+
+    jan = store.month(dt.date(2025, 1, 1))
+    assert [r['id'] for r in jan] == ['0']
+    assert store.stats().months == 1  # March was evicted to make room
+
+
+def test_viewed_months_survive_refresh(tmp_path):
+    logs = [_rec(i, m) for i, m in enumerate([1, 2, 3])]
+    store = _store(tmp_path, logs, budget=approx_record_size(logs[0]))
+    store.month(dt.date(2025, 1, 1))
+    store.replace([dict(r) for r in logs])
+    assert store.month(dt.date(2025, 1, 1))[0]['id'] == '0'
+    assert store.stats().months == 1
+
+
+def test_add_and_deleted_records(tmp_path):
+    store = _store(tmp_path, [_rec(1, 7)], budget=10**6)
+    store.add(_rec(2, 7, day=2))
+    july = store.month(dt.date(2025, 7, 1))
+    assert {r['id'] for r in july} == {'1', '2'}
+    july[0]['_deleted'] = True
+    assert len(store.month(dt.date(2025, 7, 1))) == 1
+
+
+def test_newest_month_falls_back_to_disk(tmp_path):
+    store = _store(tmp_path, [_rec(1, 5)], budget=10**6)
+    store.clear()
+    assert store.stats().records == 0
+    assert store.newest_month() == dt.date(2025, 5, 1)
+
+
+def test_record_date():
+    assert record_date({'record_time': '2025-07-15T18:01:00Z'}) == dt.date(2025, 7, 15)
+    assert record_date({'record_time': '2025-07-15 garbage'}) == dt.date(2025, 7, 15)
+    assert record_date({}) is None
+
+
+def test_upsert_replaces_and_remove_drops_records(tmp_path):
+    store = _store(tmp_path, [_rec(1, 7), _rec(2, 7)], budget=10 ** 6)
+    july = dt.date(2025, 7, 1)
+    store.upsert(dict(_rec(1, 7), content='edited'))
+    assert sorted(r['content'] for r in store.month(july)) == ['edited', 'x' * 50]
+    store.remove('2')
+    assert [r['id'] for r in store.month(july)] == ['1']
+    assert store.stats().records == 1
+
+
+def test_year_summary_counts_local_days_from_aggregates(tmp_path, monkeypatch):
+    from worklog.services.timezone import TimezoneService
+
+    logs = [
+        {'id': '1', 'record_time': '2024-12-31T16:30:00Z', 'content': ''},  # 2025-01-01 in Taipei
+        {'id': '2', 'record_time': '2025-03-10T01:00:00Z', 'content': ''},
+        {'id': '3', 'record_time': '2025-03-10T02:20:00Z', 'content': ''},
+        {'id': '4', 'record_time': '2025-12-31T16:00:00Z', 'content': ''},  # 2026 in Taipei
+    ]
+    store = _store(tmp_path, logs, budget=10 ** 6)
+    monkeypatch.setattr(store._cache, 'load_all', lambda: pytest.fail('must not load logs'))
+    summary = store.year_summary(2025, TimezoneService('Asia/Taipei'))
+    assert summary.days == {dt.date(2025, 1, 1): 1, dt.date(2025, 3, 10): 2}
+    assert summary.months[:3] == (1, 0, 2)
+    assert (summary.total, summary.busiest_day) == (3, 2)
+
+    store._cache.upsert({'id': '2', 'record_time': '2025-04-01T01:00:00Z', 'content': ''})
+    assert store.year_summary(2025, TimezoneService('Asia/Taipei')).months[2:4] == (1, 1)
+
+
+def test_drafts_survive_reopen_and_clear_on_sign_out(tmp_path):
+    cache = LogCache(tmp_path / 'cache.sqlite3')
+    cache.save_draft('1', 'half')
+    cache.save_draft('1', 'half written')
+    cache.close()
+    cache = LogCache(tmp_path / 'cache.sqlite3')
+    assert cache.load_draft('1') == 'half written'
+    cache.discard_draft('1')
+    assert cache.load_draft('1') is None
+    cache.save_draft('2', 'x')
+    cache.clear()
+    assert cache.load_draft('2') is None
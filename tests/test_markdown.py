@@ -0,0 +1,93 @@
+import os
+import sys
+import xml.dom.minidom
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from worklog.services import markdown
+from worklog.services.markdown import MarkupCache, card_text, prerender, preview, to_pango
+
+
+def _well_formed(markup):
+    xml.dom.minidom.parseString(f'<markup>{markup}</markup>')
+    return True
+
+
+def test_inline_markup():
+    assert to_pango('**bold** and *it* and ~~gone~~') == '<b>bold</b> and <i>it</i> and <s>gone</s>'
+    assert to_pango('a `x < **y**` b') == 'a <tt>x &lt; **y**</tt> b'
+    assert to_pango('[site](https://e.x/?a=1&b=2)') == '<a href="https://e.x/?a=1&amp;b=2">site</a>'
+    assert to_pango('snake_case_name 2 * 3 * 4') == 'snake_case_name 2 * 3 * 4'
+
+
+def test_blocks_escape_and_stay_well_formed():
+    text = '# Title\n- one\n  * two\n> quote <b>\n```\n<raw> & **x**\n```\n---\nplain & "q"'
+    markup = to_pango(text)
+    assert markup.splitlines() == [
+        '<span weight="bold" size="x-large">Title</span>',
+        '• one',
+        '  • two',
+        '<i>quote &lt;b&gt;</i>',
+        '<tt>&lt;raw&gt; &amp; **x**</tt>',
+        '──────────',
+        'plain &amp; &quot;q&quot;',
+    ]
+    assert _well_formed(markup)
+    assert _well_formed(to_pango('```\nunterminated'))
+
+
+def test_cache_hits_by_content_and_stays_within_budget():
+    calls = []
+
+    def render(text):
+        calls.append(text)
+        return text.upper()
+
+    cache = MarkupCache(max_bytes=sys.getsizeof('A' * 100) * 3 + 3 * sys.getsizeof(b'x' * 16), render=render)
+    for text in ['a' * 100, 'b' * 100, 'a' * 100]:
+        cache.get(text)
+    assert calls == ['a' * 100, 'b' * 100]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    for text in ['c' * 100, 'd' * 100]:
+        cache.get(text)
+    assert len(cache) == 3 and cache.size <= cache.max_bytes
+    cache.get('b' * 100)  # least recently used, evicted
+    assert calls[-1] == 'b' * 100
+
+
+def test_seeded_markup_is_served_without_rendering():
+    calls = []
+    cache = MarkupCache(render=lambda text: calls.append(text) or text.upper())
+    assert cache.peek('**done**') is None
+    cache.seed('**done**', '<b>done</b>')
+    assert cache.get('**done**') == '<b>done</b>'
+    assert cache.peek('**done**') == '<b>done</b>'
+    assert calls == []
+
+
+def test_preview_keeps_short_logs_whole_and_bounds_long_ones():
+    assert preview('one line') is None
+    assert preview('a\nb\nc\n', max_lines=3) is None  # only a trailing newline left
+    assert card_text('short') == 'short'
+
+    lines = '\n'.join(f'line {i}' for i in range(50))
+    assert preview(lines, max_lines=3) == 'line 0\nline 1\nline 2…'
+
+    words = 'word ' * 1000
+    cut = preview(words, max_chars=52)
+    assert cut.endswith('word…') and len(cut) <= 53
+
+    unbroken = 'x' * 10_000
+    assert preview(unbroken, max_chars=100) == 'x' * 100 + '…'
+    assert _well_formed(to_pango(preview('```\ncode\n' * 20, max_lines=3)))
+
+
+def test_prerender_fills_the_shared_cache_with_collapsed_text(monkeypatch):
+    cache = MarkupCache()
+    monkeypatch.setattr(markdown, '_shared', cache)
+    long_log = 'detail ' * 200
+    prerender(['**short**', long_log])
+    assert cache.peek('**short**') == '<b>short</b>'
+    assert cache.peek(card_text(long_log)) is not None
+    assert cache.peek(long_log) is None
@@ -0,0 +1,50 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from worklog.services import memory
+from worklog.services.memory import IdleTrimmer
+
+
+def test_idle_trimmer_waits_for_idle_timeout():
+    now = [0.0]
+    trimmer = IdleTrimmer(budget_bytes=100, idle_seconds=60, clock=lambda: now[0], rss=lambda: 10)
+    assert not trimmer.should_trim()
+    now[0] = 61
+    assert trimmer.should_trim()
+
+    trimmer.mark_trimmed()
+    assert not trimmer.should_trim()
+
+    trimmer.touch()
+    now[0] = 100
+    assert not trimmer.should_trim()
+
+
+def test_idle_trimmer_trims_when_over_budget():
+    now = [0.0]
+    trimmer = IdleTrimmer(budget_bytes=100, idle_seconds=60, clock=lambda: now[0], rss=lambda: 500)
+    assert trimmer.should_trim()
+
+    # Still over budget after the trim: not again on the next checks...
+    trimmer.mark_trimmed()
+    now[0] = 30
+    assert not trimmer.should_trim()
+    now[0] = 59
+    assert not trimmer.should_trim()
+    # ...only once the cooldown has passed.
+    now[0] = 60
+    assert trimmer.should_trim()
+
+
+def test_memory_budget_from_env(monkeypatch):
+    monkeypatch.setenv("WORKLOG_MEMORY_BUDGET_MB", "64")
+    assert memory.memory_budget_bytes() == 64 * 1024 * 1024
+    monkeypatch.setenv("WORKLOG_MEMORY_BUDGET_MB", "lots")
+    assert memory.memory_budget_bytes() == 150 * 1024 * 1024
+
+
+def test_current_rss_is_positive():
+    assert memory.current_rss_bytes() > 0
+    memory.trim_process_memory()
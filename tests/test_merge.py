@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from worklog.services.merge import merge3
+
+
+def test_trivial_cases():
+    assert merge3('a', 'a', 'b').text == 'b'
+    assert merge3('a', 'b', 'a').text == 'b'
+    assert (merge3('a', 'b', 'b').text, merge3('a', 'b', 'b').conflict) == ('b', False)
+
+
+def test_disjoint_line_edits_merge():
+    result = merge3('standup\nreview PR\ndeploy\n', 'standup 15m\nreview PR\ndeploy\n', 'standup\nreview PR\ndeploy v2\n')
+    assert result.text == 'standup 15m\nreview PR\ndeploy v2\n'
+    assert not result.conflict
+
+
+def test_edits_within_one_line_merge_word_by_word():
+    result = merge3('fixed bug in parser', 'fixed nasty bug in parser', 'fixed bug in lexer')
+    assert (result.text, result.conflict) == ('fixed nasty bug in lexer', False)
+
+
+def test_overlapping_edits_conflict_with_markers():
+    result = merge3('note\nfixed bug\n', 'note\nfixed issue\n', 'note\nfixed problem\n')
+    assert result.conflict
+    assert result.text == 'note\n<<<<<<< mine\nfixed issue\n=======\nfixed problem\n>>>>>>> theirs\n'
+
+
+def test_insertions_at_the_same_point_conflict():
+    assert merge3('x\ny\n', 'x\nours\ny\n', 'x\ntheirs\ny\n').conflict
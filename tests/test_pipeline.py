@@ -0,0 +1,240 @@
+"""Property and load tests for the non-GTK pipeline.
+
+fetch (a fake streamed response) → parse → group by day → month partitions
+and year summary, checked against straightforward reference implementations
+on randomly generated datasets.  Each property runs over ``PROPERTY_SEEDS``
+seeded examples, so failures are reproducible from the printed seed.
+
+The load test runs 20k records by default; set ``WORKLOG_LOAD_RECORDS``
+(e.g. ``1000000``) for a full-size run.  Its time and memory limits are per
+record, so they hold at every size.
+"""
+
+import datetime as dt
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from worklog.services import ingest
+from worklog.services import timezone as tz_mod
+from worklog.services.timezone import TimezoneService
+from worklog.stores.log_cache import LogCache
+from worklog.stores.log_store import LogStore, approx_record_size, group_by_day
+
+PROPERTY_SEEDS = range(30)
+ZONES = ['UTC', 'Asia/Taipei', 'America/New_York', 'Pacific/Kiritimati', 'America/St_Johns']
+
+LOAD_RECORDS = int(os.getenv('WORKLOG_LOAD_RECORDS') or 20_000)
+# Generous ceilings (several times what a laptop needs) so the test only
+# trips on real regressions, e.g. an accidental O(n²) pass or a full copy.
+MAX_SECONDS_PER_RECORD = 60e-6
+MAX_BYTES_PER_RECORD = 3_000
+
+
+# ── Generators ───────────────────────────────────────────────────────
+_TEXT = 'abc xyz 工作日誌 ✓ "quoted" \\ back\nslash\t{[]},:'
+
+
+def _record_time(rnd):
+    # Around month and year edges, in every format the API sends.
+    when = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(
+        days=rnd.choice([0, 30, 31, 59, 60, 365, rnd.randrange(731)]),
+        minutes=rnd.randrange(-24 * 60, 24 * 60),
+    )
+    style = rnd.randrange(3)
+    if style == 0:
+        return when.strftime('%Y-%m-%dT%H:%M:%SZ')
+    if style == 1:
+        return when.replace(tzinfo=None).isoformat()  # naive = UTC
+    offset = dt.timezone(dt.timedelta(minutes=rnd.choice([-570, -300, 0, 330, 480, 840])))
+    return when.astimezone(offset).isoformat()
+
+
+def _raw_item(rnd, i):
+    item = {
+        'id': rnd.choice([i, str(i), f'w-{i}']),
+        'record_time': _record_time(rnd),
+        'content': rnd.choice([None, 42, ''.join(rnd.choice(_TEXT) for _ in range(rnd.randrange(40)))]),
+        'tag_id': rnd.choice([None, rnd.randrange(5), f't{rnd.randrange(5)}']),
+    }
+    broken = rnd.randrange(20)
+    if broken == 0:
+        item['id'] = rnd.choice([None, ''])
+    elif broken == 1:
+        item['record_time'] = rnd.choice([None, '', 'yesterday', 17])
+    elif broken == 2:
+        return rnd.choice([[], 'x', None])
+    return item
+
+
+def _dataset(rnd, n):
+    return [_raw_item(rnd, i) for i in range(n)]
+
+
+# ── Reference implementations ────────────────────────────────────────
+def _ref_valid(item):
+    if not isinstance(item, dict) or item.get('id') in (None, ''):
+        return False
+    try:
+        dt.datetime.fromisoformat(item.get('record_time'))
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _ref_local_date(record_time, zone):
+    when = dt.datetime.fromisoformat(record_time)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return when.astimezone(ZoneInfo(zone)).date()
+
+
+def _ref_groups(raw_items, zone):
+    groups = {}
+    for item in raw_items:
+        if _ref_valid(item):
+            groups.setdefault(_ref_local_date(item['record_time'], zone), []).append(str(item['id']))
+    return groups
+
+
+class _Resp:
+    """A streamed ``requests`` response without Content-Length."""
+
+    def __init__(self, body, chunk):
+        self.headers = {}
+        self._body = body
+        self._chunk = chunk
+
+    @property
+    def content(self):
+        return self._body
+
+    def iter_content(self, chunk_size=1):
+        step = self._chunk or chunk_size
+        return (self._body[i:i + step] for i in range(0, len(self._body), step))
+
+
+@pytest.fixture
+def zone(monkeypatch):
+    def use(name):
+        service = TimezoneService(name)
+        monkeypatch.setattr(tz_mod, '_default', service)
+        return service
+
+    return use
+
+
+# ── Properties ───────────────────────────────────────────────────────
+@pytest.mark.parametrize('seed', PROPERTY_SEEDS)
+def test_streamed_parse_matches_one_shot_decode(seed):
+    rnd = random.Random(seed)
+    raw = _dataset(rnd, rnd.randrange(60))
+    body = json.dumps(raw, ensure_ascii=rnd.random() < 0.5, indent=rnd.choice([None, 1])).encode()
+    streamed = ingest.parse_worklogs_response(_Resp(body, rnd.randrange(1, 64)))
+    assert streamed == ingest.parse_worklogs(body)
+    assert [r['id'] for r in streamed] == [str(r['id']) for r in raw if _ref_valid(r)]
+    for rec in streamed:
+        assert isinstance(rec['content'], str) and isinstance(rec['id'], str)
+        assert rec.get('tag_id') is None or isinstance(rec['tag_id'], str)
+
+
+@pytest.mark.parametrize('seed', PROPERTY_SEEDS)
+def test_grouping_matches_reference(seed, zone):
+    rnd = random.Random(seed)
+    raw = _dataset(rnd, rnd.randrange(200))
+    name = rnd.choice(ZONES)
+    records = ingest.ingest(json.loads(json.dumps(raw)))
+    groups = group_by_day(records, zone(name))
+    assert {d: [r['id'] for r in recs] for d, recs in groups.items()} == _ref_groups(raw, name)
+
+
+@pytest.mark.parametrize('seed', PROPERTY_SEEDS[:10])
+def test_month_partitions_and_year_summary_match_reference(seed, zone, tmp_path):
+    rnd = random.Random(seed)
+    raw = _dataset(rnd, rnd.randrange(1, 300))
+    name = rnd.choice(ZONES)
+    zone(name)
+    records = ingest.ingest(json.loads(json.dumps(raw)))
+    cache = LogCache(tmp_path / 'cache.sqlite3')
+    cache.replace_all(records)
+    # A budget of a few records forces eviction and reloads from disk.
+    store = LogStore(cache, budget_bytes=rnd.randrange(1, 20) * approx_record_size(records[0]) if records else 0)
+    store.replace([dict(r) for r in records])
+
+    expected = _ref_groups(raw, name)
+    months = sorted({d.replace(day=1) for d in expected})
+    rnd.shuffle(months)
+    for month in months:
+        got = {}
+        for rec in store.month(month):
+            got.setdefault(_ref_local_date(rec['record_time'], name), []).append(rec['id'])
+        want = {d: ids for d, ids in expected.items() if d.replace(day=1) == month}
+        assert {d: sorted(ids) for d, ids in got.items()} == {d: sorted(ids) for d, ids in want.items()}
+
+    for year in {d.year for d in expected}:
+        summary = store.year_summary(year)
+        want = {d: len(ids) for d, ids in expected.items() if d.year == year}
+        assert summary.days == want
+        assert summary.total == sum(want.values())
+    cache.close()
+
+
+# ── Load ─────────────────────────────────────────────────────────────
+def _load_payload(n):
+    rnd = random.Random(n)
+    base = dt.datetime(2020, 1, 1)
+    items = (
+        {
+            'id': i,
+            'record_time': (base + dt.timedelta(minutes=rnd.randrange(5 * 365 * 24 * 60))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'content': f'Worked on ticket #{i} — reviewed, tested and deployed ✓',
+            'tag_id': i % 7 or None,
+        }
+        for i in range(n)
+    )
+    return ('[' + ','.join(json.dumps(item, ensure_ascii=False) for item in items) + ']').encode()
+
+
+def _run_pipeline(body, cache_path):
+    records = ingest.parse_worklogs_response(_Resp(body, 64 * 1024))
+    groups = group_by_day(records)
+    store = LogStore(LogCache(cache_path))
+    store.replace(records)
+    return records, groups, store
+
+
+def test_pipeline_load_within_time_and_memory_limits(zone, tmp_path):
+    n = LOAD_RECORDS
+    body = _load_payload(n)
+    zone('Asia/Taipei')
+
+    gc.collect()
+    started = time.perf_counter()
+    records, groups, store = _run_pipeline(body, tmp_path / 'timed.sqlite3')
+    elapsed = time.perf_counter() - started
+    assert len(records) == n
+    assert sum(len(recs) for recs in groups.values()) == n
+    assert store.month(store.newest_month())
+    del records, groups, store
+
+    # Measured separately: tracing allocations slows the pipeline down a lot.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = _run_pipeline(body, tmp_path / 'traced.sqlite3')
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+
+    assert elapsed < n * MAX_SECONDS_PER_RECORD, f'{elapsed:.2f}s for {n} records'
+    assert peak < n * MAX_BYTES_PER_RECORD + 16 * 2**20, f'peak {peak / 2**20:.0f} MiB for {n} records'
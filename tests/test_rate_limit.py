@@ -0,0 +1,105 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from worklog.services.rate_limit import AIMDLimit, RateLimiter, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    clock.now += 10
+    assert bucket.reserve() == 0
+
+
+def test_retry_after_pauses_everyone_and_cuts_concurrency():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=100, burst=100, limit=AIMDLimit(8), clock=clock, sleep=clock.sleep)
+    with limiter.slot():
+        pass
+    limiter.observe(0.1, 429, retry_after=5)
+    assert limiter.limit.limit == 4
+    with limiter.slot():
+        pass
+    assert clock.now == 105
+    metrics = limiter.metrics()
+    assert (metrics.requests, metrics.throttled, metrics.queued) == (2, 1, 1)
+    assert metrics.queue_seconds_max == 5 and metrics.queue_seconds_mean == 2.5
+
+
+def test_requests_that_did_not_wait_are_not_counted_as_queued():
+    clock = FakeClock()
+
+    def ticking_clock():
+        clock.now += 0.001  # lock and clock overhead between reads
+        return clock.now
+
+    limiter = RateLimiter(rate=100, burst=100, limit=AIMDLimit(8), clock=ticking_clock, sleep=clock.sleep)
+    for _ in range(10):
+        with limiter.slot():
+            pass
+    metrics = limiter.metrics()
+    assert metrics.requests == 10
+    assert metrics.queued == 0
+    assert metrics.queue_seconds_total == 0 and metrics.queue_seconds_max == 0
+
+
+def test_aimd_grows_on_fast_responses_and_shrinks_on_slow_ones():
+    limit = AIMDLimit(2, maximum=3, slow_seconds=1)
+    for _ in range(10):
+        limit.on_success(0.1)
+    assert limit.limit == 3
+    limit.on_success(5)
+    assert limit.limit == 1.5
+    for _ in range(5):
+        limit.on_overload()
+    assert limit.limit == 1
+
+
+def test_concurrency_limit_blocks_extra_requests():
+    limiter = RateLimiter(rate=1000, burst=1000, limit=AIMDLimit(2))
+    inside, peak = [], []
+    release = threading.Event()
+    lock = threading.Lock()
+
+    def call():
+        with limiter.slot():
+            with lock:
+                inside.append(1)
+                peak.append(len(inside))
+            release.wait(5)
+            with lock:
+                inside.pop()
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for t in threads:
+        t.start()
+    threading.Event().wait(0.1)
+    assert limiter.metrics().in_flight == 2
+    release.set()
+    for t in threads:
+        t.join()
+    assert max(peak) == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3
+    assert parse_retry_after('9999') == 60
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:05 GMT', now=1445412480) == 5
+    assert parse_retry_after('soon') is None and parse_retry_after(None) is None
@@ -0,0 +1,50 @@
+import datetime as dt
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import pytest
+
+import bench_render
+
+
+def test_synthetic_logs_cover_each_month():
+    logs = bench_render.make_logs(30, 3, newest=dt.date(2025, 2, 1))
+    months = sorted({rec['record_time'][:7] for rec in logs})
+    assert months == ['2024-12', '2025-01', '2025-02']
+    assert len({rec['id'] for rec in logs}) == 90
+
+
+def test_check_flags_limits_and_baseline_regressions():
+    result = bench_render.RenderResult(logs=60, first_frame_ms=300, switch_ms=90, widgets=400, widgets_per_log=6.7)
+    assert bench_render.check(result) == []
+    baseline = {'first_frame_ms': 200, 'switch_ms': 85, 'widgets_per_log': 6.5}
+    assert bench_render.check(result, baseline, tolerance=0.25) == [
+        'first_frame_ms 300.0 regressed from 200.0 (>25%)',
+    ]
+    slow = bench_render.RenderResult(logs=60, first_frame_ms=300, switch_ms=900, widgets=400, widgets_per_log=6.7)
+    assert bench_render.check(slow) == ['switch_ms 900.0 > limit 500.0']
+
+
+def test_render_within_limits():
+    """Render the real window headlessly (needs PyGObject and a GTK 4 display)."""
+    pytest.importorskip('gi')
+    broadway = bench_render.ensure_display()
+    try:
+        import gi
+
+        gi.require_version('Gtk', '4.0')
+        gi.require_version('Gdk', '4.0')
+        from gi.repository import Gdk
+
+        if Gdk.Display.get_default() is None:
+            pytest.skip('no GTK display available')
+        result = bench_render.run(logs_per_month=40, months=3, switches=3)
+    finally:
+        if broadway is not None:
+            broadway.terminate()
+    assert result.logs == 40
+    assert bench_render.check(result) == []
@@ -0,0 +1,52 @@
+import datetime as dt
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from worklog.stores import snapshot
+from worklog.stores.snapshot import Snapshot
+
+RECORDS = [
+    {'id': '1', 'record_time': '2025-07-01T10:00:00Z', 'content': '**shipped** 工作', 'tag_id': 't1'},
+    {'id': '2', 'record_time': '2025-07-02T10:00:00Z', 'content': 'long…', 'content_truncated': True},
+]
+
+
+def _snapshot(**kw):
+    fields = dict(month=dt.date(2025, 7, 1), records=RECORDS, space_id='team', zone='Asia/Taipei',
+                  markup={'1': '<b>shipped</b> 工作'}, saved_at=1.5)
+    fields.update(kw)
+    return Snapshot(**fields)
+
+
+def test_roundtrip_keeps_grid_fields_and_markup(tmp_path):
+    path = tmp_path / 'snapshot.bin'
+    extra = dict(RECORDS[0], _deleted=False, body='not needed for the grid')
+    gone = {'id': '3', 'record_time': '2025-07-03T10:00:00Z', 'content': 'x', '_deleted': True}
+    snapshot.save(_snapshot(records=[extra, RECORDS[1], gone]), path)
+    assert snapshot.load(path) == _snapshot()
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_matches_only_the_same_space_and_zone():
+    snap = _snapshot()
+    assert snap.matches(space_id='team', zone='Asia/Taipei')
+    assert not snap.matches(space_id=None, zone='Asia/Taipei')
+    assert not snap.matches(space_id='team', zone='UTC')
+
+
+def test_other_versions_and_damaged_files_are_ignored(tmp_path):
+    path = tmp_path / 'snapshot.bin'
+    assert snapshot.load(path) is None  # missing
+
+    data = snapshot.encode(_snapshot())
+    newer = data[:4] + (snapshot.VERSION + 1).to_bytes(2, 'little') + data[6:]
+    for bad in (newer, data[:-1], b'JUNK' + data[4:], data[:3], data[:10] + b'{' * (len(data) - 10)):
+        path.write_bytes(bad)
+        assert snapshot.load(path) is None
+
+    path.write_bytes(data)
+    snapshot.discard(path)
+    assert not path.exists()
+    snapshot.discard(path)  # already gone
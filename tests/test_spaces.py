@@ -0,0 +1,156 @@
+import os
+import sys
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Provide a minimal requests stub so the module imports without network deps
+sys.modules.setdefault('requests', types.SimpleNamespace(HTTPError=Exception))
+
+import pytest
+
+from worklog.services import api_client, spaces, timezone
+from worklog.services.spaces import SpaceManager
+from worklog.stores.log_cache import LogCache
+
+SPACES = [
+    {'id': 1, 'name': 'Personal', 'is_personal': True},
+    {'id': 'team', 'name': 'Team'},
+    {'id': 'ops', 'name': 'Ops'},
+]
+
+
+def _rec(i, space):
+    return {'id': f'{space}-{i}', 'record_time': f'2025-07-0{i}T10:00:00Z', 'content': f'log {i}'}
+
+
+@pytest.fixture
+def settings(monkeypatch, tmp_path):
+    path = tmp_path / 'settings.json'
+    monkeypatch.setattr(timezone, '_get_settings_path', lambda: path)
+    monkeypatch.setattr(spaces, '_gsettings', lambda: None)
+    return path
+
+
+def _manager(tmp_path, **kw):
+    return SpaceManager(lambda: 'tok', cache_factory=lambda sid: LogCache(tmp_path / f'{sid}.sqlite3'), **kw)
+
+
+def test_each_space_has_its_own_cache_and_selection_is_remembered(monkeypatch, tmp_path, settings):
+    monkeypatch.setattr(api_client, 'get_spaces', lambda token, sign_out=None: [dict(s) for s in SPACES])
+    requested = []
+
+    def fake_records(token, sign_out=None, space_id=None, **_k):
+        requested.append(space_id)
+        return [_rec(1, space_id), _rec(2, space_id)]
+
+    monkeypatch.setattr(api_client, 'get_worklog_records', fake_records)
+    manager = _manager(tmp_path)
+    assert [s.id for s in manager.load_spaces()] == ['1', 'team', 'ops']
+    assert manager.current_id == '1'  # the personal space by default
+
+    team = manager.select('team')
+    logs, from_cache = team.engine.fetch_worklogs()
+    assert requested == ['team'] and not from_cache
+    assert {r['id'] for r in team.cache.load_all()} == {'team-1', 'team-2'}
+    assert manager.data('ops').cache.load_all() == []
+
+    # A new start (offline) restores the space list and the selection.
+    restarted = _manager(tmp_path)
+    assert restarted.current_id == 'team'
+    restarted.set_online(False)
+    restarted.load_spaces()
+    assert restarted.current_id == 'team'
+    assert [s.name for s in restarted.spaces] == ['Personal', 'Team', 'Ops']
+
+
+def test_network_error_does_not_leave_the_manager_offline(monkeypatch, tmp_path, settings):
+    def unreachable(token, sign_out=None):
+        raise api_client.NetworkError('timeout')
+
+    monkeypatch.setattr(api_client, 'get_spaces', unreachable)
+    manager = _manager(tmp_path)
+    manager.load_spaces()
+    assert manager.data('team').engine.online is True
+
+    monkeypatch.setattr(api_client, 'get_spaces', lambda token, sign_out=None: [dict(s) for s in SPACES])
+    assert [s.id for s in manager.load_spaces()] == ['1', 'team', 'ops']
+
+
+def test_pushed_changes_go_to_their_own_space(monkeypatch, tmp_path, settings):
+    from worklog.services.change_feed import Change
+
+    monkeypatch.setattr(api_client, 'get_spaces', lambda token, sign_out=None: [dict(s) for s in SPACES])
+    manager = _manager(tmp_path)
+    manager.load_spaces()
+    team = manager.select('team')
+    team.cache.upsert(_rec(1, 'team'))
+
+    # A space that is listed but not loaded yet gets its own cache.
+    ops = manager.for_change(Change('create', 'ops-2', dict(_rec(2, 'ops'), space_id='ops')))
+    assert ops is not None and ops.space_id == 'ops'
+    # Unknown spaces and unplaceable records are ignored, not shown in the current one.
+    assert manager.for_change(Change('create', 'x-1', dict(_rec(1, 'x'), space_id='elsewhere'))) is None
+    assert manager.for_change(Change('create', 'y-1', _rec(1, 'y'))) is None
+    # Deletes go to the space named on them, or the one caching the log.
+    assert manager.for_change(Change('delete', 'ops-2', space_id='ops')) is ops
+    assert manager.for_change(Change('delete', 'team-1')) is team
+    assert manager.for_change(Change('delete', 'gone')) is None
+
+
+def test_changes_without_spaces_go_to_the_only_space(tmp_path, settings):
+    from worklog.services.change_feed import Change
+
+    manager = _manager(tmp_path)
+    assert manager.for_change(Change('delete', '7')) is manager.data(None)
+
+
+def test_unchanged_space_is_not_downloaded_again(monkeypatch, tmp_path, settings):
+    sent = []
+
+    def fake_records(token, sign_out=None, if_none_match=None, **_k):
+        sent.append(if_none_match)
+        if if_none_match == '"v1"':
+            raise api_client.NotModified('/worklogs')
+        logs = api_client.RecordList([_rec(1, 'p')])
+        logs.etag = '"v1"'
+        return logs
+
+    monkeypatch.setattr(api_client, 'get_worklog_records', fake_records)
+    engine = _manager(tmp_path).current.engine
+    assert engine.fetch_worklogs()[0] == [_rec(1, 'p')]
+    assert engine.fetch_worklogs() == ([_rec(1, 'p')], False)
+    assert sent == [None, '"v1"']
+
+    # A local edit makes the cache differ from what the ETag validated.
+    monkeypatch.setattr(api_client, 'delete_worklog', lambda token, wid: None)
+    engine.delete_worklog('p-1')
+    engine.fetch_worklogs()
+    assert sent[-1] is None
+
+
+def test_other_spaces_warm_in_the_background_with_bounded_concurrency(monkeypatch, tmp_path, settings):
+    many = [{'id': 'home', 'name': 'Home', 'is_personal': True}] + [{'id': f's{i}', 'name': f'S{i}'} for i in range(6)]
+    monkeypatch.setattr(api_client, 'get_spaces', lambda token, sign_out=None: [dict(s) for s in many])
+    lock = threading.Lock()
+    active, peak, fetched = [0], [0], []
+
+    def fake_records(token, sign_out=None, space_id=None, **_k):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            fetched.append(space_id)
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return [_rec(1, space_id)]
+
+    monkeypatch.setattr(api_client, 'get_worklog_records', fake_records)
+    manager = _manager(tmp_path, max_warm=2)
+    manager.load_spaces()
+    manager.warm_others().result(timeout=5)
+    assert sorted(fetched) == [f's{i}' for i in range(6)]  # not the current space
+    assert peak[0] == 2
+    assert manager.data('s3').store.stats().records == 1
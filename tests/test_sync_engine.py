@@ -0,0 +1,407 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Provide a minimal requests stub so the module imports without network deps
+sys.modules.setdefault('requests', types.SimpleNamespace(HTTPError=Exception))
+
+import pytest
+
+from worklog.services import api_client, sync_engine
+from worklog.services.api_client import NetworkError
+from worklog.services.sync_engine import SyncEngine
+from worklog.stores.log_cache import LogCache
+
+
+def _engine(tmp_path, token='tok'):
+    cache = LogCache(tmp_path / 'cache.sqlite3')
+    return SyncEngine(cache, lambda: token)
+
+
+def _offline(*_a, **_k):
+    raise NetworkError('unreachable')
+
+
+class _ServerResp:
+    """A response as the transport returns it, failing with ``status``."""
+
+    def __init__(self, status, data=None):
+        self.status_code = status
+        self.headers = {}
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            exc = api_client.requests.HTTPError(f'{self.status_code} err')
+            exc.response = self
+            raise exc
+
+
+def _transport(monkeypatch, status, data=None):
+    calls = []
+
+    def send(url, **_k):
+        calls.append(url)
+        return _ServerResp(status[0] if isinstance(status, list) else status, data)
+
+    monkeypatch.setattr(api_client, '_http', lambda: types.SimpleNamespace(get=send, post=send, patch=send, delete=send))
+    return calls
+
+
+def test_fetch_caches_and_serves_offline(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    logs = [{'id': '1', 'record_time': '2025-07-01T10:00:00Z', 'content': 'a'}]
+    monkeypatch.setattr(api_client, 'get_worklog_records', lambda token, sign_out=None, **_k: logs)
+    assert engine.fetch_worklogs() == (logs, False)
+
+    monkeypatch.setattr(api_client, 'get_worklog_records', _offline)
+    cached, from_cache = engine.fetch_worklogs()
+    assert from_cache
+    assert cached == logs
+    assert engine.online is False
+
+
+def test_mutations_queue_while_offline(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    engine.cache.replace_all([{'id': '1', 'record_time': 't', 'content': 'old'}])
+    monkeypatch.setattr(api_client, 'update_worklog', _offline)
+
+    assert engine.update_worklog({'id': '1', 'record_time': 't', '_deleted': False}, 'new') is False
+    assert engine.cache.load_all() == [{'id': '1', 'record_time': 't', 'content': 'new'}]
+    assert engine.cache.pending_count() == 1
+
+    engine.delete_worklog('2')
+    assert [p['op'] for p in engine.cache.pending()] == ['update', 'delete']
+
+
+def test_flush_coalesces_and_replays_in_order(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    engine.set_online(False)
+    engine.update_worklog({'id': '1', 'record_time': 't'}, 'first')
+    engine.update_worklog({'id': '2', 'record_time': 't'}, 'x')
+    engine.update_worklog({'id': '1', 'record_time': 't'}, 'second')
+    engine.delete_worklog('2')
+
+    calls = []
+    monkeypatch.setattr(
+        api_client, 'update_worklog',
+        lambda token, wid, **kw: calls.append(('update', wid, kw['content'])),
+    )
+    monkeypatch.setattr(api_client, 'delete_worklog', lambda token, wid: calls.append(('delete', wid)))
+
+    engine.set_online(True)
+    assert engine.flush() == 2
+    assert calls == [('update', '1', 'second'), ('delete', '2')]
+    assert not engine.has_pending()
+
+
+def test_flush_keeps_queue_on_network_error(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    engine.set_online(False)
+    engine.delete_worklog('1')
+    monkeypatch.setattr(api_client, 'delete_worklog', _offline)
+
+    engine.set_online(True)
+    assert engine.flush() == 0
+    assert engine.cache.pending_count() == 1
+    assert engine.online is False
+
+
+def test_back_online_after_network_error_once_a_retry_succeeds(monkeypatch, tmp_path):
+    now = [0.0]
+    engine = SyncEngine(LogCache(tmp_path / 'cache.sqlite3'), lambda: 'tok', clock=lambda: now[0])
+    logs = [{'id': '1', 'record_time': '2025-07-01T10:00:00Z', 'content': 'a'}]
+    calls = []
+
+    def flaky(token, sign_out=None, **_k):
+        calls.append(now[0])
+        if len(calls) == 1:
+            _ServerResp(503).raise_for_status()
+        return logs
+
+    monkeypatch.setattr(api_client, 'get_worklog_records', flaky)
+    assert engine.fetch_worklogs() == ([], True)
+    assert engine.online is False
+
+    # Not due yet: served from the cache without a request.
+    assert engine.fetch_worklogs() == ([], True)
+    assert calls == [0.0]
+
+    now[0] = sync_engine.RETRY_MIN_SECONDS
+    assert engine.fetch_worklogs() == (logs, False)
+    assert engine.online is True
+    assert len(calls) == 2
+
+
+def test_server_error_keeps_queued_mutations(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    calls = _transport(monkeypatch, 503)
+    engine.create_worklog('draft', '2025-07-01T10:00:00Z')
+    assert engine.flush() == 0
+    assert calls  # the real request path was taken
+    assert engine.cache.pending_count() == 1
+    assert engine.online is False
+    assert [r['content'] for r in engine.cache.load_all()] == ['draft']
+
+
+def test_server_error_on_fetch_serves_the_cache(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    engine.cache.replace_all([{'id': '1', 'record_time': 't', 'content': 'cached'}])
+    _transport(monkeypatch, 503)
+    api_client.invalidate_reads()
+    assert engine.fetch_worklogs() == ([{'id': '1', 'record_time': 't', 'content': 'cached'}], True)
+    assert engine.online is False
+
+
+def test_other_client_errors_drop_the_mutation(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    _transport(monkeypatch, 422)
+    engine.delete_worklog('1')
+    assert engine.cache.pending_count() == 0
+    assert engine.online is True
+
+
+def test_retry_backs_off_while_unreachable(monkeypatch, tmp_path):
+    now = [0.0]
+    engine = SyncEngine(LogCache(tmp_path / 'cache.sqlite3'), lambda: 'tok', clock=lambda: now[0])
+    monkeypatch.setattr(api_client, 'delete_worklog', _offline)
+    engine.delete_worklog('1')
+    assert engine.online is False
+
+    now[0] = sync_engine.RETRY_MIN_SECONDS
+    engine.delete_worklog('2')  # retried with the queue, fails again
+    assert engine.cache.pending_count() == 2
+    now[0] += sync_engine.RETRY_MIN_SECONDS
+    engine.delete_worklog('3')  # the delay doubled: not retried yet
+    monkeypatch.setattr(api_client, 'delete_worklog', lambda token, wid: None)
+    engine.delete_worklog('4')
+    assert engine.cache.pending_count() == 4
+
+    now[0] += sync_engine.RETRY_MIN_SECONDS
+    engine.delete_worklog('5')
+    assert not engine.has_pending() and engine.online is True
+
+
+def test_network_monitor_going_offline_stops_retries(monkeypatch, tmp_path):
+    now = [0.0]
+    engine = SyncEngine(LogCache(tmp_path / 'cache.sqlite3'), lambda: 'tok', clock=lambda: now[0])
+    monkeypatch.setattr(api_client, 'get_worklog_records', _offline)
+    engine.fetch_worklogs()
+    engine.set_online(False)
+
+    monkeypatch.setattr(api_client, 'get_worklog_records', pytest.fail)
+    now[0] = sync_engine.RETRY_MAX_SECONDS
+    assert engine.fetch_worklogs() == ([], True)
+
+
+def test_coalesce_orders_by_last_mutation():
+    pending = [
+        {'seq': 1, 'op': 'update', 'worklog_id': 'a', 'payload': {}},
+        {'seq': 2, 'op': 'update', 'worklog_id': 'b', 'payload': {}},
+        {'seq': 3, 'op': 'delete', 'worklog_id': 'a', 'payload': None},
+    ]
+    merged = sync_engine._coalesce(pending)
+    assert [(m['worklog_id'], m['op'], m['seqs']) for m in merged] == [
+        ('b', 'update', [2]),
+        ('a', 'delete', [1, 3]),
+    ]
+
+
+def test_create_is_local_first_then_synced(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    rec = engine.create_worklog('hello', record_time='2025-07-01T10:00:00Z')
+    local_id = rec['id']
+    assert local_id.startswith('local-')
+    assert engine.cache.load_all() == [rec]
+
+    monkeypatch.setattr(
+        api_client, 'create_worklog',
+        lambda token, **kw: {'id': 'srv1', 'content': kw['content'], 'record_time': kw['record_time']},
+    )
+    assert engine.flush() == 1
+    assert rec['id'] == 'srv1'
+    assert [r['id'] for r in engine.cache.load_all()] == ['srv1']
+
+    deleted = []
+    monkeypatch.setattr(api_client, 'delete_worklog', lambda token, wid: deleted.append(wid))
+    engine.delete_worklog(local_id)
+    assert deleted == ['srv1']
+
+
+def test_create_then_edit_or_delete_before_sync(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    engine.set_online(False)
+    edited = engine.create_worklog('draft', record_time='t')
+    engine.update_worklog(edited, 'final')
+    dropped = engine.create_worklog('oops', record_time='t')
+    engine.delete_worklog(dropped['id'])
+
+    created = []
+    monkeypatch.setattr(
+        api_client, 'create_worklog',
+        lambda token, **kw: created.append(kw['content']) or {'id': 'srv', **kw},
+    )
+    engine.set_online(True)
+    assert engine.flush() == 1
+    assert created == ['final']
+    assert not engine.has_pending()
+
+
+def test_apply_change_skips_queued_edits_and_own_creates(tmp_path):
+    from worklog.services.change_feed import Change
+
+    engine = _engine(tmp_path)
+    engine.set_online(False)
+    remote = {'id': '5', 'record_time': '2025-07-01T10:00:00Z', 'content': 'remote'}
+    assert engine.apply_change(Change('update', '5', dict(remote))) is True
+    assert engine.cache.load_all() == [remote]
+
+    engine.update_worklog(remote, 'local edit')
+    assert engine.apply_change(Change('update', '5', dict(remote, content='other'))) is False
+    assert engine.cache.load_all()[0]['content'] == 'local edit'
+
+    local = engine.create_worklog('mine', record_time='2025-07-02T10:00:00Z')
+    echo = {'id': '9', 'record_time': local['record_time'], 'content': 'mine'}
+    assert engine.apply_change(Change('create', '9', echo)) is False
+
+    assert engine.apply_change(Change('delete', '6')) is True
+
+
+class _Rejected(Exception):
+    def __init__(self, status):
+        super().__init__(f'{status} err')
+        self.response = types.SimpleNamespace(status_code=status)
+
+
+BASE = {'id': '5', 'record_time': '2025-07-01T10:00:00Z', 'content': 'standup\nreview\n',
+        'updated_at': 'v1', 'etag': '"v1"'}
+
+
+def test_update_sends_if_match_and_merges_after_412(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    merged = []
+    engine.on_merged = merged.append
+    calls = []
+
+    def fake_update(token, wid, *, if_match=None, **payload):
+        calls.append((if_match, payload['content']))
+        if if_match == '"v1"':
+            raise _Rejected(412)
+        return dict(payload, id=wid, updated_at='v3')
+
+    server = dict(BASE, content='standup\nreview\nlunch\n', updated_at='v2', etag='"v2"')
+    monkeypatch.setattr(api_client, 'update_worklog', fake_update)
+    monkeypatch.setattr(api_client, 'get_worklog', lambda token, wid: dict(server))
+
+    assert engine.update_worklog(dict(BASE), 'standup 15m\nreview\n') is True
+    assert calls == [('"v1"', 'standup 15m\nreview\n'), ('"v2"', 'standup 15m\nreview\nlunch\n')]
+    assert merged[0]['content'] == 'standup 15m\nreview\nlunch\n'
+    assert engine.cache.load_all()[0]['updated_at'] == 'v3'
+
+
+def test_update_merges_with_version_seen_on_the_feed(monkeypatch, tmp_path):
+    from worklog.services.change_feed import Change
+
+    engine = _engine(tmp_path)
+    engine.set_online(False)
+    base = {k: v for k, v in BASE.items() if k != 'etag'}
+    engine.update_worklog(dict(base), 'standup\nreview PR\n')
+    remote = dict(base, content='standup 9:30\nreview\n', updated_at='v2')
+    assert engine.apply_change(Change('update', '5', remote)) is False
+
+    sent = []
+    monkeypatch.setattr(api_client, 'update_worklog', lambda t, wid, if_match=None, **p: sent.append(p) or p)
+    monkeypatch.setattr(api_client, 'get_worklog', lambda *_a: pytest.fail('merge should not need a GET'))
+    engine.set_online(True)
+    assert engine.flush() == 1
+    assert sent[0]['content'] == 'standup 9:30\nreview PR\n'
+
+
+def test_real_conflicts_go_to_the_handler(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    conflicts = []
+    engine.on_conflict = conflicts.append
+    server = dict(BASE, content='standup\nreview done\n', etag='"v2"')
+    monkeypatch.setattr(api_client, 'update_worklog', lambda t, wid, if_match=None, **p: (_ for _ in ()).throw(_Rejected(412)))
+    monkeypatch.setattr(api_client, 'get_worklog', lambda token, wid: dict(server))
+
+    engine.update_worklog(dict(BASE), 'standup\nreview skipped\n')
+    assert len(conflicts) == 1
+    conflict = conflicts[0]
+    assert conflict.mine == 'standup\nreview skipped\n'
+    assert '<<<<<<< mine' in conflict.merged
+    assert engine.cache.load_all()[0]['content'] == 'standup\nreview done\n'
+    assert not engine.has_pending()
+
+    resolved = []
+    monkeypatch.setattr(api_client, 'update_worklog', lambda t, wid, if_match=None, **p: resolved.append(if_match) or p)
+    assert engine.resolve_conflict(conflict, 'standup\nreview done, skipped tests\n') is True
+    assert resolved == ['"v2"']
+
+
+def test_coalesce_keeps_first_base_and_strips_it_from_creates():
+    merged = sync_engine._coalesce([
+        {'seq': 1, 'op': 'update', 'worklog_id': 'a', 'payload': {'content': 'x', '_base': {'content': 'o'}}},
+        {'seq': 2, 'op': 'update', 'worklog_id': 'a', 'payload': {'content': 'y', '_base': {'content': 'x'}}},
+        {'seq': 3, 'op': 'create', 'worklog_id': 'b', 'payload': {'content': 'n'}},
+        {'seq': 4, 'op': 'update', 'worklog_id': 'b', 'payload': {'content': 'm', '_base': {'content': 'n'}}},
+    ])
+    assert merged[0]['payload'] == {'content': 'y', '_base': {'content': 'o'}}
+    assert merged[1]['payload'] == {'content': 'm'}
+
+
+def test_grid_fetch_is_sparse_and_full_body_loads_on_demand(monkeypatch, tmp_path):
+    engine = _engine(tmp_path)
+    requested = {}
+
+    def fake_records(token, sign_out=None, **params):
+        requested.update(params)
+        return [{'id': '1', 'record_time': '2025-07-01T10:00:00Z', 'content': 'long…', 'content_truncated': True}]
+
+    monkeypatch.setattr(api_client, 'get_worklog_records', fake_records)
+    (rec,), _ = engine.fetch_worklogs()
+    assert requested['fields'] == api_client.GRID_FIELDS and requested['excerpt']
+    with pytest.raises(ValueError):
+        engine.update_worklog(rec, 'edited')
+
+    monkeypatch.setattr(api_client, 'get_worklog', _offline)
+    assert engine.load_full(rec)['content_truncated'] and engine.online is False
+
+    engine.set_online(True)
+    full = {'id': '1', 'record_time': '2025-07-01T10:00:00Z', 'content': 'long text', 'etag': '"v2"'}
+    monkeypatch.setattr(api_client, 'get_worklog', lambda token, wid: dict(full))
+    assert engine.load_full(rec) is rec
+    assert rec == full
+    assert engine.cache.load_all() == [full]
+
+
+def test_warm_starts_the_grid_fetch_unless_edits_are_queued(monkeypatch, tmp_path):
+    import threading
+
+    engine = _engine(tmp_path)
+    calls = []
+    done = threading.Event()
+
+    def fake_records(token, sign_out=None, **params):
+        calls.append(params)
+        done.set()
+        return []
+
+    monkeypatch.setattr(api_client, 'get_worklog_records', fake_records)
+    engine.warm()
+    assert done.wait(5)
+    assert calls == [engine._grid_query()]
+
+    engine.set_online(False)
+    engine.delete_worklog('1')
+    engine.set_online(True)
+    engine.warm()
+    assert len(calls) == 1
@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from worklog.stores.tag_index import TagFilter, TagIndex
+
+
+def _rec(i, tag=None):
+    rec = {'id': str(i), 'record_time': '2025-01-01T10:00:00Z', 'content': 'x'}
+    if tag:
+        rec['tag_id'] = tag
+    return rec
+
+
+def _index():
+    return TagIndex([_rec(1, 'a'), _rec(2, 'b'), _rec(3, 'a'), _rec(4), _rec(5, 'c')])
+
+
+def test_include_single_and_exclude_many():
+    index = _index()
+    assert set(index.ids(index.mask(TagFilter()))) == {'1', '2', '3', '4', '5'}
+    assert set(index.ids(index.mask(TagFilter(include='a')))) == {'1', '3'}
+    assert set(index.ids(index.mask(TagFilter(exclude=frozenset({'a', 'c'}))))) == {'2', '4'}
+    assert set(index.ids(index.mask(TagFilter(include='a', exclude=frozenset({'a'}))))) == set()
+    assert list(index.ids(index.mask(TagFilter(include='missing')))) == []
+    assert index.tags() == [('a', 2), ('b', 1), ('c', 1)]
+
+
+def test_changed_bits_are_only_the_toggled_records():
+    index = _index()
+    before = index.mask(TagFilter())
+    after = index.mask(TagFilter(exclude=frozenset({'a'})))
+    assert set(index.ids(before ^ after)) == {'1', '3'}
+    assert not index.matches('1', after) and index.matches('2', after)
+
+
+def test_add_remove_and_retag():
+    index = _index()
+    index.remove('2')
+    index.add(_rec(1, 'b'))
+    index.add(_rec(6, 'a'))
+    assert '2' not in index and len(index) == 5
+    assert set(index.ids(index.mask(TagFilter(include='a')))) == {'3', '6'}
+    assert set(index.ids(index.mask(TagFilter(include='b')))) == {'1'}
+    assert not TagFilter().active and TagFilter(include='a').active
@@ -0,0 +1,119 @@
+import io
+import json
+import os
+import sys
+import types
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Provide a minimal requests stub so the module imports without network deps
+sys.modules.setdefault('requests', types.SimpleNamespace(HTTPError=Exception))
+
+import pytest
+
+from worklog import cli
+from worklog.services import api_client, telemetry
+from worklog.services.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def state(monkeypatch, tmp_path):
+    monkeypatch.delenv('WORKLOG_TELEMETRY', raising=False)
+    monkeypatch.setattr(telemetry, '_get_state_dir', lambda: tmp_path)
+    assert telemetry.enable()
+    yield tmp_path
+    telemetry.disable()
+
+
+class _Resp:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return {'data': []}
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_endpoints_are_grouped_by_route():
+    base = api_client.API_BASE
+    assert telemetry.endpoint('get', f'{base}/worklogs') == 'GET /worklogs'
+    assert telemetry.endpoint('patch', f'{base}/worklogs/w123') == 'PATCH /worklogs/{id}'
+    assert telemetry.endpoint('post', f'{base}/worklogs/') == 'POST /worklogs'
+    assert telemetry.endpoint('delete', f'{base}/worklogs/AbCdEfGhIjKlMnOpQr') == 'DELETE /worklogs/{id}'
+
+
+def test_requests_and_errors_are_recorded_and_summarised(monkeypatch, state):
+    monkeypatch.setattr(api_client, '_limiter', RateLimiter(sleep=lambda s: None))
+    responses = [_Resp(429, {'Retry-After': '0'}), _Resp(200, {'Content-Length': '512'}), _Resp(500)]
+
+    def get(url, **_kw):
+        return responses.pop(0)
+
+    monkeypatch.setattr(api_client, '_http', lambda: SimpleNamespace(get=get))
+    api_client.get_worklogs('tok')
+    api_client.invalidate_reads()
+    api_client.get_worklogs('tok')
+    telemetry.record_error('main_window.refresh', ValueError('bad payload'))
+
+    events = list(telemetry.read_events())
+    assert [e['kind'] for e in events] == ['request', 'request', 'error']
+    assert events[0]['retries'] == 1 and events[0]['bytes'] == 512
+    summary = telemetry.summarize(events)
+    stats = summary.endpoints['GET /worklogs']
+    assert (stats.count, stats.errors, stats.retries, stats.bytes) == (2, 1, 1, 512)
+    assert summary.errors == {'main_window.refresh: ValueError': 1}
+
+
+def test_nothing_is_recorded_until_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry, '_get_state_dir', lambda: tmp_path)
+    telemetry.record_request('get', '/worklogs', seconds=0.1, status=200)
+    monkeypatch.setenv('WORKLOG_TELEMETRY', '0')
+    assert not telemetry.enable()
+    telemetry.record_error('x', RuntimeError())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_files_rotate_and_are_read_oldest_first(monkeypatch, tmp_path):
+    monkeypatch.setattr(telemetry, 'MAX_FILE_BYTES', 400)
+    telemetry.enable(tmp_path)
+    try:
+        for i in range(40):
+            telemetry.record_request('get', '/worklogs', seconds=i / 1000, status=200)
+    finally:
+        telemetry.disable()
+    assert len(list(tmp_path.glob(telemetry.FILE_NAME + '*'))) == telemetry.BACKUP_COUNT + 1
+    ms = [e['ms'] for e in telemetry.read_events(tmp_path)]
+    assert ms == sorted(ms) and ms[-1] == 39.0 and len(ms) < 40
+
+
+def test_percentiles_use_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert [telemetry.percentile(values, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert telemetry.percentile([7.0], 99) == 7.0
+    assert telemetry.percentile([], 50) == 0.0
+
+
+def test_stats_command_summarises_without_signing_in(monkeypatch, state):
+    for ms in (10, 20, 30, 400):
+        telemetry.record_request('get', f'{api_client.API_BASE}/worklogs', seconds=ms / 1000, status=200)
+    telemetry.record_request('patch', f'{api_client.API_BASE}/worklogs/w1', seconds=0.05, status=None, error='Timeout')
+    monkeypatch.setattr(cli, '_build_engine', lambda args: pytest.fail('stats needs no session'))
+
+    out = io.StringIO()
+    assert cli.main(['stats', '--json'], out=out) == 0
+    doc = json.loads(out.getvalue())
+    assert doc['endpoints']['GET /worklogs']['p50_ms'] == 20
+    assert doc['endpoints']['GET /worklogs']['p99_ms'] == 400
+    assert doc['endpoints']['PATCH /worklogs/{id}']['errors'] == 1
+
+    out = io.StringIO()
+    assert cli.main(['stats'], out=out) == 0
+    table = out.getvalue().splitlines()
+    assert any(line.startswith('GET /worklogs') for line in table)
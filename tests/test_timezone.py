@@ -0,0 +1,71 @@
+import datetime as dt
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from worklog.services import timezone
+from worklog.services.timezone import TimezoneService
+from worklog.stores.log_cache import LogCache
+from worklog.stores.log_store import record_date
+
+
+def test_conversion_follows_dst():
+    tz = TimezoneService('America/New_York')
+    assert tz.time_str('2025-03-09T06:30:00Z') == '01:30'  # EST
+    assert tz.time_str('2025-03-09T07:30:00Z') == '03:30'  # EDT
+    assert tz.time_str('2025-11-02T06:30:00Z') == '01:30'  # back to EST
+
+
+def test_late_evening_logs_land_on_the_local_day():
+    tz = TimezoneService('Asia/Taipei')
+    rec = {'record_time': '2025-07-01T17:00:00Z'}
+    assert record_date(rec, tz) == dt.date(2025, 7, 2)
+    assert record_date(rec, TimezoneService('UTC')) == dt.date(2025, 7, 1)
+    assert record_date({'record_time': 'garbage'}, tz) is None
+
+
+def test_conversions_are_memoized():
+    tz = TimezoneService('Europe/Berlin')
+    for _ in range(3):
+        tz.to_local('2025-07-01T10:00:00Z')
+    info = tz.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_month_bounds_are_local_months_in_utc():
+    assert TimezoneService('Asia/Taipei').month_bounds(2025, 7) == ('2025-06-30T16:00:00', '2025-07-31T16:00:00')
+    assert TimezoneService('UTC').month_bounds(2025, 12) == ('2025-12-01T00:00:00', '2026-01-01T00:00:00')
+
+
+def test_set_zone_validates_notifies_and_persists(monkeypatch, tmp_path):
+    settings = tmp_path / 'settings.json'
+    monkeypatch.setattr(timezone, '_get_settings_path', lambda: settings)
+    monkeypatch.delenv('WORKLOG_TIMEZONE', raising=False)
+    tz = TimezoneService('UTC')
+    calls = []
+    tz.connect(lambda: calls.append(tz.zone_name))
+    with pytest.raises(ValueError):
+        tz.set_zone('Mars/Olympus')
+    tz.set_zone('Asia/Tokyo', persist=True)
+    assert calls == ['Asia/Tokyo']
+    assert tz.time_str('2025-07-01T10:00:00Z') == '19:00'
+    assert json.loads(settings.read_text()) == {'timezone': 'Asia/Tokyo'}
+    assert timezone.load_zone_name() == 'Asia/Tokyo'
+    monkeypatch.setenv('WORKLOG_TIMEZONE', 'Europe/Paris')
+    assert timezone.load_zone_name() == 'Europe/Paris'
+
+
+def test_cache_months_use_local_boundaries(monkeypatch, tmp_path):
+    monkeypatch.setattr(timezone, '_default', TimezoneService('Asia/Taipei'))
+    cache = LogCache(tmp_path / 'cache.sqlite3')
+    cache.replace_all([
+        {'id': '1', 'record_time': '2025-06-30T15:59:00Z', 'content': 'june'},
+        {'id': '2', 'record_time': '2025-06-30T16:00:00Z', 'content': 'july'},
+        {'id': '3', 'record_time': '2025-07-31T16:30:00Z', 'content': 'august'},
+    ])
+    assert [r['content'] for r in cache.load_month(2025, 7)] == ['july']
+    assert [r['content'] for r in cache.load_month(2025, 8)] == ['august']
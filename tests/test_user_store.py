@@ -107,3 +107,52 @@ def test_refresh_on_init(monkeypatch, tmp_path):
     assert called.get('refreshed')
     assert called.get('started')
 
+
+
+def test_refresh_keeps_credentials_when_offline(monkeypatch, tmp_path):
+    monkeypatch.setattr(user_store.Path, "home", lambda: tmp_path)
+    monkeypatch.setenv("WORKLOG_FB_API_KEY", "dummy")
+    store = UserStore(auto_refresh=False)
+    store.sign_in("tid", "rtoken")
+    store._stop_refresh_timer()
+
+    from urllib import error
+
+    def fake_urlopen(req, timeout=10):
+        raise error.URLError("network unreachable")
+
+    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
+    store.refresh_id_token()
+    assert store.offline
+    assert store.token == "tid"
+    assert store._cred_path.exists()
+
+
+def _refresh_failing_with(monkeypatch, tmp_path, status):
+    monkeypatch.setattr(user_store.Path, "home", lambda: tmp_path)
+    monkeypatch.setenv("WORKLOG_FB_API_KEY", "dummy")
+    store = UserStore(auto_refresh=False)
+    store.sign_in("tid", "rtoken")
+    store._stop_refresh_timer()
+
+    from urllib import error
+
+    def fake_urlopen(req, timeout=10):
+        raise error.HTTPError(req.full_url, status, "error", None, None)
+
+    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
+    store.refresh_id_token()
+    return store
+
+
+def test_refresh_stays_signed_in_on_server_error(monkeypatch, tmp_path):
+    store = _refresh_failing_with(monkeypatch, tmp_path, 503)
+    assert store.offline
+    assert store.token == "tid" and store.refresh_token == "rtoken"
+    assert store._cred_path.exists()
+
+
+def test_refresh_signs_out_when_refresh_token_is_rejected(monkeypatch, tmp_path):
+    store = _refresh_failing_with(monkeypatch, tmp_path, 400)
+    assert store.token is None and store.refresh_token is None
+    assert not store._cred_path.exists()
@@ -1,7 +1,17 @@
 """Application setup for Worklog."""
+import logging
 from typing import Optional
 
+from .services import telemetry
+from .services.change_feed import Change, ChangeFeed
+from .services.executor import shutdown_executor
+from .services.markdown import card_text, get_markup_cache
+from .services.memory import IdleTrimmer, trim_process_memory
+from .services.spaces import SpaceData, SpaceManager
+from .services.timezone import get_timezone_service
+from .stores import snapshot
 from .stores.user_store import UserStore
+from .ui.tasks import on_main_thread, run_in_background
 
 try:
     import gi
@@ -14,6 +24,11 @@ except Exception:  # pragma: no cover - gi not installed
     GTK_AVAILABLE = False
 
 
+_log = logging.getLogger(__name__)
+
+_TRIM_CHECK_SECONDS = 60
+
+
 if GTK_AVAILABLE:
 
     class WorklogApplication(Adw.Application):
@@ -22,27 +37,279 @@ if GTK_AVAILABLE:
         def __init__(self):
             super().__init__(application_id="org.worklog")
             self.main_window: Optional[Gtk.Window] = None
+            self._quick_add: Optional[Gtk.Window] = None
             self.user_store = UserStore()
+            # One cache / sync engine / log store per space; the properties
+            # below follow the selected space.
+            self.spaces = SpaceManager(lambda: self.user_store.token, on_created=self._setup_space)
+            self.change_feed = ChangeFeed(
+                lambda: self.user_store.token, self._on_remote_change, on_reset=self._on_feed_reset
+            )
+            self._resident = False
+            self._start_hidden = False
+            self._pending_quick_add = False
+            self._trimmer = IdleTrimmer()
+            self.add_main_option(
+                "daemon", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                "Stay resident in the background for instant reopen", None,
+            )
+            self.add_main_option(
+                "quick-add", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                "Open the quick-add window (e.g. from a global shortcut)", None,
+            )
+            self.connect("handle-local-options", self.on_handle_local_options)
             self.connect("startup", self.on_startup)
             self.connect("activate", self.on_activate)
 
+        @property
+        def sync_engine(self):
+            return self.spaces.current.engine
+
+        @property
+        def log_store(self):
+            return self.spaces.current.store
+
+        def _setup_space(self, data: SpaceData) -> None:
+            data.engine.on_conflict = lambda conflict: self._on_conflict(conflict, data)
+            data.engine.on_merged = lambda rec: self._on_merged(rec, data)
+
+        def on_space_changed(self) -> None:  # pragma: no cover - UI code
+            """The main window switched spaces: point quick add at the new one."""
+            if self._quick_add is not None:
+                self._quick_add.set_sync_engine(self.sync_engine)
+
+        def on_handle_local_options(self, app: Adw.Application, options: GLib.VariantDict) -> int:  # pragma: no cover - UI code
+            """Handle ``--daemon`` / ``--quick-add`` before activation.
+
+            A second invocation only forwards the request to the running
+            (primary) instance over D-Bus and exits.
+            """
+            daemon = options.contains("daemon")
+            quick_add = options.contains("quick-add")
+            if not (daemon or quick_add):
+                return -1
+            self.register(None)
+            if self.get_is_remote():
+                if quick_add:
+                    self.activate_action("quick-add", None)
+                return 0
+            if daemon:
+                self._become_resident()
+                self._start_hidden = not quick_add
+            self._pending_quick_add = quick_add
+            return -1
+
         def on_startup(self, app: Adw.Application) -> None:  # pragma: no cover - UI code
             GLib.set_application_name("Worklog")
             GLib.set_prgname("worklog")
+            telemetry.enable()
+            if self.get_flags() & Gio.ApplicationFlags.IS_SERVICE:
+                # Started by D-Bus activation (``--gapplication-service``).
+                self._become_resident()
+            quick_add = Gio.SimpleAction.new("quick-add", None)
+            quick_add.connect("activate", self.on_quick_add)
+            self.add_action(quick_add)
+            self.set_accels_for_action("app.quick-add", ["<Control><Alt>l"])
+            monitor = Gio.NetworkMonitor.get_default()
+            self.spaces.set_online(monitor.get_network_available())
+            monitor.connect("network-changed", self.on_network_changed)
+            self.connect("shutdown", self.on_shutdown)
+
+        def on_shutdown(self, _app: Adw.Application) -> None:  # pragma: no cover - UI code
+            self.change_feed.stop()
+            self._save_snapshot()
+            # Let edits and deletes already handed to the executor reach the
+            # server (or the offline queue) before the process exits.
+            shutdown_executor()
+
+        def _load_snapshot(self) -> Optional[snapshot.Snapshot]:  # pragma: no cover - UI code
+            """The last session's month, if it shows what the window would show."""
+            snap = snapshot.load()
+            if snap is None or not snap.matches(
+                space_id=self.spaces.current_id, zone=get_timezone_service().label
+            ):
+                return None
+            cache = get_markup_cache()
+            for rec in snap.records:
+                markup = snap.markup.get(str(rec["id"]))
+                if markup is not None:
+                    cache.seed(card_text(rec.get("content") or ""), markup)
+            return snap
+
+        def _save_snapshot(self) -> None:  # pragma: no cover - UI code
+            if self.main_window is None or not self.user_store.token:
+                return
+            try:
+                snap = self.main_window.startup_snapshot()
+                if snap is not None:
+                    snapshot.save(snap)
+            except Exception:
+                _log.exception("saving the startup snapshot failed")
+
+        def _become_resident(self) -> None:  # pragma: no cover - UI code
+            """Keep running with no windows and trim memory while idle."""
+            if self._resident:
+                return
+            self._resident = True
+            self.hold()
+            GLib.timeout_add_seconds(_TRIM_CHECK_SECONDS, self._on_trim_tick)
+
+        def _on_trim_tick(self) -> bool:  # pragma: no cover - UI code
+            if any(win.get_visible() for win in self.get_windows()):
+                self._trimmer.touch()
+            elif self._trimmer.should_trim():
+                self._trim()
+            return True
+
+        def _trim(self) -> None:  # pragma: no cover - UI code
+            """Destroy hidden windows; over budget, also drop data and connections."""
+            self._save_snapshot()
+            for attr in ("main_window", "_quick_add"):
+                win = getattr(self, attr)
+                if win is not None:
+                    win.destroy()
+                    setattr(self, attr, None)
+            if self._trimmer.over_budget():
+                for data in self.spaces.loaded():
+                    data.store.clear()
+                self.sync_engine.trim()
+                get_markup_cache().clear()
+            trim_process_memory()
+            self._trimmer.mark_trimmed()
+
+        def _prefetch(self) -> None:  # pragma: no cover - UI code
+            """Warm the data cache and HTTP connection without showing a window."""
+            if self.user_store.token:
+
+                def fetch() -> None:
+                    self.spaces.load_spaces()
+                    current = self.spaces.current
+                    logs, _from_cache = current.engine.fetch_worklogs()
+                    current.store.replace(logs)
+                    self.spaces.warm_others()
+
+                run_in_background(fetch, name="prefetch")
+                self.change_feed.start()
+
+        def on_quick_add(self, _action: Gio.SimpleAction, _param) -> None:  # pragma: no cover - UI code
+            self._trimmer.touch()
+            if not self.user_store.token:
+                self.activate()
+                return
+            if self._quick_add is None:
+                from .ui.quick_add import QuickAddWindow
+                self._quick_add = QuickAddWindow(
+                    self.sync_engine, on_created=self._on_log_created, application=self
+                )
+            self._quick_add.open()
+
+        def _on_log_created(self, rec) -> None:  # pragma: no cover - UI code
+            if self.main_window is not None and hasattr(self.main_window, "add_local_log"):
+                self.main_window.add_local_log(rec)
+
+        def _on_remote_change(self, change) -> None:  # pragma: no cover - UI code
+            """Feed thread: store a pushed change, then update the window."""
+            data = self.spaces.for_change(change)
+            if data is None or not data.engine.apply_change(change):
+                return
+            if change.op == "delete":
+                data.store.remove(change.worklog_id)
+            else:
+                data.store.upsert(change.record)
+            self._show_change(change, data)
+
+        def _show_change(self, change, data: SpaceData) -> None:  # pragma: no cover - UI code
+            if data is not self.spaces.current:
+                return  # shown when that space is selected
+            if self.main_window is not None and hasattr(self.main_window, "apply_change"):
+                on_main_thread(self.main_window.apply_change, change)
+
+        def _on_merged(self, rec, data: SpaceData) -> None:  # pragma: no cover - UI code
+            """Flush thread: an edit was merged with a concurrent one; show the result."""
+            data.store.upsert(rec)
+            self._show_change(Change("update", rec["id"], rec), data)
+
+        def _on_conflict(self, conflict, data: SpaceData) -> None:  # pragma: no cover - UI code
+            on_main_thread(self._show_conflict, conflict, data)
+
+        def _show_conflict(self, conflict, data: SpaceData) -> bool:  # pragma: no cover - UI code
+            from .ui.conflict_dialog import ConflictDialog
+            self._on_merged(conflict.theirs, data)
+            dialog = ConflictDialog(
+                data.engine, conflict, on_resolved=lambda rec: self._on_merged(rec, data),
+                application=self, transient_for=self.main_window,
+            )
+            dialog.present()
+            return False
+
+        def _on_feed_reset(self) -> None:  # pragma: no cover - UI code
+            if self.main_window is not None and hasattr(self.main_window, "refresh"):
+                on_main_thread(self.main_window.refresh)
+
+        def on_network_changed(self, _monitor: Gio.NetworkMonitor, available: bool) -> None:  # pragma: no cover - UI code
+            was_online = self.sync_engine.online
+            self.spaces.set_online(available)
+            if available:
+                self.change_feed.wake()
+            if available and not was_online:
+                run_in_background(self._resync, name="resync")
+
+        def _resync(self) -> None:  # pragma: no cover - UI code
+            """Back online: refresh the token if needed, replay the queue, reload."""
+            if self.user_store.offline:
+                self.user_store.refresh_id_token()
+            for data in self.spaces.loaded():
+                data.engine.flush()
+            if self.main_window is not None and hasattr(self.main_window, "refresh"):
+                on_main_thread(self.main_window.refresh)
 
         def on_activate(self, app: Adw.Application) -> None:  # pragma: no cover - UI code
+            self._trimmer.touch()
+            if self._start_hidden:
+                self._start_hidden = False
+                self._prefetch()
+                return
+            if self._pending_quick_add and self.user_store.token:
+                self._pending_quick_add = False
+                self.activate_action("quick-add", None)
+                return
             if not self.user_store.token:
                 from .ui.login_window import LoginWindow
                 window = LoginWindow(application=self)
                 window.present()
             else:
-                if self.main_window is None:
-                    from .ui.main_window import MainWindow
-                    self.main_window = MainWindow(self.user_store, application=self)
+                self.show_main_window()
+
+        def show_main_window(self) -> None:  # pragma: no cover - UI code
+            """Present the main window (signed in), creating it if needed."""
+            if self.main_window is None:
+                from .ui.main_window import MainWindow
+                snap = self._load_snapshot()
+                if snap is not None:
+                    # Paint the last session's month straight away; the
+                    # window opens the cache and reconciles after that frame.
+                    self.main_window = MainWindow(
+                        self.user_store, spaces=self.spaces, snapshot=snap, application=self
+                    )
                 else:
-                    if hasattr(self.main_window, "refresh"):
-                        self.main_window.refresh()
+                    # The first fetch starts now and runs while the window is
+                    # built; the window's own refresh joins the request.
+                    self.sync_engine.warm()
+                    self.main_window = MainWindow(
+                        self.user_store,
+                        sync_engine=self.sync_engine,
+                        log_store=self.log_store,
+                        spaces=self.spaces,
+                        application=self,
+                    )
+                self.main_window.set_hide_on_close(self._resident)
+                self.main_window.connect("close-request", lambda *_: self._save_snapshot() or False)
+                self.main_window.present()
+            else:
                 self.main_window.present()
+                if not self.change_feed.running and hasattr(self.main_window, "refresh"):
+                    self.main_window.refresh()
+            self.change_feed.start()
 
 else:
 
@@ -1,10 +1,16 @@
 """Google OAuth helper functions for the Worklog desktop app.
 
-This module runs the InstalledApp (loopback) OAuth flow in the user's default
+This module runs the installed-app (loopback) OAuth flow in the user's default
 browser and returns the Google ID token. It then provides a helper to exchange
 that ID token for Firebase credentials (idToken + refreshToken) via the
 Identity Toolkit `accounts:signInWithIdp` REST endpoint.
 
+The flow is implemented here with the standard library (authorization code +
+PKCE, redirect to ``http.server`` on an ephemeral 127.0.0.1 port), so signing
+in does not import ``google_auth_oauthlib``/``google.auth``.  Set
+``WORKLOG_OAUTH_BACKEND=library`` to use the ``google_auth_oauthlib``
+``InstalledAppFlow`` instead.
+
 Usage:
     from worklog.auth.google import do_google_oauth, exchange_google_to_firebase
 
@@ -22,11 +28,17 @@ Configuration:
 
 from __future__ import annotations
 
+import base64
+import hashlib
 import json
+import os
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
-from typing import Tuple
-
-import requests
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
 
 # Scopes required to receive an ID token that includes the user's identity.
 # Use the canonical userinfo scope URIs to avoid scope mismatch warnings.
@@ -39,6 +51,20 @@ SCOPES = [
 # Location where the user should drop the downloaded *Desktop app* client JSON.
 _GOOGLE_OAUTH_PATH = Path.home() / ".config" / "worklog" / "google_oauth_client.json"
 
+AUTH_URI = "https://accounts.google.com/o/oauth2/auth"
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+_LOGIN_TIMEOUT = 300  # seconds to wait for the browser redirect
+_POLL_SECONDS = 0.25  # how often a waiting flow checks for cancellation
+
+_DONE_PAGE = (
+    b"<!doctype html><meta charset='utf-8'><title>Worklog</title>"
+    b"<p>Sign-in complete. You can close this tab and return to Worklog.</p>"
+)
+
+
+class OAuthCancelled(RuntimeError):
+    """The sign-in was cancelled before the browser redirected back."""
+
 
 def _client_secrets_path() -> Path:
     """Return the path to the client_secret JSON; raise if missing."""
@@ -51,13 +77,164 @@ def _client_secrets_path() -> Path:
     )
 
 
-def do_google_oauth() -> Tuple[str, str | None]:
+def _use_library() -> bool:
+    return os.getenv("WORKLOG_OAUTH_BACKEND", "").lower() == "library"
+
+
+def prewarm() -> None:
+    """Import what sign-in needs ahead of the click (call from a worker thread)."""
+    if _use_library():
+        try:
+            import google_auth_oauthlib.flow  # noqa: F401
+            import google.auth.transport.requests  # noqa: F401
+        except ImportError:
+            pass
+    else:
+        import urllib.request  # noqa: F401
+        import webbrowser  # noqa: F401
+
+
+def do_google_oauth(cancel: Optional[threading.Event] = None) -> Tuple[str, str | None]:
+    """Sign in with Google in the browser; return (google_id_token, google_refresh_token?).
+
+    Setting ``cancel`` aborts a native flow that is waiting for the browser
+    (raising :class:`OAuthCancelled`).  The library flow cannot be
+    interrupted, so its caller should simply discard the result.
+    """
+    if not _use_library():
+        return native_oauth(cancel=cancel)
+    return _library_oauth()
+
+
+# ── Native loopback flow ─────────────────────────────────────────────
+def pkce_pair() -> Tuple[str, str]:
+    """Return a PKCE ``(code_verifier, S256 code_challenge)`` (RFC 7636)."""
+    verifier = secrets.token_urlsafe(64)
+    digest = hashlib.sha256(verifier.encode("ascii")).digest()
+    challenge = base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+    return verifier, challenge
+
+
+class _RedirectHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        query = parse_qs(urlparse(self.path).query)
+        if "code" not in query and "error" not in query:
+            self.send_error(404)  # e.g. /favicon.ico
+            return
+        self.server.result = {k: v[0] for k, v in query.items()}  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(_DONE_PAGE)))
+        self.end_headers()
+        self.wfile.write(_DONE_PAGE)
+
+    def log_message(self, *_args: Any) -> None:
+        pass
+
+
+def _wait_for_redirect(
+    server: HTTPServer, cancel: Optional[threading.Event], timeout: float
+) -> Dict[str, str]:
+    server.timeout = _POLL_SECONDS
+    deadline = time.monotonic() + timeout
+    while server.result is None:  # type: ignore[attr-defined]
+        if cancel is not None and cancel.is_set():
+            raise OAuthCancelled("sign-in cancelled")
+        if time.monotonic() > deadline:
+            raise RuntimeError("Timed out waiting for the browser sign-in.")
+        server.handle_request()
+    return server.result  # type: ignore[attr-defined]
+
+
+def _post_form(url: str, data: Mapping[str, str]) -> Dict[str, Any]:
+    import urllib.error
+    import urllib.request
+
+    req = urllib.request.Request(
+        url,
+        data=urlencode(data).encode("ascii"),
+        headers={"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as exc:
+        detail = exc.read().decode("utf-8", "replace")[:200]
+        raise RuntimeError(f"Google token exchange failed ({exc.code}): {detail}") from exc
+
+
+def native_oauth(
+    cancel: Optional[threading.Event] = None,
+    *,
+    client: Optional[Mapping[str, str]] = None,
+    open_browser: Optional[Callable[[str], Any]] = None,
+    timeout: float = _LOGIN_TIMEOUT,
+) -> Tuple[str, str | None]:
+    """Authorization code + PKCE flow with a loopback redirect.
+
+    ``client`` defaults to :func:`~worklog.auth.firebase.load_google_oauth_client`
+    (``client_id``, optional ``client_secret``, ``auth_uri``, ``token_uri``).
+    """
+    if client is None:
+        from .firebase import load_google_oauth_client
+
+        client = load_google_oauth_client()
+    if open_browser is None:
+        import webbrowser
+
+        open_browser = webbrowser.open
+
+    verifier, challenge = pkce_pair()
+    state = secrets.token_urlsafe(24)
+    server = HTTPServer(("127.0.0.1", 0), _RedirectHandler)
+    server.result = None  # type: ignore[attr-defined]
+    try:
+        redirect_uri = f"http://127.0.0.1:{server.server_address[1]}/"
+        params = {
+            "response_type": "code",
+            "client_id": client["client_id"],
+            "redirect_uri": redirect_uri,
+            "scope": " ".join(SCOPES),
+            "state": state,
+            "code_challenge": challenge,
+            "code_challenge_method": "S256",
+            "access_type": "offline",
+        }
+        open_browser(f"{client.get('auth_uri') or AUTH_URI}?{urlencode(params)}")
+        result = _wait_for_redirect(server, cancel, timeout)
+    finally:
+        server.server_close()
+
+    if result.get("state") != state:
+        raise RuntimeError("Google sign-in returned an unexpected state; please try again.")
+    if "error" in result:
+        raise RuntimeError(f"Google sign-in failed: {result['error']}")
+
+    form = {
+        "grant_type": "authorization_code",
+        "code": result["code"],
+        "code_verifier": verifier,
+        "client_id": client["client_id"],
+        "redirect_uri": redirect_uri,
+    }
+    if client.get("client_secret"):
+        # Google still expects the (non-confidential) desktop client secret.
+        form["client_secret"] = client["client_secret"]
+    tokens = _post_form(client.get("token_uri") or TOKEN_URI, form)
+    google_id_token = tokens.get("id_token")
+    if not google_id_token:
+        raise RuntimeError("Google OAuth succeeded but ID token missing.")
+    return google_id_token, tokens.get("refresh_token")
+
+
+# ── google_auth_oauthlib flow (optional) ─────────────────────────────
+def _library_oauth() -> Tuple[str, str | None]:
     """Run the InstalledAppFlow and return (google_id_token, google_refresh_token?)."""
     from google_auth_oauthlib.flow import InstalledAppFlow  # import locally to avoid heavy import cost
     from google.auth.transport.requests import Request as GARequest
 
-    secrets = _client_secrets_path()
-    flow = InstalledAppFlow.from_client_secrets_file(str(secrets), SCOPES)
+    secrets_path = _client_secrets_path()
+    flow = InstalledAppFlow.from_client_secrets_file(str(secrets_path), SCOPES)
     # Opens the system browser and spins up a local HTTP server on a free port (port=0).
     creds = flow.run_local_server(port=0, open_browser=True)
 
@@ -95,6 +272,8 @@ def exchange_google_to_firebase(api_key: str, google_id_token: str) -> Tuple[str
         "postBody": f"id_token={google_id_token}&providerId=google.com",
         "returnSecureToken": True,
     }
+    import requests  # deferred: not needed until the browser step is done
+
     resp = requests.post(url, json=payload, timeout=10)
     resp.raise_for_status()
     data = resp.json()
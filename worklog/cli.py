@@ -0,0 +1,251 @@
+"""Headless command-line front-end (``worklog list|search|add|edit|export|stats``).
+
+Shares the data path of the desktop app -- ``api_client``, ``UserStore`` and
+the on-disk ``LogCache`` via ``SyncEngine`` -- but never imports GTK, so it
+starts quickly and can be used from scripts.  Records are written to stdout
+as JSON Lines (one JSON object per line); ``stats`` prints a table.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import csv
+import datetime as _dt
+import json
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, TextIO
+
+from .services import telemetry
+from .services.ingest import is_partial
+from .stores.log_store import record_date
+
+COMMANDS = ("list", "search", "add", "edit", "export", "stats")
+
+
+def _parse_month(value: str) -> _dt.date:
+    try:
+        return _dt.datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}") from None
+
+
+def _in_month(rec: Mapping[str, Any], month: Optional[_dt.date]) -> bool:
+    if month is None:
+        return True
+    d = record_date(rec)
+    return d is not None and (d.year, d.month) == (month.year, month.month)
+
+
+def _sorted(logs: Iterable[Mapping[str, Any]]) -> List[Mapping[str, Any]]:
+    return sorted(logs, key=lambda r: r["record_time"], reverse=True)
+
+
+def _write_jsonl(records: Iterable[Mapping[str, Any]], out: TextIO) -> None:
+    for rec in records:
+        out.write(json.dumps(rec, ensure_ascii=False))
+        out.write("\n")
+
+
+def _build_engine(args: argparse.Namespace) -> Any:
+    """Create a SyncEngine for the selected space, backed by that space's disk
+    cache and the stored credentials."""
+    from .services.spaces import load_last_space
+    from .services.sync_engine import SyncEngine
+    from .stores.log_cache import LogCache, space_cache_path
+    from .stores.user_store import UserStore
+
+    store = UserStore(auto_refresh=False)
+    if not store.refresh_token:
+        raise RuntimeError("Not signed in; sign in with the desktop app first")
+    # Reuse the persisted ID token while it is valid so most invocations skip
+    # the token-refresh round trip.
+    if not args.offline and _token_expired(store.token):
+        store.refresh_id_token()
+        if not store.token:
+            raise RuntimeError("Session expired; sign in with the desktop app again")
+    # The space last selected in the app unless --space names another.
+    space_id = args.space or load_last_space()
+    engine = SyncEngine(LogCache(space_cache_path(space_id)), lambda: store.token, space_id=space_id)
+    if args.offline or store.offline:
+        engine.set_online(False)
+    return engine
+
+
+def _token_expired(token: Optional[str], leeway: int = 60) -> bool:
+    """Return ``True`` if the JWT ``exp`` claim is past (or unreadable)."""
+    if not token:
+        return True
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"]) <= time.time() + leeway
+    except Exception:
+        return True
+
+
+def _load(engine: Any) -> List[Dict[str, Any]]:
+    logs, _from_cache = engine.fetch_worklogs(full=True)
+    return logs
+
+
+# ── Commands ─────────────────────────────────────────────────────────
+def cmd_list(args: argparse.Namespace, engine: Any, out: TextIO) -> int:
+    _write_jsonl(_sorted(r for r in _load(engine) if _in_month(r, args.month)), out)
+    return 0
+
+
+def cmd_search(args: argparse.Namespace, engine: Any, out: TextIO) -> int:
+    needle = args.query.casefold()
+    matches = (
+        r for r in _load(engine)
+        if needle in r["content"].casefold() and _in_month(r, args.month)
+    )
+    _write_jsonl(_sorted(matches), out)
+    return 0
+
+
+def cmd_add(args: argparse.Namespace, engine: Any, out: TextIO) -> int:
+    content = args.content if args.content != "-" else sys.stdin.read()
+    rec = engine.create_worklog(content.strip(), record_time=args.time, tag_id=args.tag)
+    if engine.online:
+        engine.flush()
+    _write_jsonl([rec], out)
+    return 0
+
+
+def cmd_edit(args: argparse.Namespace, engine: Any, out: TextIO) -> int:
+    rec = next((r for r in engine.cache.load_all() if r["id"] == args.id), None)
+    if rec is None:
+        rec = next((r for r in _load(engine) if r["id"] == args.id), None)
+    if rec is None:
+        print(f"worklog: no log with id {args.id}", file=sys.stderr)
+        return 1
+    if is_partial(engine.load_full(rec)):
+        print(f"worklog: log {args.id} is only cached as an excerpt; connect to edit it", file=sys.stderr)
+        return 1
+    content = args.content if args.content != "-" else sys.stdin.read()
+    engine.update_worklog(rec, content.strip())
+    _write_jsonl([dict(rec, content=content.strip())], out)
+    return 0
+
+
+def cmd_export(args: argparse.Namespace, engine: Any, out: TextIO) -> int:
+    records = _sorted(r for r in _load(engine) if _in_month(r, args.month))
+    dest = open(args.output, "w", encoding="utf-8", newline="") if args.output else out
+    try:
+        if args.format == "jsonl":
+            _write_jsonl(records, dest)
+        elif args.format == "json":
+            json.dump(records, dest, ensure_ascii=False, indent=2)
+            dest.write("\n")
+        else:
+            fields = ["id", "record_time", "content", "tag_id"]
+            writer = csv.DictWriter(dest, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(records)
+    finally:
+        if dest is not out:
+            dest.close()
+    return 0
+
+
+def cmd_stats(args: argparse.Namespace, _engine: Any, out: TextIO) -> int:
+    summary = telemetry.summarize(telemetry.read_events())
+    if args.json:
+        doc = {
+            "since": summary.since,
+            "endpoints": {
+                name: {
+                    "count": s.count, "errors": s.errors, "retries": s.retries, "bytes": s.bytes,
+                    **{f"p{p}_ms": v for p, v in s.percentiles().items()},
+                }
+                for name, s in summary.endpoints.items()
+            },
+            "errors": summary.errors,
+        }
+        out.write(json.dumps(doc, ensure_ascii=False, indent=2) + "\n")
+        return 0
+    if not summary.endpoints and not summary.errors:
+        out.write("No telemetry recorded yet.\n")
+        return 0
+    if summary.since is not None:
+        since = _dt.datetime.fromtimestamp(summary.since).strftime("%Y-%m-%d %H:%M")
+        out.write(f"Since {since}\n\n")
+    width = max([len("endpoint")] + [len(name) for name in summary.endpoints])
+    out.write(f"{'endpoint':<{width}}  count errors retries   p50 ms   p95 ms   p99 ms      KiB\n")
+    for name, s in sorted(summary.endpoints.items(), key=lambda item: -item[1].count):
+        p = s.percentiles()
+        out.write(
+            f"{name:<{width}}  {s.count:5d} {s.errors:6d} {s.retries:7d}"
+            f" {p[50]:8.1f} {p[95]:8.1f} {p[99]:8.1f} {s.bytes / 1024:8.0f}\n"
+        )
+    if summary.errors:
+        out.write("\nerrors\n")
+        for where, count in sorted(summary.errors.items(), key=lambda item: -item[1]):
+            out.write(f"  {count:5d}  {where}\n")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--offline", action="store_true", help="read from the local cache and queue changes"
+    )
+    common.add_argument(
+        "--space", metavar="ID", help="space to use (default: the one last selected in the app)"
+    )
+    common.add_argument(
+        "--tz", metavar="ZONE", help="IANA time zone for --month and dates (default: saved or system)"
+    )
+    parser = argparse.ArgumentParser(prog="worklog", description="Worklog command-line client")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", parents=[common], help="list logs, newest first")
+    p.add_argument("--month", type=_parse_month, help="only logs from this month (YYYY-MM)")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("search", parents=[common], help="case-insensitive search in log content")
+    p.add_argument("query")
+    p.add_argument("--month", type=_parse_month, help="only logs from this month (YYYY-MM)")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("add", parents=[common], help="create a log ('-' reads content from stdin)")
+    p.add_argument("content")
+    p.add_argument("--time", help="ISO8601 record time (default: now)")
+    p.add_argument("--tag", help="tag id")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("edit", parents=[common], help="replace a log's content ('-' reads from stdin)")
+    p.add_argument("id")
+    p.add_argument("content")
+    p.set_defaults(func=cmd_edit)
+
+    p = sub.add_parser("export", parents=[common], help="export logs as JSON Lines, JSON or CSV")
+    p.add_argument("--format", choices=("jsonl", "json", "csv"), default="jsonl")
+    p.add_argument("--month", type=_parse_month, help="only logs from this month (YYYY-MM)")
+    p.add_argument("-o", "--output", help="write to a file instead of stdout")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("stats", help="summarise recorded request latencies and errors")
+    p.add_argument("--json", action="store_true", help="print the summary as JSON")
+    p.set_defaults(func=cmd_stats, needs_engine=False, tz=None)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, out: TextIO = sys.stdout) -> int:
+    args = build_parser().parse_args(argv)
+    telemetry.enable()
+    try:
+        if args.tz:
+            from .services.timezone import get_timezone_service
+            get_timezone_service().set_zone(args.tz)
+        engine = _build_engine(args) if getattr(args, "needs_engine", True) else None
+        return args.func(args, engine, out)
+    except BrokenPipeError:  # e.g. `worklog list | head`
+        return 0
+    except Exception as exc:
+        telemetry.record_error(f"cli.{args.command}", exc)
+        print(f"worklog: {exc}", file=sys.stderr)
+        return 1
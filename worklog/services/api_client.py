@@ -2,12 +2,213 @@
 
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, Optional
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
 
 import requests
 
+from . import ingest, telemetry
+from .ingest import LogRecord
+from .rate_limit import LimiterMetrics, RateLimiter, parse_retry_after
+
 API_BASE = "https://work-log.cc/api"
 
+# What the month grid needs from /worklogs; the editor fetches the rest of a
+# log (see :func:`get_worklog`) when it is opened.
+GRID_FIELDS = ("id", "record_time", "tag_id", "updated_at", "content")
+EXCERPT_CHARS = 280
+
+
+def _accept_encoding() -> str:
+    """Every content coding urllib3 can decode here (gzip, deflate, br, zstd)."""
+    try:
+        from urllib3.util import make_headers
+
+        return make_headers(accept_encoding=True)["accept-encoding"]
+    except Exception:
+        return "gzip, deflate"
+
+
+_session: Optional[requests.Session] = None
+
+
+def _http() -> requests.Session:
+    """Return the shared session so keep-alive connections stay warm."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers["Accept-Encoding"] = _accept_encoding()
+    return _session
+
+
+def close_session() -> None:
+    """Close pooled connections (e.g. when the resident app trims memory)."""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+    invalidate_reads()
+
+
+class NetworkError(RuntimeError):
+    """Raised when the backend cannot be reached (offline, DNS, timeout)."""
+
+
+class NotModified(Exception):
+    """A conditional read found the data unchanged (``304 Not Modified``)."""
+
+
+class RecordList(list):
+    """Worklog records plus the response ``ETag`` (for ``if_none_match``)."""
+
+    etag: Optional[str] = None
+
+
+# ── Read coalescing ──────────────────────────────────────────────────
+# Identical GETs issued while one is in flight wait for it and share its
+# result; list reads are also remembered for a moment to absorb bursts
+# (activation, prefetch and a refresh all asking for the same data).
+MEMO_TTL = 2.0
+
+_flights_lock = threading.Lock()
+_flights: Dict[Hashable, "_Flight"] = {}
+# key -> (expiry on the monotonic clock, result)
+_memo: Dict[Hashable, Tuple[float, Any]] = {}
+# Bumped by invalidate_reads(); a read that started before a write is shared
+# with the callers already waiting for it but never remembered.
+_generation = 0
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "generation")
+
+    def __init__(self, generation: int) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.generation = generation
+
+
+def _request_key(url: str, token: str, params: Dict[str, Any]) -> Hashable:
+    return url, token, tuple(sorted((k, repr(v)) for k, v in params.items()))
+
+
+def _share(value: Any) -> Any:
+    """Copy ``value`` deep enough that callers can edit records freely."""
+    if isinstance(value, RecordList):
+        copy = RecordList(_share(item) for item in value)
+        copy.etag = value.etag
+        return copy
+    if isinstance(value, list):
+        return [_share(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _share(v) if isinstance(v, (list, dict)) else v for k, v in value.items()}
+    return value
+
+
+def _coalesced(key: Hashable, fetch: Callable[[], Any], *, ttl: float = 0.0) -> Any:
+    """Run ``fetch`` once for concurrent callers with the same ``key``.
+
+    Every caller gets its own copy of the result.  With ``ttl`` the result
+    is also reused for calls within ``ttl`` seconds; errors are never kept,
+    nor is a result fetched across an :func:`invalidate_reads`.
+    """
+    with _flights_lock:
+        if ttl:
+            hit = _memo.get(key)
+            if hit is not None and time.monotonic() < hit[0]:
+                return _share(hit[1])
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight(_generation)
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return _share(flight.result)
+    try:
+        flight.result = fetch()
+    except BaseException as exc:
+        flight.error = exc
+        raise
+    else:
+        if ttl:
+            with _flights_lock:
+                if flight.generation == _generation:
+                    now = time.monotonic()
+                    for stale in [k for k, (expiry, _) in _memo.items() if expiry <= now]:
+                        del _memo[stale]
+                    _memo[key] = (now + ttl, flight.result)
+    finally:
+        with _flights_lock:
+            if _flights.get(key) is flight:
+                del _flights[key]
+        flight.done.set()
+    return _share(flight.result)
+
+
+def invalidate_reads() -> None:
+    """Forget remembered reads (after a write, or on sign-out).
+
+    Reads already in flight are not joined by later callers.
+    """
+    global _generation
+    with _flights_lock:
+        _generation += 1
+        _memo.clear()
+        _flights.clear()
+
+
+# Every request is paced by one limiter; a 429 is retried after its
+# ``Retry-After`` (or the limiter's own backoff) at most this many times.
+_MAX_THROTTLE_RETRIES = 2
+_limiter = RateLimiter()
+
+
+def limiter_metrics() -> LimiterMetrics:
+    """Queueing and throttling counters of the shared rate limiter."""
+    return _limiter.metrics()
+
+
+def _send(method: Callable[..., requests.Response], url: str, **kwargs: Any) -> requests.Response:
+    """Call ``method`` translating connection failures into :class:`NetworkError`.
+
+    Calls wait for the rate limiter, and ``429 Too Many Requests`` responses
+    are retried once the server's ``Retry-After`` has passed.  Each call is
+    recorded in :mod:`.telemetry` (time including pacing and retries).
+    """
+    verb = getattr(method, "__name__", "request")
+    first = time.monotonic()
+    for attempt in range(_MAX_THROTTLE_RETRIES + 1):
+        with _limiter.slot():
+            started = time.monotonic()
+            try:
+                resp = method(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                _limiter.observe(time.monotonic() - started, None)
+                telemetry.record_request(
+                    verb, url, seconds=time.monotonic() - first, status=None,
+                    retries=attempt, error=type(exc).__name__,
+                )
+                raise NetworkError(str(exc)) from exc
+            status = getattr(resp, "status_code", None)
+            headers = getattr(resp, "headers", {})
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            _limiter.observe(time.monotonic() - started, status, retry_after)
+        if status != 429 or attempt == _MAX_THROTTLE_RETRIES:
+            length = headers.get("Content-Length")
+            telemetry.record_request(
+                verb, url, seconds=time.monotonic() - first, status=status, retries=attempt,
+                size=int(length) if length and str(length).isdigit() else None,
+            )
+            return resp
+        close = getattr(resp, "close", None)
+        if close is not None:
+            close()
+    return resp
+
 
 def _handle_auth(resp: requests.Response, sign_out: Optional[Callable[[], None]] = None) -> None:
     """Trigger sign out if response indicates authentication failure."""
@@ -29,8 +230,157 @@ def get_worklogs(token: str, *, sign_out: Optional[Callable[[], None]] = None, *
         Query parameters forwarded to the API.
     """
     url = f"{API_BASE}/worklogs"
-    headers = {"Authorization": f"Bearer {token}"}
-    resp = requests.get(url, headers=headers, params=params, timeout=10)
+
+    def fetch() -> Dict[str, Any]:
+        headers = {"Authorization": f"Bearer {token}"}
+        resp = _send(_http().get, url, headers=headers, params=params, timeout=10)
+        _handle_auth(resp, sign_out)
+        resp.raise_for_status()
+        return resp.json()
+
+    return _coalesced(("json",) + _request_key(url, token, params), fetch, ttl=MEMO_TTL)
+
+
+def get_worklog_records(
+    token: str,
+    *,
+    fields: Optional[Sequence[str]] = None,
+    excerpt: Optional[int] = None,
+    if_none_match: Optional[str] = None,
+    sign_out: Optional[Callable[[], None]] = None,
+    **params: Any,
+) -> RecordList:
+    """Return validated worklog records from the backend.
+
+    Unlike :func:`get_worklogs` the body is decoded by :mod:`.ingest` (fast
+    JSON backend, streamed for large responses) and every item is validated
+    into a :class:`~.ingest.LogRecord`; malformed items are skipped.
+
+    ``fields`` asks for only those fields and ``excerpt`` for content cut to
+    that many characters (flagged with ``content_truncated``).  A server that
+    ignores either simply returns full records.
+
+    The result carries the response ``ETag``; passing it back as
+    ``if_none_match`` raises :class:`NotModified` if nothing has changed.
+    """
+    url = f"{API_BASE}/worklogs"
+    if fields:
+        params["fields"] = ",".join(fields)
+    if excerpt:
+        params["excerpt"] = int(excerpt)
+
+    def fetch() -> RecordList:
+        headers = {"Authorization": f"Bearer {token}"}
+        if if_none_match:
+            headers["If-None-Match"] = if_none_match
+        resp = _send(_http().get, url, headers=headers, params=params, timeout=10, stream=True)
+        try:
+            _handle_auth(resp, sign_out)
+            if resp.status_code == 304:
+                raise NotModified(url)
+            resp.raise_for_status()
+            records = RecordList(ingest.parse_worklogs_response(resp))
+            records.etag = getattr(resp, "headers", {}).get("ETag")
+            return records
+        finally:
+            resp.close()
+
+    key = ("records", if_none_match) + _request_key(url, token, params)
+    return _coalesced(key, fetch, ttl=MEMO_TTL)
+
+
+def get_worklog(
+    token: str, worklog_id: str, *, sign_out: Optional[Callable[[], None]] = None
+) -> Optional[LogRecord]:
+    """Return the server's current copy of one worklog (``None`` if deleted).
+
+    The response ``ETag``, when the server sends one, is kept in the record's
+    ``etag`` field for use as an ``If-Match`` precondition.
+    """
+    url = f"{API_BASE}/worklogs/{worklog_id}"
+
+    def fetch() -> Optional[LogRecord]:
+        headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+        resp = _send(_http().get, url, headers=headers, timeout=10)
+        _handle_auth(resp, sign_out)
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        body = resp.json()
+        if isinstance(body, dict) and isinstance(body.get("data"), dict):
+            body = body["data"]
+        rec = ingest.to_log_record(body)
+        etag = getattr(resp, "headers", {}).get("ETag")
+        if rec is not None and etag:
+            rec["etag"] = etag
+        return rec
+
+    # Deduplicated but never remembered: conflict handling needs a fresh ETag.
+    return _coalesced(("one",) + _request_key(url, token, {}), fetch)
+
+
+def get_spaces(token: str, *, sign_out: Optional[Callable[[], None]] = None) -> List[Dict[str, Any]]:
+    """Return the spaces the user belongs to (SPEC §5.2), ids as strings.
+
+    A backend without spaces (``404``) yields an empty list.
+    """
+    url = f"{API_BASE}/spaces"
+
+    def fetch() -> List[Dict[str, Any]]:
+        headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+        resp = _send(_http().get, url, headers=headers, timeout=10)
+        _handle_auth(resp, sign_out)
+        if resp.status_code == 404:
+            return []
+        resp.raise_for_status()
+        body = resp.json()
+        if isinstance(body, dict):
+            body = body.get("data") or body.get("spaces") or []
+        return [
+            {**item, "id": str(item["id"])}
+            for item in body
+            if isinstance(item, dict) and item.get("id") not in (None, "")
+        ]
+
+    return _coalesced(("spaces",) + _request_key(url, token, {}), fetch, ttl=MEMO_TTL)
+
+
+def create_worklog(
+    token: str,
+    *,
+    content: str,
+    record_time: str,
+    tag_id: str = None,
+    space_id: Optional[str] = None,
+    sign_out: Optional[Callable[[], None]] = None,
+) -> Dict[str, Any]:
+    """POST a new worklog entry and return the created record.
+
+    Parameters
+    ----------
+    token: Bearer token
+    content: log content (Markdown)
+    record_time: ISO8601 string
+    tag_id: (optional) tag id
+    space_id: (optional) space to create it in; the personal space otherwise
+    sign_out: optional callback for 401/403
+    """
+    url = f"{API_BASE}/worklogs/"
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+        "Accept": "application/json, text/plain, */*",
+    }
+    data = {
+        "content": content,
+        "record_time": record_time,
+    }
+    if tag_id:
+        data["tag_id"] = tag_id
+    if space_id:
+        data["space_id"] = space_id
+    resp = _send(_http().post, url, headers=headers, json=data, timeout=10)
+    invalidate_reads()
     _handle_auth(resp, sign_out)
     resp.raise_for_status()
     return resp.json()
@@ -43,6 +393,7 @@ def update_worklog(
     content: str,
     record_time: str,
     tag_id: str = None,
+    if_match: Optional[str] = None,
     sign_out: Optional[Callable[[], None]] = None,
 ) -> Dict[str, Any]:
     """PATCH update a single worklog entry.
@@ -54,6 +405,8 @@ def update_worklog(
     content: new content
     record_time: ISO8601 string
     tag_id: (optional) tag id
+    if_match: (optional) ETag the server copy must still have; a mismatch
+        fails with 412 instead of overwriting a concurrent edit
     sign_out: optional callback for 401/403
     """
     url = f"{API_BASE}/worklogs/{worklog_id}"
@@ -62,16 +415,18 @@ def update_worklog(
         "Content-Type": "application/json",
         "Accept": "application/json, text/plain, */*",
     }
+    if if_match:
+        headers["If-Match"] = if_match
     data = {
         "content": content,
         "record_time": record_time,
     }
     if tag_id:
         data["tag_id"] = tag_id
-    resp = requests.patch(url, headers=headers, json=data, timeout=10)
+    resp = _send(_http().patch, url, headers=headers, json=data, timeout=10)
+    invalidate_reads()
     _handle_auth(resp, sign_out)
     resp.raise_for_status()
-    print(resp.json())
     return resp.json()
 
 
@@ -94,7 +449,8 @@ def delete_worklog(
         "Authorization": f"Bearer {token}",
         "Accept": "application/json, text/plain, */*",
     }
-    resp = requests.delete(url, headers=headers, timeout=10)
+    resp = _send(_http().delete, url, headers=headers, timeout=10)
+    invalidate_reads()
     _handle_auth(resp, sign_out)
     resp.raise_for_status()
     # 通常刪除不回傳內容
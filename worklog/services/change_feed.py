@@ -0,0 +1,288 @@
+"""Push-based change feed for worklogs (Server-Sent Events).
+
+The backend streams ``create``/``update``/``delete`` events for the signed-in
+user; :class:`ChangeFeed` keeps a long-lived connection open on a background
+thread and hands each event to a callback as a :class:`Change`, so edits made
+on other devices show up without re-downloading every log.  Dropped
+connections are retried with jittered exponential backoff, resuming from the
+last seen event id via ``Last-Event-ID``.
+
+SSE is plain HTTP, so the stream is read with :mod:`http.client` and needs no
+extra dependency.
+"""
+
+from __future__ import annotations
+
+import http.client
+import logging
+import os
+import random
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+from . import telemetry
+from .api_client import API_BASE
+from .ingest import LogRecord, loads, to_log_record
+
+_log = logging.getLogger(__name__)
+
+# Servers send a comment line at least this often; silence means a dead link.
+_READ_TIMEOUT = 90.0
+
+_OPS = {
+    "create": "create", "created": "create", "worklog.created": "create",
+    "update": "update", "updated": "update", "worklog.updated": "update",
+    "delete": "delete", "deleted": "delete", "worklog.deleted": "delete",
+}
+
+
+def events_url() -> str:
+    """Feed endpoint; ``WORKLOG_EVENTS_URL`` overrides the default."""
+    return os.getenv("WORKLOG_EVENTS_URL") or f"{API_BASE}/worklogs/events"
+
+
+@dataclass(frozen=True)
+class SSEMessage:
+    event: str
+    data: str
+    id: Optional[str] = None
+    retry: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Change:
+    """A server-side mutation.  ``record`` is ``None`` for deletes.
+
+    ``space_id`` is the space it happened in, when the server says so.
+    """
+
+    op: str
+    worklog_id: str
+    record: Optional[LogRecord] = None
+    event_id: Optional[str] = None
+    space_id: Optional[str] = None
+
+
+def iter_sse(lines: Iterable[str]) -> Iterator[SSEMessage]:
+    """Parse an ``text/event-stream`` body into messages (per the WHATWG spec)."""
+    event, data, last_id, retry = "", [], None, None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            if data:
+                yield SSEMessage(event or "message", "\n".join(data), last_id, retry)
+            event, data, retry = "", [], None
+            continue
+        if line.startswith(":"):
+            continue  # comment / heartbeat
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            event = value
+        elif field == "data":
+            data.append(value)
+        elif field == "id" and "\0" not in value:
+            last_id = value
+        elif field == "retry" and value.isdigit():
+            retry = int(value)
+
+
+def to_change(msg: SSEMessage) -> Optional[Change]:
+    """Convert an SSE message into a :class:`Change` (``None`` if irrelevant).
+
+    The operation comes from the event name or, for unnamed events, from an
+    ``op``/``type`` field in the payload; the record may be the payload itself
+    or nested under ``worklog``/``data``.
+    """
+    try:
+        payload = loads(msg.data)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    op = _OPS.get(msg.event) or _OPS.get(str(payload.get("op") or payload.get("type") or ""))
+    if op is None:
+        return None
+    raw = payload.get("worklog") or payload.get("data") or payload
+    if not isinstance(raw, dict):
+        return None
+    space_id = raw.get("space_id", payload.get("space_id"))
+    space_id = None if space_id is None or space_id == "" else str(space_id)
+    if op == "delete":
+        wid = raw.get("id", payload.get("id"))
+        if wid is None or wid == "":
+            return None
+        return Change("delete", str(wid), None, msg.id, space_id)
+    rec = to_log_record(dict(raw))
+    if rec is None:
+        return None
+    return Change(op, rec["id"], rec, msg.id, space_id)
+
+
+class Backoff:
+    """Exponential backoff with full jitter: ``uniform(0, min(cap, base * 2**n))``."""
+
+    def __init__(self, base: float = 1.0, cap: float = 60.0, *, rng: Callable[[], float] = random.random) -> None:
+        self.base = base
+        self.cap = cap
+        self.attempts = 0
+        self._rng = rng
+
+    def next_delay(self) -> float:
+        ceiling = min(self.cap, self.base * (2 ** self.attempts))
+        self.attempts += 1
+        return ceiling * self._rng()
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
+class ChangeFeed:
+    """Keep an SSE connection open and dispatch :class:`Change` events.
+
+    ``on_change`` and ``on_reset`` run on the feed's own thread; GUI callers
+    should marshal them onto the main loop.  ``on_reset`` is called when the
+    server asks clients to resync, or after a reconnect that could not resume
+    from a known event id, i.e. whenever events may have been missed.
+    """
+
+    def __init__(
+        self,
+        get_token: Callable[[], Optional[str]],
+        on_change: Callable[[Change], None],
+        *,
+        on_reset: Optional[Callable[[], None]] = None,
+        url: Optional[str] = None,
+        backoff: Optional[Backoff] = None,
+        read_timeout: float = _READ_TIMEOUT,
+    ) -> None:
+        self._get_token = get_token
+        self._on_change = on_change
+        self._on_reset = on_reset
+        self.url = url or events_url()
+        self.backoff = backoff or Backoff()
+        self.read_timeout = read_timeout
+        self.last_event_id: Optional[str] = None
+        self.connected = False
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ── Lifecycle ────────────────────────────────────────────────────
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, name="worklog-change-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        """Close the stream and wait for the feed thread to exit."""
+        self._stop.set()
+        self._wake.set()
+        self._abort()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        """Reconnect now instead of waiting out the backoff (e.g. network is back)."""
+        self.backoff.reset()
+        self._wake.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ── Worker ───────────────────────────────────────────────────────
+    def _run(self) -> None:
+        failed = False
+        while not self._stop.is_set():
+            token = self._get_token()
+            if token:
+                try:
+                    self._stream(token, resumed=failed)
+                except Exception as exc:
+                    if self._stop.is_set():
+                        break
+                    _log.info("Change feed disconnected: %s", exc)
+                finally:
+                    self.connected = False
+                    self._close()
+                failed = True
+            delay = self.backoff.next_delay()
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _stream(self, token: str, *, resumed: bool) -> None:
+        parts = urlsplit(self.url)
+        conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        conn = conn_cls(parts.netloc, timeout=self.read_timeout)
+        self._conn = conn
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "text/event-stream",
+            "Cache-Control": "no-cache",
+        }
+        if self.last_event_id is not None:
+            headers["Last-Event-ID"] = self.last_event_id
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        conn.request("GET", path, headers=headers)
+        # getresponse() may drop conn.sock for close-delimited streams.
+        self._sock = conn.sock
+        resp = conn.getresponse()
+        if resp.status != 200:
+            raise ConnectionError(f"change feed returned HTTP {resp.status}")
+        self.connected = True
+        self.backoff.reset()
+        if resumed and self.last_event_id is None and self._on_reset:
+            self._on_reset()
+        for msg in iter_sse(self._lines(resp)):
+            if msg.retry is not None:
+                self.backoff.base = msg.retry / 1000
+            if msg.id is not None:
+                self.last_event_id = msg.id
+            if msg.event == "reset":
+                if self._on_reset:
+                    self._on_reset()
+                continue
+            change = to_change(msg)
+            if change is None:
+                continue
+            try:
+                self._on_change(change)
+            except Exception as exc:
+                _log.exception("Change feed handler failed for %s", change)
+                telemetry.record_error("change_feed.handler", exc)
+        raise ConnectionError("change feed closed by server")
+
+    def _lines(self, resp: http.client.HTTPResponse) -> Iterator[str]:
+        while not self._stop.is_set():
+            raw = resp.readline()
+            if not raw:
+                return
+            yield raw.decode("utf-8", "replace")
+
+    def _abort(self) -> None:
+        # Unblock a pending read from another thread.
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _close(self) -> None:
+        conn, self._conn = self._conn, None
+        self._sock = None
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,195 @@
+"""The app-wide pool for background work.
+
+Network calls, saves and cache reads that must not block the UI are
+submitted here instead of each starting its own thread, so a burst of
+actions queues on a few named workers (``worklog-worker_0`` …) rather than
+spawning a thread apiece.  :meth:`BackgroundExecutor.metrics` reports the
+queue depth, and :meth:`BackgroundExecutor.shutdown` lets pending work (an
+edit being sent, say) finish before the app exits.  Work that must stay in
+order (draft writes) goes through a :class:`SerialQueue` on the same pool.
+
+Long-lived loops and waits (the change feed, the token refresher, the
+browser sign-in) keep their own thread; a task here should finish in about a
+request's time.  The worker
+count comes from ``WORKLOG_WORKERS`` (default 4).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Optional, Tuple
+
+from . import telemetry
+
+_log = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_SHUTDOWN_TIMEOUT = 5.0
+
+
+@dataclass(frozen=True)
+class ExecutorMetrics:
+    workers: int
+    queued: int  # submitted, not started yet
+    running: int
+    peak_queued: int
+    completed: int
+    failed: int
+
+
+class BackgroundExecutor:
+    """A bounded thread pool that counts its queue and reports failures."""
+
+    def __init__(self, max_workers: Optional[int] = None, *, name: str = "worklog-worker") -> None:
+        if max_workers is None:
+            try:
+                max_workers = int(os.getenv("WORKLOG_WORKERS", DEFAULT_WORKERS))
+            except ValueError:
+                max_workers = DEFAULT_WORKERS
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending: "set[Future]" = set()
+        self._queued = self._running = self._peak_queued = 0
+        self._completed = self._failed = 0
+        self._closed = False
+
+    def submit(self, func: Callable[..., Any], *args: Any, name: Optional[str] = None, **kwargs: Any) -> Future:
+        """Run ``func(*args, **kwargs)`` on a worker.
+
+        An exception is logged and recorded in telemetry under ``name``
+        (the function's name by default) and also set on the returned future.
+        Raises ``RuntimeError`` after :meth:`shutdown`.
+        """
+        label = name or getattr(func, "__qualname__", repr(func))
+
+        def run() -> Any:
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as exc:
+                with self._lock:
+                    self._failed += 1
+                _log.error("background task %s failed", label, exc_info=True)
+                telemetry.record_error(f"task.{label}", exc)
+                raise
+            else:
+                with self._lock:
+                    self._completed += 1
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("background executor is shut down")
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+            future = self._pool.submit(run)
+            self._pending.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    def metrics(self) -> ExecutorMetrics:
+        with self._lock:
+            return ExecutorMetrics(
+                workers=self.max_workers,
+                queued=self._queued,
+                running=self._running,
+                peak_queued=self._peak_queued,
+                completed=self._completed,
+                failed=self._failed,
+            )
+
+    def shutdown(self, timeout: Optional[float] = DEFAULT_SHUTDOWN_TIMEOUT) -> bool:
+        """Stop accepting work and wait up to ``timeout`` for pending tasks.
+
+        Returns ``False`` if some were still unfinished; those not yet
+        started are cancelled.
+        """
+        with self._lock:
+            self._closed = True
+            pending = list(self._pending)
+        _done, unfinished = wait(pending, timeout=timeout)
+        if unfinished:
+            _log.warning("%d background tasks unfinished at shutdown", len(unfinished))
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        return not unfinished
+
+
+_shared: Optional[BackgroundExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def get_executor() -> BackgroundExecutor:
+    """The executor shared by the app (created on first use)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = BackgroundExecutor()
+        return _shared
+
+
+def submit(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """:meth:`BackgroundExecutor.submit` on the shared executor."""
+    return get_executor().submit(func, *args, **kwargs)
+
+
+def shutdown_executor(timeout: Optional[float] = DEFAULT_SHUTDOWN_TIMEOUT) -> bool:
+    """Flush and close the shared executor; a later submit starts a new one."""
+    global _shared
+    with _shared_lock:
+        executor, _shared = _shared, None
+    return executor.shutdown(timeout) if executor is not None else True
+
+
+class SerialQueue:
+    """Tasks that run one at a time, in submission order, on the shared pool.
+
+    Holds no thread of its own: while tasks are queued one pool task drains
+    them.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._tasks: Deque[Tuple[Callable[..., Any], Tuple[Any, ...]]] = deque()
+        self._draining = False
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> None:
+        with self._lock:
+            self._tasks.append((func, args))
+            if self._draining:
+                return
+            self._draining = True
+        try:
+            submit(self._drain, name=self.name)
+        except RuntimeError:
+            with self._lock:
+                self._draining = False
+            raise
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                if not self._tasks:
+                    self._draining = False
+                    return
+                func, args = self._tasks.popleft()
+            try:
+                func(*args)
+            except Exception as exc:
+                _log.error("queued task %s failed", self.name, exc_info=True)
+                telemetry.record_error(f"task.{self.name}", exc)
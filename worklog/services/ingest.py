@@ -0,0 +1,229 @@
+"""Decode and validate ``/worklogs`` payloads into typed records.
+
+Decoding uses the fastest JSON backend available (``orjson``, then
+``msgspec``, falling back to the standard library).  Each raw item is
+validated and normalised in the same pass, so consumers can rely on
+:class:`LogRecord` field types instead of coercing raw dicts themselves.
+Large responses are decoded incrementally, one array element at a time.
+"""
+
+from __future__ import annotations
+
+import codecs
+import datetime as _dt
+import json
+import logging
+from typing import Any, Iterable, Iterator, List, Mapping, NotRequired, Optional, TypedDict
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:  # pragma: no cover - depends on installed extras
+    try:
+        import msgspec
+
+        _loads = msgspec.json.decode
+        JSON_BACKEND = "msgspec"
+    except ImportError:
+        _loads = json.loads
+        JSON_BACKEND = "json"
+
+_log = logging.getLogger(__name__)
+
+# Responses larger than this (or of unknown length) are decoded as a stream.
+# Streaming is about half as fast as one-shot decoding, so only large bodies
+# are worth it.
+STREAM_THRESHOLD = 8 * 1024 * 1024
+_CHUNK_SIZE = 64 * 1024
+_COMPRESSION_RATIO = 8  # conservative decoded/encoded size for JSON
+_CONTAINER_KEYS = ("data", "items", "worklogs", "results")
+_WS = " \t\n\r"
+_UTC = _dt.timezone.utc
+_fromisoformat = _dt.datetime.fromisoformat  # accepts a trailing "Z" since 3.11
+
+
+class LogRecord(TypedDict):
+    """A validated worklog.  Unknown server fields are passed through as-is."""
+
+    id: str
+    content: str
+    # ISO8601; timezone-aware values are normalised to UTC with a ``Z`` suffix.
+    record_time: str
+    tag_id: NotRequired[Optional[str]]
+
+
+# Set by the server on records whose ``content`` is only an excerpt.
+TRUNCATED_FLAG = "content_truncated"
+
+
+def is_partial(rec: Mapping[str, Any]) -> bool:
+    """Whether ``rec`` holds an excerpt rather than the full content."""
+    return bool(rec.get(TRUNCATED_FLAG))
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode a JSON document with the fastest available backend."""
+    return _loads(data)
+
+
+def _normalise_time(value: Any) -> Optional[str]:
+    if value.__class__ is not str or not value:
+        return None
+    try:
+        dt = _fromisoformat(value)
+    except ValueError:
+        return None
+    if value[-1] == "Z" or dt.tzinfo is None:
+        return value
+    return dt.astimezone(_UTC).isoformat().replace("+00:00", "Z")
+
+
+def to_log_record(raw: Any) -> Optional[LogRecord]:
+    """Validate one raw item in place; return ``None`` if it is unusable."""
+    if raw.__class__ is not dict:
+        return None
+    wid = raw.get("id")
+    record_time = _normalise_time(raw.get("record_time"))
+    if wid is None or wid == "" or record_time is None:
+        return None
+    if wid.__class__ is not str:
+        raw["id"] = str(wid)
+    raw["record_time"] = record_time
+    content = raw.get("content")
+    if content.__class__ is not str:
+        raw["content"] = "" if content is None else str(content)
+    tag_id = raw.get("tag_id")
+    if tag_id is not None and tag_id.__class__ is not str:
+        raw["tag_id"] = str(tag_id)
+    return raw  # type: ignore[return-value]
+
+
+def ingest(items: Iterable[Any]) -> List[LogRecord]:
+    """Validate ``items`` into records, skipping (and logging) invalid ones."""
+    records: List[LogRecord] = []
+    skipped = 0
+    for raw in items:
+        rec = to_log_record(raw)
+        if rec is None:
+            skipped += 1
+        else:
+            records.append(rec)
+    if skipped:
+        _log.warning("Skipped %d malformed worklog record(s)", skipped)
+    return records
+
+
+def _container(doc: Any) -> List[Any]:
+    if isinstance(doc, list):
+        return doc
+    if isinstance(doc, Mapping):
+        for key in _CONTAINER_KEYS:
+            if isinstance(doc.get(key), list):
+                return doc[key]
+    raise ValueError("unexpected /worklogs payload shape")
+
+
+def parse_worklogs(data: bytes | str) -> List[LogRecord]:
+    """Decode a complete response body into validated records."""
+    return ingest(_container(loads(data)))
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array decoded from ``chunks``.
+
+    Only one element (plus one network chunk) is held as text at a time, so
+    peak memory stays flat regardless of the response size.  Raises
+    ``ValueError`` if the document is not an array or is truncated.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    scanner = json.JSONDecoder()
+    chunks = iter(chunks)
+    buf, pos = "", 0
+
+    def fill() -> bool:
+        nonlocal buf, pos
+        for chunk in chunks:
+            text = decoder.decode(chunk)
+            if text:
+                buf, pos = buf[pos:] + text, 0
+                return True
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            buf, pos = buf[pos:] + tail, 0
+            return True
+        return False
+
+    def skip_ws() -> bool:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos < len(buf):
+                return True
+            if not fill():
+                return False
+
+    if not skip_ws() or buf[pos] != "[":
+        raise ValueError("expected a JSON array")
+    pos += 1
+    after = "["  # last token consumed: "[", "," or a "value"
+    while True:
+        if not skip_ws():
+            raise ValueError("truncated JSON array")
+        if after != "," and buf[pos] == "]":
+            return
+        if after == "value":
+            if buf[pos] != ",":
+                raise ValueError(f"expected ',' at offset {pos}")
+            pos += 1
+            after = ","
+            continue
+        try:
+            value, end = scanner.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if not fill():
+                raise
+            continue
+        if end >= len(buf) and fill():
+            # A scalar at the very end of the buffer may be cut short.
+            continue
+        yield value
+        pos = end
+        after = "value"
+
+
+def _stream_records(chunks: Iterable[bytes]) -> List[LogRecord]:
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if head.lstrip():
+            break
+    if head.lstrip()[:1] == b"[":
+        return ingest(iter_json_array(_prepend(head, chunks)))
+    # Wrapped payloads ({"data": [...]}) are decoded in one go.
+    return parse_worklogs(head + b"".join(chunks))
+
+
+def _prepend(head: bytes, rest: Iterable[bytes]) -> Iterator[bytes]:
+    yield head
+    yield from rest
+
+
+def parse_worklogs_response(resp: Any) -> List[LogRecord]:
+    """Decode a ``requests`` response, streaming it when it is large.
+
+    The response should have been requested with ``stream=True``; small
+    bodies with a known length are read whole and decoded by the fast backend.
+    """
+    try:
+        length = int(resp.headers.get("Content-Length") or 0)
+        if resp.headers.get("Content-Encoding", "identity") != "identity":
+            length *= _COMPRESSION_RATIO  # Content-Length counts encoded bytes
+    except (AttributeError, ValueError):
+        length = 0
+    if 0 < length <= STREAM_THRESHOLD or not hasattr(resp, "iter_content"):
+        return parse_worklogs(resp.content)
+    return _stream_records(resp.iter_content(chunk_size=_CHUNK_SIZE))
@@ -0,0 +1,227 @@
+"""Markdown → Pango markup for log content, with a shared render cache.
+
+Log content is Markdown (SPEC §4).  :func:`to_pango` renders the subset that
+matters in a day card (headings, emphasis, code, links, lists, quotes) to
+Pango markup for ``Gtk.Label.set_markup``.  :class:`MarkupCache` memoizes the
+result per content hash in an LRU bounded by bytes, so rebuilding the grid
+or switching months back and forth never re-renders the same text.
+
+Day cards show long logs collapsed to :func:`preview` (a few lines), so the
+label only lays out and the cache only holds the preview until the row is
+expanded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
+from xml.sax.saxutils import escape as _xml_escape
+
+from .memory import env_megabytes
+
+_DEFAULT_BUDGET_MB = 4
+
+# A collapsed day-card row shows at most this much of a log.
+PREVIEW_CHARS = 240
+PREVIEW_LINES = 6
+_WORD_BACKTRACK = 20  # cut at a space this close to the limit
+
+_HEADING_SIZES = {1: "x-large", 2: "large"}
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_QUOTE = re.compile(r"^\s*>\s?(.*)$")
+_BULLET = re.compile(r"^(\s*)[-*+]\s+(.*)$")
+_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_CODE_SPAN = re.compile(r"(`+)(.+?)\1")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_BOLD = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*|__(?=\S)(.+?)(?<=\S)__")
+_ITALIC = re.compile(r"(?<![*\w])\*(?=\S)(.+?)(?<=\S)\*(?!\*)|(?<![_\w])_(?=\S)(.+?)(?<=\S)_(?![_\w])")
+_STRIKE = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+
+
+def preview(text: str, max_chars: int = PREVIEW_CHARS, max_lines: int = PREVIEW_LINES) -> Optional[str]:
+    """The first ``max_lines`` lines (at most ``max_chars`` characters) of
+    ``text`` followed by "…", or ``None`` if ``text`` fits whole.
+
+    Only the head of ``text`` is scanned, so the cost does not grow with
+    the log's length.
+    """
+    cut = min(len(text), max_chars)
+    pos = -1
+    for _ in range(max_lines):
+        pos = text.find("\n", pos + 1, cut)
+        if pos < 0:
+            break
+    else:
+        cut = pos
+    if cut >= len(text) or not text[cut:].strip():
+        return None
+    head = text[:cut].rstrip()
+    if cut == max_chars:
+        space = head.rfind(" ", max(0, len(head) - _WORD_BACKTRACK))
+        if space > 0:
+            head = head[:space].rstrip()
+    return head + "…"
+
+
+def card_text(text: str) -> str:
+    """What a collapsed day-card row shows for ``text``."""
+    return preview(text) or text
+
+
+def escape(text: str) -> str:
+    """Escape ``text`` for use in Pango markup (content and attributes)."""
+    return _xml_escape(text, {'"': "&quot;"})
+
+
+def _emphasis(text: str) -> str:
+    text = _LINK.sub(r'<a href="\2">\1</a>', text)
+    text = _BOLD.sub(lambda m: f"<b>{m.group(1) or m.group(2)}</b>", text)
+    text = _ITALIC.sub(lambda m: f"<i>{m.group(1) or m.group(2)}</i>", text)
+    return _STRIKE.sub(r"<s>\1</s>", text)
+
+
+def _inline(line: str) -> str:
+    """Render inline Markdown; text inside code spans is left alone."""
+    out: List[str] = []
+    pos = 0
+    for m in _CODE_SPAN.finditer(line):
+        out.append(_emphasis(escape(line[pos:m.start()])))
+        out.append(f"<tt>{escape(m.group(2).strip())}</tt>")
+        pos = m.end()
+    out.append(_emphasis(escape(line[pos:])))
+    return "".join(out)
+
+
+def to_pango(text: str) -> str:
+    """Render Markdown ``text`` to Pango markup."""
+    out: List[str] = []
+    code: Optional[List[str]] = None
+    for line in text.split("\n"):
+        if _FENCE.match(line):
+            if code is None:
+                code = []
+            else:
+                out.append("<tt>" + "\n".join(code) + "</tt>")
+                code = None
+            continue
+        if code is not None:
+            code.append(escape(line))
+            continue
+        m = _HEADING.match(line)
+        if m:
+            size = _HEADING_SIZES.get(len(m.group(1)))
+            attrs = f' size="{size}"' if size else ""
+            out.append(f'<span weight="bold"{attrs}>{_inline(m.group(2))}</span>')
+            continue
+        if _RULE.match(line):
+            out.append("──────────")
+            continue
+        m = _QUOTE.match(line)
+        if m:
+            out.append(f"<i>{_inline(m.group(1))}</i>")
+            continue
+        m = _BULLET.match(line)
+        if m:
+            out.append(f"{m.group(1)}• {_inline(m.group(2))}")
+            continue
+        out.append(_inline(line))
+    if code is not None:  # unterminated fence: render the rest as code
+        out.append("<tt>" + "\n".join(code) + "</tt>")
+    return "\n".join(out)
+
+
+class MarkupCache:
+    """LRU of rendered markup keyed by a hash of the source text.
+
+    Keys are 16-byte digests, so cached entries do not keep the (possibly
+    long) source text alive; the budget counts the markup strings.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, render: Callable[[str], str] = to_pango) -> None:
+        if max_bytes is None:
+            max_bytes = env_megabytes("WORKLOG_MARKDOWN_CACHE_MB", _DEFAULT_BUDGET_MB)
+        self.max_bytes = max_bytes
+        self._render = render
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, str]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, text: str) -> str:
+        """Return the markup for ``text``, rendering it on a miss."""
+        key = self._key(text)
+        with self._lock:
+            markup = self._entries.get(key)
+            if markup is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return markup
+            self.misses += 1
+        markup = self._render(text)
+        cost = sys.getsizeof(markup) + sys.getsizeof(key)
+        if cost > self.max_bytes:
+            return markup
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = markup
+                self.size += cost
+                while self.size > self.max_bytes:
+                    _old_key, old = self._entries.popitem(last=False)
+                    self.size -= sys.getsizeof(old) + sys.getsizeof(_old_key)
+        return markup
+
+    def peek(self, text: str) -> Optional[str]:
+        """The cached markup for ``text`` without rendering or touching the LRU order."""
+        with self._lock:
+            return self._entries.get(self._key(text))
+
+    def seed(self, text: str, markup: str) -> None:
+        """Add markup rendered earlier (e.g. restored from a startup snapshot)."""
+        key = self._key(text)
+        cost = sys.getsizeof(markup) + sys.getsizeof(key)
+        with self._lock:
+            if key in self._entries or self.size + cost > self.max_bytes:
+                return
+            self._entries[key] = markup
+            self.size += cost
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+_shared: Optional[MarkupCache] = None
+
+
+def get_markup_cache() -> MarkupCache:
+    """The cache shared by every day card."""
+    global _shared
+    if _shared is None:
+        _shared = MarkupCache()
+    return _shared
+
+
+def prerender(contents: Iterable[str]) -> None:
+    """Render the collapsed text of ``contents`` into the shared cache.
+
+    Called off the UI thread after a fetch, so mapping the rows only has to
+    look the markup up.
+    """
+    cache = get_markup_cache()
+    for text in contents:
+        cache.get(card_text(text))
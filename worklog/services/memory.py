@@ -0,0 +1,97 @@
+"""Memory accounting and idle trimming for the resident (daemon) mode."""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import time
+from typing import Callable, Optional
+
+_DEFAULT_BUDGET_MB = 150
+_DEFAULT_IDLE_TRIM_SECONDS = 10 * 60  # 10 minutes hidden before trimming
+
+
+def current_rss_bytes() -> int:
+    """Return the resident set size of this process, or 0 if unknown."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux; good enough as a fallback.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return 0
+
+
+def trim_process_memory() -> None:
+    """Run a full GC and hand freed heap pages back to the OS (glibc only)."""
+    gc.collect()
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        libc.malloc_trim(0)
+    except Exception:
+        pass
+
+
+def env_megabytes(name: str, default: int) -> int:
+    """Read a size in MB from environment variable ``name`` and return bytes."""
+    try:
+        mb = int(os.getenv(name, default))
+    except ValueError:
+        mb = default
+    return mb * 1024 * 1024
+
+
+def memory_budget_bytes() -> int:
+    """Budget from ``WORKLOG_MEMORY_BUDGET_MB`` (default 150 MB)."""
+    return env_megabytes("WORKLOG_MEMORY_BUDGET_MB", _DEFAULT_BUDGET_MB)
+
+
+class IdleTrimmer:
+    """Decide when a hidden, resident app should release memory.
+
+    Trimming is due once the app has been idle for ``idle_seconds`` or as
+    soon as the resident set exceeds ``budget_bytes``.  A trim rarely brings
+    the resident set under budget, so after one the next over-budget trim
+    waits ``idle_seconds`` too.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: Optional[int] = None,
+        idle_seconds: float = _DEFAULT_IDLE_TRIM_SECONDS,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        rss: Callable[[], int] = current_rss_bytes,
+    ) -> None:
+        self.budget_bytes = memory_budget_bytes() if budget_bytes is None else budget_bytes
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._rss = rss
+        self._last_active = clock()
+        self._trimmed_at = 0.0
+        self.trimmed = False
+
+    def touch(self) -> None:
+        """Record user activity (window shown, quick-add, ...)."""
+        self._last_active = self._clock()
+        self.trimmed = False
+
+    def over_budget(self) -> bool:
+        return self._rss() > self.budget_bytes
+
+    def should_trim(self) -> bool:
+        now = self._clock()
+        if self.trimmed:
+            return now - self._trimmed_at >= self.idle_seconds and self.over_budget()
+        return self.over_budget() or now - self._last_active >= self.idle_seconds
+
+    def mark_trimmed(self) -> None:
+        self.trimmed = True
+        self._trimmed_at = self._clock()
@@ -0,0 +1,127 @@
+"""Three-way text merge for concurrently edited worklog content.
+
+Both sides are diffed against the common ancestor (``base``); changes to
+different regions are combined, identical changes are taken once, and only
+overlapping, differing changes are reported as conflicts.  Merging is tried
+line by line first and, failing that, word by word, so two people editing
+different parts of the same sentence still merge cleanly.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import List, Sequence, Tuple
+
+# (base_start, base_end, replacement tokens)
+_Hunk = Tuple[int, int, List[str]]
+
+_WORDS = re.compile(r"\s+|[^\s]+")
+
+
+@dataclass(frozen=True)
+class MergeResult:
+    text: str
+    conflict: bool
+
+
+def _hunks(base: Sequence[str], other: Sequence[str]) -> List[_Hunk]:
+    matcher = SequenceMatcher(None, base, other, autojunk=False)
+    return [
+        (i1, i2, list(other[j1:j2]))
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def _merge_tokens(
+    base: List[str], ours: List[str], theirs: List[str]
+) -> Tuple[List[str], List[Tuple[int, List[str], List[str]]]]:
+    """Merge token lists; return the merged tokens and conflicting regions.
+
+    Each conflict is ``(index in merged, our tokens, their tokens)``; the
+    merged output holds neither side at that index.
+    """
+    tagged = sorted(
+        [(h, 0) for h in _hunks(base, ours)] + [(h, 1) for h in _hunks(base, theirs)],
+        key=lambda t: (t[0][0], t[0][1]),
+    )
+    out: List[str] = []
+    conflicts: List[Tuple[int, List[str], List[str]]] = []
+    pos = k = 0
+    while k < len(tagged):
+        start, end = tagged[k][0][0], tagged[k][0][1]
+        groups: Tuple[List[_Hunk], List[_Hunk]] = ([], [])
+        while k < len(tagged):
+            hunk, side = tagged[k]
+            h_start, h_end = hunk[0], hunk[1]
+            if groups[0] or groups[1]:
+                # Changes touching at one point (e.g. an insertion right where
+                # the other side edits) are ambiguous, so they overlap too.
+                touching = h_start == end and (h_start == h_end or start == end)
+                if not (h_start < end or touching):
+                    break
+            groups[side].append(hunk)
+            end = max(end, h_end)
+            k += 1
+        out.extend(base[pos:start])
+        mine = _apply(base, start, end, groups[0])
+        yours = _apply(base, start, end, groups[1])
+        if not groups[1] or mine == yours:
+            out.extend(mine)
+        elif not groups[0]:
+            out.extend(yours)
+        else:
+            conflicts.append((len(out), mine, yours))
+        pos = end
+    out.extend(base[pos:])
+    return out, conflicts
+
+
+def _apply(base: Sequence[str], start: int, end: int, hunks: List[_Hunk]) -> List[str]:
+    """Return ``base[start:end]`` with ``hunks`` (all inside that range) applied."""
+    out: List[str] = []
+    pos = start
+    for h_start, h_end, repl in hunks:
+        out.extend(base[pos:h_start])
+        out.extend(repl)
+        pos = h_end
+    out.extend(base[pos:end])
+    return out
+
+
+def _render(merged: List[str], conflicts: List[Tuple[int, List[str], List[str]]]) -> str:
+    parts: List[str] = []
+    marks = {index: (mine, yours) for index, mine, yours in conflicts}
+    for index in range(len(merged) + 1):
+        if index in marks:
+            mine, yours = marks[index]
+            parts.append(
+                "<<<<<<< mine\n" + "".join(mine).rstrip("\n") + "\n=======\n"
+                + "".join(yours).rstrip("\n") + "\n>>>>>>> theirs\n"
+            )
+        if index < len(merged):
+            parts.append(merged[index])
+    return "".join(parts)
+
+
+def merge3(base: str, ours: str, theirs: str) -> MergeResult:
+    """Merge ``ours`` and ``theirs``, both derived from ``base``.
+
+    On a conflict the text contains ``<<<<<<< mine`` / ``>>>>>>> theirs``
+    markers around each region, ready for the user to resolve.
+    """
+    if ours == theirs or theirs == base:
+        return MergeResult(ours, False)
+    if ours == base:
+        return MergeResult(theirs, False)
+    line_args = [s.splitlines(keepends=True) for s in (base, ours, theirs)]
+    merged, conflicts = _merge_tokens(*line_args)
+    if not conflicts:
+        return MergeResult("".join(merged), False)
+    word_args = [_WORDS.findall(s) for s in (base, ours, theirs)]
+    words, word_conflicts = _merge_tokens(*word_args)
+    if not word_conflicts:
+        return MergeResult("".join(words), False)
+    return MergeResult(_render(merged, conflicts), True)
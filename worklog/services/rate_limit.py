@@ -0,0 +1,187 @@
+"""Client-side pacing for backend calls.
+
+:class:`RateLimiter` combines a token bucket (sustained requests per second
+plus a burst allowance) with an adaptive concurrency limit.  The limit grows
+additively while responses are fast and healthy and is cut multiplicatively
+on ``429 Too Many Requests`` or slow responses (AIMD), so parallel sync,
+edits and fetches find the highest rate the backend accepts without being
+throttled.  ``Retry-After`` pauses all new requests until the given time.
+"""
+
+from __future__ import annotations
+
+import email.utils
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+DEFAULT_RATE = 10.0  # requests per second
+DEFAULT_BURST = 20
+DEFAULT_MAX_CONCURRENCY = 8
+MAX_RETRY_AFTER = 60.0
+_DEFAULT_PAUSE = 1.0  # after a 429 without Retry-After
+
+
+def parse_retry_after(value: Optional[str], *, now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when is None:
+            return None
+        seconds = when.timestamp() - (time.time() if now is None else now)
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """Hand out request slots at ``rate`` per second with up to ``burst`` saved."""
+
+    def __init__(self, rate: float, burst: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._last = clock()
+        self._paused_until = 0.0
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait for it."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every new reservation for ``seconds`` (``Retry-After``)."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class AIMDLimit:
+    """Concurrency limit: +1 per window of good responses, halved on overload."""
+
+    def __init__(
+        self,
+        initial: float = 4,
+        *,
+        minimum: float = 1,
+        maximum: float = DEFAULT_MAX_CONCURRENCY,
+        slow_seconds: float = 3.0,
+        backoff: float = 0.5,
+    ) -> None:
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.slow_seconds = slow_seconds
+        self.backoff = backoff
+
+    def on_success(self, latency: float) -> None:
+        if latency > self.slow_seconds:
+            self.on_overload()
+        else:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_overload(self) -> None:
+        self.limit = max(self.minimum, self.limit * self.backoff)
+
+
+@dataclass(frozen=True)
+class LimiterMetrics:
+    requests: int
+    throttled: int
+    queued: int
+    queue_seconds_total: float
+    queue_seconds_max: float
+    concurrency_limit: float
+    in_flight: int
+
+    @property
+    def queue_seconds_mean(self) -> float:
+        return self.queue_seconds_total / self.requests if self.requests else 0.0
+
+
+class RateLimiter:
+    """Token bucket + AIMD concurrency limit, shared by all API calls."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        *,
+        limit: Optional[AIMDLimit] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.bucket = TokenBucket(rate, burst, clock=clock)
+        self.limit = limit or AIMDLimit()
+        self._clock = clock
+        self._sleep = sleep
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._requests = 0
+        self._throttled = 0
+        self._queued = 0
+        self._queue_total = 0.0
+        self._queue_max = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Wait for a free concurrency slot and a token, then run the block."""
+        started = self._clock()
+        blocked = False
+        with self._cond:
+            while self._in_flight >= max(1, int(self.limit.limit)):
+                blocked = True
+                self._cond.wait()
+            self._in_flight += 1
+            wait = self.bucket.reserve()
+        try:
+            if wait > 0:
+                self._sleep(wait)
+            # Only a request that actually waited counts as queued; the
+            # elapsed time alone also includes lock and clock overhead.
+            queued = self._clock() - started if blocked or wait > 0 else 0.0
+            with self._cond:
+                self._requests += 1
+                self._queue_total += queued
+                self._queue_max = max(self._queue_max, queued)
+                if blocked or wait > 0:
+                    self._queued += 1
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def observe(self, latency: float, status: Optional[int], retry_after: Optional[float] = None) -> None:
+        """Feed back one response (``status=None`` for a network failure)."""
+        with self._cond:
+            if status == 429 or (status == 503 and retry_after is not None):
+                self._throttled += 1
+                self.limit.on_overload()
+                self.bucket.pause(retry_after if retry_after is not None else _DEFAULT_PAUSE)
+            elif status is not None and status < 500:
+                self.limit.on_success(latency)
+            self._cond.notify_all()
+
+    def metrics(self) -> LimiterMetrics:
+        with self._cond:
+            return LimiterMetrics(
+                requests=self._requests,
+                throttled=self._throttled,
+                queued=self._queued,
+                queue_seconds_total=self._queue_total,
+                queue_seconds_max=self._queue_max,
+                concurrency_limit=self.limit.limit,
+                in_flight=self._in_flight,
+            )
@@ -0,0 +1,293 @@
+"""Spaces (SPEC §5.2): one cache, sync engine and log store per space.
+
+Each space's logs live in their own cache file, so switching spaces shows
+that space's resident or cached logs immediately, and a refresh is a
+conditional request that downloads nothing when the space is unchanged.
+The selected space loads first; :meth:`SpaceManager.warm_others` then
+fetches the remaining spaces on the app executor, a few at a time.
+
+The last selected space is remembered in GSettings (``org.worklog
+last-space-id``) when the schema is installed, otherwise in the settings
+file.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from . import api_client, telemetry
+from .executor import submit
+from . import timezone as _settings  # shares the settings file
+from .api_client import NetworkError
+from .sync_engine import SyncEngine
+from ..stores.log_cache import LogCache, space_cache_path
+from ..stores.log_store import LogStore
+
+_log = logging.getLogger(__name__)
+
+SCHEMA_ID = "org.worklog"
+_GSETTINGS_KEY = "last-space-id"
+_SETTINGS_KEY = "last_space_id"
+_SPACES_META = "spaces"  # the space list, cached for offline starts
+DEFAULT_MAX_WARM = 2
+
+
+@dataclass(frozen=True)
+class Space:
+    id: Optional[str]
+    name: str
+    color: Optional[str] = None
+    is_personal: bool = False
+
+    @classmethod
+    def from_api(cls, raw: Mapping[str, Any]) -> "Space":
+        return cls(
+            id=str(raw["id"]),
+            name=str(raw.get("name") or raw["id"]),
+            color=raw.get("color"),
+            is_personal=bool(raw.get("is_personal")),
+        )
+
+
+# A backend without spaces: everything is one implicit space.
+DEFAULT_SPACE = Space(None, "Personal", is_personal=True)
+
+
+def _gsettings() -> Any:
+    """``Gio.Settings`` for ``org.worklog``, or ``None`` if the schema is not installed."""
+    try:
+        import gi
+
+        gi.require_version("Gio", "2.0")
+        from gi.repository import Gio
+    except Exception:
+        return None
+    source = Gio.SettingsSchemaSource.get_default()
+    if source is None or source.lookup(SCHEMA_ID, True) is None:
+        return None
+    return Gio.Settings.new(SCHEMA_ID)
+
+
+def load_last_space() -> Optional[str]:
+    settings = _gsettings()
+    if settings is not None:
+        return settings.get_string(_GSETTINGS_KEY) or None
+    return _settings._read_settings().get(_SETTINGS_KEY) or None
+
+
+def save_last_space(space_id: Optional[str]) -> None:
+    settings = _gsettings()
+    if settings is not None:
+        settings.set_string(_GSETTINGS_KEY, space_id or "")
+        return
+    path = _settings._get_settings_path()
+    data = _settings._read_settings()
+    if space_id:
+        data[_SETTINGS_KEY] = space_id
+    else:
+        data.pop(_SETTINGS_KEY, None)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+@dataclass
+class SpaceData:
+    """Everything held for one space."""
+
+    space_id: Optional[str]
+    cache: LogCache
+    engine: SyncEngine
+    store: LogStore
+
+
+class SpaceManager:
+    """Per-space data, the selected space, and background warming."""
+
+    def __init__(
+        self,
+        get_token: Callable[[], Optional[str]],
+        *,
+        cache_factory: Callable[[Optional[str]], LogCache] = lambda sid: LogCache(space_cache_path(sid)),
+        on_created: Optional[Callable[[SpaceData], None]] = None,
+        max_warm: int = DEFAULT_MAX_WARM,
+    ) -> None:
+        self._get_token = get_token
+        self._cache_factory = cache_factory
+        self._on_created = on_created
+        self._max_warm = max_warm
+        self._lock = threading.RLock()
+        self._data: Dict[Optional[str], SpaceData] = {}
+        self._online = True
+        self.spaces: List[Space] = [DEFAULT_SPACE]
+        # Trusted until the space list is known, so startup touches no cache.
+        self._preferred: Optional[str] = load_last_space()
+        self.current_id: Optional[str] = self._preferred
+        self._cached_loaded = False
+
+    # ── Per-space data ───────────────────────────────────────────────
+    def data(self, space_id: Optional[str]) -> SpaceData:
+        """The cache, engine and store of ``space_id``, created on first use."""
+        with self._lock:
+            data = self._data.get(space_id)
+            if data is None:
+                cache = self._cache_factory(space_id)
+                engine = SyncEngine(cache, self._get_token, space_id=space_id)
+                engine.set_online(self._online)
+                data = self._data[space_id] = SpaceData(space_id, cache, engine, LogStore(cache))
+                if self._on_created is not None:
+                    self._on_created(data)
+            return data
+
+    @property
+    def current(self) -> SpaceData:
+        return self.data(self.current_id)
+
+    def loaded(self) -> List[SpaceData]:
+        """Every space whose data has been created so far."""
+        with self._lock:
+            return list(self._data.values())
+
+    def for_change(self, change: Any) -> Optional[SpaceData]:
+        """The space a pushed change belongs to; ``None`` to ignore it.
+
+        A change naming a space goes to that space if it is in the list.
+        Without one (deletes usually carry only the id) it goes to the loaded
+        space that caches the log, or to the only space of a backend without
+        spaces.  Nothing falls back to the current space.
+        """
+        space_id = change.space_id
+        if space_id is None and change.record is not None and change.record.get("space_id") is not None:
+            space_id = str(change.record["space_id"])
+        self._load_cached_spaces()
+        with self._lock:
+            known = {s.id for s in self.spaces}
+        if space_id is not None:
+            return self.data(space_id) if space_id in known else None
+        if known == {None}:
+            return self.data(None)
+        for data in self.loaded():
+            if data.cache.contains(change.worklog_id):
+                return data
+        return None
+
+    # ── Space list and selection ─────────────────────────────────────
+    def _load_cached_spaces(self) -> None:
+        if self._cached_loaded:
+            return
+        self._cached_loaded = True
+        raw = self.data(None).cache.get_meta(_SPACES_META)
+        try:
+            cached = [Space(**item) for item in json.loads(raw)] if raw else []
+        except (TypeError, ValueError):
+            cached = []
+        self._set_spaces(cached)
+
+    def _set_spaces(self, spaces: Iterable[Space]) -> None:
+        spaces = list(spaces) or [DEFAULT_SPACE]
+        ids = {s.id for s in spaces}
+        with self._lock:
+            self.spaces = spaces
+            if self._preferred in ids:
+                self.current_id = self._preferred
+            elif self.current_id not in ids:
+                personal = next((s for s in spaces if s.is_personal), spaces[0])
+                self.current_id = personal.id
+
+    def load_spaces(self, *, sign_out: Optional[Callable[[], None]] = None) -> List[Space]:
+        """Fetch the space list (the cached one when offline)."""
+        self._load_cached_spaces()
+        token = self._get_token()
+        if self._online and token:
+            try:
+                raw = api_client.get_spaces(token, sign_out=sign_out)
+            except NetworkError:
+                # Served from the cache; the next load tries again.  The
+                # network monitor alone decides when everything is offline.
+                _log.info("space list unreachable; using the cached one")
+            except Exception:
+                _log.exception("loading spaces failed")
+            else:
+                spaces = [Space.from_api(item) for item in raw]
+                self.data(None).cache.set_meta(
+                    _SPACES_META, json.dumps([asdict(s) for s in spaces]) if spaces else None
+                )
+                self._set_spaces(spaces)
+        return list(self.spaces)
+
+    def select(self, space_id: Optional[str]) -> SpaceData:
+        """Make ``space_id`` current and remember it for the next start."""
+        with self._lock:
+            self.current_id = self._preferred = space_id
+        try:
+            save_last_space(space_id)
+        except Exception:
+            _log.exception("saving the selected space failed")
+        return self.current
+
+    # ── Loading ──────────────────────────────────────────────────────
+    def warm_others(self) -> Future:
+        """Fetch every space except the current one in the background.
+
+        At most ``max_warm`` spaces load at once (each finished one starts
+        the next), so the selected space's requests are not starved.
+        Returns without waiting; the future completes when all are loaded.
+        """
+        done: Future = Future()
+        others = deque(s.id for s in self.spaces if s.id != self.current_id)
+        if not others or not self._get_token():
+            done.set_result(None)
+            return done
+        lock = threading.Lock()
+        remaining = [len(others)]
+
+        def start_next() -> None:
+            with lock:
+                if not others:
+                    return
+                space_id = others.popleft()
+            try:
+                submit(self._warm, space_id, name="spaces.warm").add_done_callback(finished)
+            except RuntimeError:  # shutting down
+                finished(None)
+
+        def finished(_future: Optional[Future]) -> None:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                done.set_result(None)
+            else:
+                start_next()
+
+        for _ in range(min(self._max_warm, len(others))):
+            start_next()
+        return done
+
+    def _warm(self, space_id: Optional[str]) -> None:
+        data = self.data(space_id)
+        try:
+            logs, _from_cache = data.engine.fetch_worklogs()
+            data.store.replace(logs)
+        except Exception as exc:
+            _log.exception("warming space %s failed", space_id)
+            telemetry.record_error("spaces.warm", exc)
+
+    def set_online(self, online: bool) -> None:
+        with self._lock:
+            self._online = bool(online)
+            for data in self._data.values():
+                data.engine.set_online(online)
+
+    def clear(self) -> None:
+        """Drop every space's cached and resident logs (sign-out)."""
+        for data in self.loaded():
+            data.cache.clear()
+            data.store.clear()
+        self._preferred = None
+        self._set_spaces([])
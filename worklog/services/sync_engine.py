@@ -0,0 +1,539 @@
+"""Offline-aware sync engine for worklog reads and mutations.
+
+Reads go to the backend when it is reachable and fall back to the on-disk
+:class:`~worklog.stores.log_cache.LogCache` otherwise.  Creates, edits and
+deletes are written through to the cache and the pending queue first, then
+pushed by :meth:`SyncEngine.flush` immediately when online or once
+connectivity returns.  A failed request with the link still up (a timeout, a
+5xx) takes the engine offline only until a backed-off retry succeeds.
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from . import api_client, telemetry
+from .executor import submit
+from .api_client import NetworkError, NotModified
+from .ingest import TRUNCATED_FLAG, is_partial
+from .merge import merge3
+from ..stores.log_cache import LogCache
+
+_log = logging.getLogger(__name__)
+
+LOCAL_ID_PREFIX = "local-"
+# Delay before retrying the server after a failed request, doubling up to the
+# maximum while it stays unreachable.
+RETRY_MIN_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+# Fields of the record an edit was based on, kept with queued updates.
+_BASE_FIELDS = ("content", "record_time", "tag_id", "updated_at", "etag")
+_MAX_UPDATE_ATTEMPTS = 3
+# Cache meta keys holding the ETag of the cached grid / full response.
+_ETAG_KEYS = {False: "etag:grid", True: "etag:full"}
+
+
+def utc_now_iso() -> str:
+    """Current time as the ISO8601 ``record_time`` format used by the API."""
+    return _dt.datetime.now(_dt.timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _coalesce(pending: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapse queued mutations so each worklog is sent at most once.
+
+    The last mutation for a worklog wins (a delete supersedes earlier edits).
+    Edits of a not-yet-sent create are folded into the create, and a create
+    followed by a delete collapses to ``op=None`` (nothing to send).  The
+    result is ordered by the last mutation made to each worklog and keeps
+    every original sequence number so they can all be dequeued together.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for item in pending:
+        wid = item["worklog_id"]
+        prev = merged.get(wid)
+        seqs = (prev["seqs"] if prev else []) + [item["seq"]]
+        op, payload = item["op"], item["payload"]
+        if prev and prev["op"] == "create":
+            if op == "delete":
+                op, payload = None, None
+            else:
+                payload = {k: v for k, v in (payload or {}).items() if k != "_base"}
+                op, payload = "create", {**prev["payload"], **payload}
+        elif prev and prev["op"] is None:
+            op, payload = None, None
+        elif prev and prev["op"] == op == "update" and "_base" in (prev["payload"] or {}):
+            # Later edits build on the version the first queued edit saw.
+            payload = {**(payload or {}), "_base": prev["payload"]["_base"]}
+        merged[wid] = {
+            "op": op,
+            "worklog_id": wid,
+            "payload": payload,
+            "seqs": seqs,
+        }
+    return sorted(merged.values(), key=lambda m: m["seqs"][-1])
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    return getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def _is_transient(exc: Exception) -> bool:
+    """A throttled (429) or server-side (5xx) failure, worth retrying later."""
+    status = _status_code(exc)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def _changed_since(base: Mapping[str, Any], current: Mapping[str, Any]) -> bool:
+    """Whether the server copy moved on from the version an edit was based on."""
+    for field in ("etag", "updated_at"):
+        if base.get(field) and current.get(field):
+            return base[field] != current[field]
+    return any(current.get(f) != base.get(f) for f in ("content", "record_time", "tag_id"))
+
+
+@dataclass(frozen=True)
+class Conflict:
+    """An edit that could not be merged with a concurrent server-side edit.
+
+    ``merged`` holds the content with ``<<<<<<< mine`` / ``>>>>>>> theirs``
+    markers; ``theirs`` is the server record the resolution should build on.
+    """
+
+    worklog_id: str
+    base: str
+    mine: str
+    theirs: Dict[str, Any]
+    merged: str
+
+
+class SyncEngine:
+    """Route worklog reads/mutations through the API or the local cache.
+
+    An engine serves one space (``space_id``; ``None`` for a backend without
+    spaces) and its cache holds only that space's logs.
+    """
+
+    def __init__(
+        self,
+        cache: LogCache,
+        get_token: Callable[[], Optional[str]],
+        *,
+        space_id: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.cache = cache
+        self.space_id = space_id
+        self._get_token = get_token
+        self._clock = clock
+        self._flush_lock = threading.Lock()
+        self._id_map: Dict[str, str] = {}
+        self._local_records: Dict[str, Dict[str, Any]] = {}
+        # Server copies of worklogs with queued edits, seen via the change feed.
+        self._remote: Dict[str, Dict[str, Any]] = {}
+        self.online = True
+        # After a failed request (the link itself still up) the server is
+        # tried again at ``_retry_at``, backing off while it stays unreachable.
+        self._retry_at: Optional[float] = None
+        self._retry_delay = RETRY_MIN_SECONDS
+        # Called (from the flushing thread) when an edit needs the user to
+        # pick a version.  Without a handler the local edit wins.
+        self.on_conflict: Optional[Callable[[Conflict], None]] = None
+        # Called with the stored record after an edit was merged with a
+        # concurrent one, so views can show the combined content.
+        self.on_merged: Optional[Callable[[Dict[str, Any]], None]] = None
+
+    def set_online(self, online: bool) -> None:
+        """Follow the network monitor; cancels any pending retry."""
+        self.online = bool(online)
+        self._retry_at = None
+        self._retry_delay = RETRY_MIN_SECONDS
+
+    def _can_reach(self) -> bool:
+        """Online, or offline after a failed request and due for a retry."""
+        return self.online or (self._retry_at is not None and self._clock() >= self._retry_at)
+
+    def _unreachable(self) -> None:
+        # A timeout or 5xx: serve the cache for now and try again later.
+        self.online = False
+        self._retry_at = self._clock() + self._retry_delay
+        self._retry_delay = min(self._retry_delay * 2, RETRY_MAX_SECONDS)
+
+    def _reached(self) -> None:
+        if not self.online:
+            self.set_online(True)
+
+    def has_pending(self) -> bool:
+        return self.cache.pending_count() > 0
+
+    # ── Reads ────────────────────────────────────────────────────────
+    def fetch_worklogs(
+        self, *, full: bool = False, sign_out: Optional[Callable[[], None]] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Return ``(logs, from_cache)``.
+
+        Pending mutations are flushed before fetching so the server response
+        already reflects local edits.  On a network failure the engine goes
+        offline and serves the cached copy instead; a later call retries the
+        server (after a growing delay) and comes back online if it answers.
+
+        Unless ``full`` is set only the grid's fields and content excerpts
+        are requested; see :meth:`load_full`.  The request is conditional on
+        the cached response's ETag, so unchanged logs are served from the
+        cache without being downloaded again.
+        """
+        token = self._get_token()
+        if self._can_reach() and token:
+            try:
+                self.flush()
+                query = self._list_query(full)
+                logs = api_client.get_worklog_records(token, sign_out=sign_out, **query)
+            except NotModified:
+                self._reached()
+                return self.cache.load_all(), False
+            except NetworkError:
+                self._unreachable()
+            except Exception as exc:
+                if not _is_transient(exc):
+                    raise
+                self._unreachable()
+            else:
+                self._reached()
+                self.cache.replace_all(logs)
+                self._remember_etag(full, getattr(logs, "etag", None))
+                return list(logs), False
+        return self.cache.load_all(), True
+
+    def _full_query(self) -> Dict[str, Any]:
+        return {"space_id": self.space_id} if self.space_id else {}
+
+    def _grid_query(self) -> Dict[str, Any]:
+        query = {"fields": api_client.GRID_FIELDS, "excerpt": api_client.EXCERPT_CHARS}
+        query.update(self._full_query())
+        return query
+
+    def _list_query(self, full: bool) -> Dict[str, Any]:
+        query = self._full_query() if full else self._grid_query()
+        etag = self.cache.get_meta(_ETAG_KEYS[full])
+        if etag:
+            query["if_none_match"] = etag
+        return query
+
+    def _remember_etag(self, full: bool, etag: Optional[str]) -> None:
+        # The cache now mirrors this response only; the other kind's ETag
+        # no longer describes it.
+        self.cache.set_meta(_ETAG_KEYS[full], etag)
+        self.cache.set_meta(_ETAG_KEYS[not full], None)
+
+    def _forget_etags(self) -> None:
+        for key in _ETAG_KEYS.values():
+            self.cache.set_meta(key, None)
+
+    def warm(self) -> None:
+        """Start the grid fetch in the background.
+
+        A :meth:`fetch_worklogs` issued while it runs (or just after) shares
+        its response instead of making a second request.  Skipped while edits
+        are queued, since the fetch must follow their flush.
+        """
+        token = self._get_token()
+        if not (self.online and token) or self.has_pending():
+            return
+
+        def run() -> None:
+            try:
+                api_client.get_worklog_records(token, **self._list_query(False))
+            except Exception:
+                pass  # the real fetch reports errors
+
+        submit(run, name="sync.warm")
+
+    def load_full(self, rec: Dict[str, Any]) -> Dict[str, Any]:
+        """Complete a grid record (an excerpt) with the server copy, in place.
+
+        Returns ``rec``; it is still partial (see :func:`.ingest.is_partial`)
+        if the server could not be reached.
+        """
+        if not is_partial(rec) or str(rec["id"]).startswith(LOCAL_ID_PREFIX):
+            return rec
+        token = self._get_token()
+        if not (self._can_reach() and token):
+            return rec
+        try:
+            full = api_client.get_worklog(token, str(rec["id"]))
+        except NetworkError:
+            self._unreachable()
+            return rec
+        except Exception as exc:
+            if not _is_transient(exc):
+                raise
+            self._unreachable()
+            return rec
+        self._reached()
+        if full is not None:
+            rec.pop(TRUNCATED_FLAG, None)
+            rec.update(full)
+            self.cache.upsert({k: v for k, v in rec.items() if not str(k).startswith("_")})
+        return rec
+
+    def apply_change(self, change: Any) -> bool:
+        """Write a server-pushed :class:`~.change_feed.Change` to the cache.
+
+        Returns ``False`` when the change should not be shown: echoes of our
+        own creates and changes to worklogs with local edits still queued
+        (those are pushed on the next flush and win for now).
+        """
+        wid = change.worklog_id
+        if any(item["worklog_id"] in (wid, *self._local_ids(wid)) for item in self.cache.pending()):
+            if change.record is not None:
+                # Remember it so the queued edit is merged, not sent blindly.
+                self._remote[wid] = dict(change.record)
+            return False
+        if change.op == "delete":
+            self.cache.delete(wid)
+            return True
+        rec = change.record
+        if change.op == "create" and self._is_own_create(rec):
+            return False
+        self.cache.upsert(rec)
+        return True
+
+    def _local_ids(self, server_id: str) -> List[str]:
+        return [local for local, remote in self._id_map.items() if remote == server_id]
+
+    def _is_own_create(self, rec: Mapping[str, Any]) -> bool:
+        if rec["id"] in self._id_map.values():
+            return True
+        # The echo can beat the POST response; match on the payload instead.
+        return any(
+            local["content"] == rec["content"] and local["record_time"] == rec["record_time"]
+            for local in self._local_records.values()
+        )
+
+    def trim(self) -> None:
+        """Drop pooled HTTP connections; they are reopened on the next request."""
+        api_client.close_session()
+
+    # ── Mutations ────────────────────────────────────────────────────
+    def create_worklog(
+        self, content: str, record_time: Optional[str] = None, tag_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Create a worklog locally and queue it for upload.
+
+        Returns the new record straight away with a temporary ``local-`` id so
+        the UI can show it without waiting for the network; call :meth:`flush`
+        (typically from a worker thread) to push it.  Once the server accepts
+        it, the returned dict is updated in place with the server's fields.
+        """
+        rec: Dict[str, Any] = {
+            "id": f"{LOCAL_ID_PREFIX}{uuid.uuid4().hex}",
+            "content": content,
+            "record_time": record_time or utc_now_iso(),
+        }
+        if tag_id:
+            rec["tag_id"] = tag_id
+        self.cache.upsert(rec)
+        payload = {"content": content, "record_time": rec["record_time"], "tag_id": tag_id}
+        if self.space_id:
+            payload["space_id"] = self.space_id
+        self._forget_etags()
+        self.cache.enqueue("create", rec["id"], payload)
+        self._local_records[rec["id"]] = rec
+        return rec
+
+    def update_worklog(self, rec: Mapping[str, Any], content: str) -> bool:
+        """Save new ``content`` for ``rec``; return ``False`` if only queued.
+
+        ``rec`` must hold the full content (see :meth:`load_full`), since it
+        is the base a concurrent edit is merged against.
+        """
+        if is_partial(rec):
+            raise ValueError("cannot edit a content excerpt; load_full() it first")
+        payload = {
+            "content": content,
+            "record_time": rec.get("record_time"),
+            "tag_id": rec.get("tag_id"),
+            "_base": {k: rec.get(k) for k in _BASE_FIELDS},
+        }
+        cached = {k: v for k, v in rec.items() if not str(k).startswith("_")}
+        cached["content"] = content
+        self.cache.upsert(cached)
+        return self._send_or_queue("update", self._resolve(rec["id"]), payload)
+
+    def delete_worklog(self, worklog_id: str) -> bool:
+        """Delete a worklog; return ``False`` if only queued."""
+        worklog_id = self._resolve(worklog_id)
+        self.cache.delete(worklog_id)
+        return self._send_or_queue("delete", worklog_id, None)
+
+    def _resolve(self, worklog_id: Any) -> str:
+        """Map a local id to its server id once the create has been synced."""
+        worklog_id = str(worklog_id)
+        return self._id_map.get(worklog_id, worklog_id)
+
+    def _send_or_queue(self, op: str, worklog_id: str, payload: Optional[Dict[str, Any]]) -> bool:
+        # Always queue first so the mutation survives a crash or a dropped
+        # connection, then push it (and anything queued before it) right away.
+        # The cache now differs from the server copy it was validated as.
+        self._forget_etags()
+        self.cache.enqueue(op, worklog_id, payload)
+        if self._can_reach():
+            self.flush()
+        return not self.has_pending()
+
+    def _send(self, token: str, op: str, worklog_id: str, payload: Optional[Dict[str, Any]]) -> None:
+        if op == "create":
+            created = api_client.create_worklog(token, **(payload or {}))
+            self._adopt_created(worklog_id, created or {})
+        elif op == "update":
+            self._send_update(token, self._resolve(worklog_id), dict(payload or {}))
+        elif op == "delete":
+            api_client.delete_worklog(token, self._resolve(worklog_id))
+        else:  # pragma: no cover - defensive
+            raise ValueError(f"unknown mutation {op!r}")
+
+    def _send_update(self, token: str, worklog_id: str, payload: Dict[str, Any]) -> None:
+        """PATCH an edit without clobbering concurrent edits made elsewhere.
+
+        The edit carries the version it was based on.  If the server copy has
+        moved on (seen via the change feed, a fresh GET, or a 409/412 answer to
+        the ``If-Match`` precondition) the content is three-way merged and
+        retried; only overlapping changes are handed to :attr:`on_conflict`.
+        """
+        base = payload.pop("_base", None)
+        if base is None:  # queued by an older version of the app
+            api_client.update_worklog(token, worklog_id, **payload)
+            return
+        current = self._remote.pop(worklog_id, None)
+        if current is None and not base.get("etag") and base.get("updated_at"):
+            # No ETag to send as a precondition: compare versions up front.
+            current = api_client.get_worklog(token, worklog_id)
+            if current is None:
+                _log.warning("Dropping edit of %s: deleted on the server", worklog_id)
+                return
+        typed = payload["content"]
+        for _attempt in range(_MAX_UPDATE_ATTEMPTS):
+            if current is not None and _changed_since(base, current):
+                payload = self._merge(worklog_id, base, payload, current)
+                if payload is None:
+                    return
+                base = {k: current.get(k) for k in _BASE_FIELDS}
+            try:
+                updated = api_client.update_worklog(
+                    token, worklog_id, if_match=base.get("etag"), **payload
+                )
+            except Exception as exc:
+                if _status_code(exc) not in (409, 412):
+                    raise
+                current = api_client.get_worklog(token, worklog_id)
+                if current is None:
+                    _log.warning("Dropping edit of %s: deleted on the server", worklog_id)
+                    return
+                continue
+            stored = self._store_updated(worklog_id, payload, updated)
+            if stored["content"] != typed and self.on_merged is not None:
+                self.on_merged(stored)
+            return
+        # Still racing another writer after several merges: let the user decide.
+        self._report_conflict(worklog_id, base, payload, current, merge3(
+            base.get("content") or "", payload["content"], current["content"]
+        ).text)
+
+    def _merge(
+        self, worklog_id: str, base: Mapping[str, Any], payload: Dict[str, Any], current: Mapping[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Three-way merge ``payload`` onto ``current``; ``None`` if handed to the user."""
+        result = merge3(base.get("content") or "", payload["content"], current["content"])
+        if result.conflict and self.on_conflict is not None:
+            self._report_conflict(worklog_id, base, payload, current, result.text)
+            return None
+        if result.conflict:
+            _log.warning("Conflicting edits of %s; keeping the local version", worklog_id)
+        merged = dict(payload, content=payload["content"] if result.conflict else result.text)
+        for field in ("record_time", "tag_id"):
+            if merged.get(field) == base.get(field):
+                merged[field] = current.get(field)
+        return merged
+
+    def _report_conflict(
+        self, worklog_id: str, base: Mapping[str, Any], payload: Mapping[str, Any],
+        current: Mapping[str, Any], merged: str,
+    ) -> None:
+        theirs = dict(current)
+        self.cache.upsert(theirs)
+        conflict = Conflict(worklog_id, base.get("content") or "", payload["content"], theirs, merged)
+        if self.on_conflict is not None:
+            self.on_conflict(conflict)
+        else:
+            _log.warning("Unresolved conflicting edits of %s", worklog_id)
+
+    def resolve_conflict(self, conflict: Conflict, content: str) -> bool:
+        """Save the user's resolution on top of the server version."""
+        return self.update_worklog(conflict.theirs, content)
+
+    def _store_updated(self, worklog_id: str, payload: Mapping[str, Any], updated: Any) -> Dict[str, Any]:
+        stored = {"id": worklog_id, **payload}
+        if isinstance(updated, dict):
+            stored.update(updated.get("data") if isinstance(updated.get("data"), dict) else updated)
+        stored["id"] = worklog_id
+        self.cache.upsert(stored)
+        return stored
+
+    def _adopt_created(self, local_id: str, created: Mapping[str, Any]) -> None:
+        """Swap a synced local record for the server's copy."""
+        rec = self._local_records.pop(local_id, None)
+        merged = dict(rec or {}, **created)
+        if "id" not in created:
+            # Server did not echo the record; keep serving the local copy.
+            merged["id"] = local_id
+        self._id_map[local_id] = str(merged["id"])
+        self.cache.delete(local_id)
+        self.cache.upsert(merged)
+        if rec is not None:
+            rec.update(merged)
+
+    def flush(self) -> int:
+        """Replay queued mutations in one burst and return how many were sent.
+
+        Stops at the first network failure, 429 or 5xx (the rest stay queued)
+        or on an authentication error.  Mutations the server rejects for other
+        reasons (another 4xx) are logged and dropped so they do not block the
+        queue forever.
+        """
+        token = self._get_token()
+        if not token:
+            return 0
+        with self._flush_lock:
+            done: List[int] = []
+            sent = 0
+            for item in _coalesce(self.cache.pending()):
+                if item["op"] is None:
+                    done.extend(item["seqs"])
+                    continue
+                try:
+                    self._send(token, item["op"], item["worklog_id"], item["payload"])
+                except NetworkError:
+                    self._unreachable()
+                    break
+                except Exception as exc:
+                    if _status_code(exc) in (401, 403):
+                        break
+                    if _is_transient(exc):
+                        # Kept queued like a network failure; retried later.
+                        _log.info("Server busy sending %s of %s: %s", item["op"], item["worklog_id"], exc)
+                        self._unreachable()
+                        break
+                    _log.warning("Dropping queued %s of %s: %s", item["op"], item["worklog_id"], exc)
+                    telemetry.record_error("sync.flush", exc)
+                else:
+                    self._reached()
+                    sent += 1
+                done.extend(item["seqs"])
+            self.cache.remove_pending(done)
+            return sent
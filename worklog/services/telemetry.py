@@ -0,0 +1,203 @@
+"""Local error and latency telemetry (``worklog stats``).
+
+Every API request records its endpoint, latency, status, throttle retries
+and response size, and background failures that used to be swallowed record
+where they happened.  Events are appended as JSON Lines to
+``$XDG_STATE_HOME/worklog/telemetry.jsonl`` (``~/.local/state/worklog`` by
+default), rotated at 1 MB with three old files kept.  Nothing is sent
+anywhere; :func:`summarize` turns the files into per-endpoint percentiles.
+
+Recording is off until :func:`enable` is called (the desktop app and the
+command line do), so library use and tests write nothing.
+``WORKLOG_TELEMETRY=0`` keeps it off.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+from urllib.parse import urlsplit
+
+_log = logging.getLogger(__name__)
+
+FILE_NAME = "telemetry.jsonl"
+MAX_FILE_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+PERCENTILES = (50, 95, 99)
+
+# Path segments that are record ids rather than routes: anything with a
+# digit, or long opaque tokens.
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[^/]+$|^[A-Za-z0-9_-]{16,}$")
+
+# Events go through a private logger so the stdlib handler does the
+# locking and rotation.
+_events = logging.getLogger("worklog.telemetry.events")
+_events.propagate = False
+_events.setLevel(logging.INFO)
+_handler: Optional[logging.Handler] = None
+
+
+def _get_state_dir() -> Path:
+    base = os.getenv("XDG_STATE_HOME") or Path.home() / ".local" / "state"
+    return Path(base) / "worklog"
+
+
+def enable(directory: Optional[Path] = None) -> bool:
+    """Start recording to ``directory`` (the state directory by default)."""
+    global _handler
+    if os.getenv("WORKLOG_TELEMETRY", "1") == "0":
+        return False
+    if _handler is not None:
+        return True
+    directory = directory or _get_state_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            directory / FILE_NAME, maxBytes=MAX_FILE_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8"
+        )
+    except OSError:
+        _log.warning("telemetry disabled: cannot write to %s", directory)
+        return False
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _events.addHandler(handler)
+    _handler = handler
+    return True
+
+
+def disable() -> None:
+    global _handler
+    if _handler is not None:
+        _events.removeHandler(_handler)
+        _handler.close()
+        _handler = None
+
+
+def enabled() -> bool:
+    return _handler is not None
+
+
+def _emit(event: Dict[str, Any]) -> None:
+    if _handler is None:
+        return
+    event["t"] = round(time.time(), 3)
+    _events.info(json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+
+
+def endpoint(method: str, url: str) -> str:
+    """``"GET /worklogs/{id}"`` for ``GET https://…/api/worklogs/abc123``."""
+    path = urlsplit(url).path
+    if path.startswith("/api/"):
+        path = path[4:]
+    parts = ["{id}" if _ID_SEGMENT.match(part) else part for part in path.split("/")]
+    return f"{method.upper()} {'/'.join(parts).rstrip('/') or '/'}"
+
+
+def record_request(
+    method: str,
+    url: str,
+    *,
+    seconds: float,
+    status: Optional[int],
+    retries: int = 0,
+    size: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    """One API call; ``status`` is ``None`` when no response arrived."""
+    if _handler is None:
+        return
+    event: Dict[str, Any] = {
+        "kind": "request",
+        "endpoint": endpoint(method, url),
+        "ms": round(seconds * 1000, 2),
+        "status": status,
+    }
+    if retries:
+        event["retries"] = retries
+    if size is not None:
+        event["bytes"] = size
+    if error:
+        event["error"] = error
+    _emit(event)
+
+
+def record_error(where: str, exc: BaseException) -> None:
+    """A background failure that is otherwise only logged (or ignored)."""
+    _emit({"kind": "error", "where": where, "type": type(exc).__name__, "message": str(exc)[:200]})
+
+
+# ── Reading ──────────────────────────────────────────────────────────
+def read_events(directory: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    """Recorded events, oldest first, across the rotated files."""
+    base = (directory or _get_state_dir()) / FILE_NAME
+    paths = [base.with_name(f"{FILE_NAME}.{i}") for i in range(BACKUP_COUNT, 0, -1)] + [base]
+    for path in paths:
+        try:
+            fh = open(path, encoding="utf-8")
+        except OSError:
+            continue
+        with fh:
+            for line in fh:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if isinstance(event, dict):
+                    yield event
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+@dataclass
+class EndpointStats:
+    count: int = 0
+    errors: int = 0  # no response, or a 4xx/5xx status
+    retries: int = 0
+    bytes: int = 0
+    latencies_ms: List[float] = field(default_factory=list, repr=False)
+
+    def percentiles(self) -> Dict[int, float]:
+        ordered = sorted(self.latencies_ms)
+        return {p: percentile(ordered, p) for p in PERCENTILES}
+
+
+@dataclass
+class Summary:
+    endpoints: Dict[str, EndpointStats] = field(default_factory=dict)
+    # "where: ExceptionType" -> count
+    errors: Dict[str, int] = field(default_factory=dict)
+    since: Optional[float] = None
+
+
+def summarize(events: Iterable[Mapping[str, Any]]) -> Summary:
+    summary = Summary()
+    for event in events:
+        if summary.since is None and isinstance(event.get("t"), (int, float)):
+            summary.since = float(event["t"])
+        kind = event.get("kind")
+        if kind == "request":
+            stats = summary.endpoints.setdefault(str(event.get("endpoint")), EndpointStats())
+            stats.count += 1
+            status = event.get("status")
+            if status is None or status >= 400:
+                stats.errors += 1
+            stats.retries += int(event.get("retries") or 0)
+            stats.bytes += int(event.get("bytes") or 0)
+            if isinstance(event.get("ms"), (int, float)):
+                stats.latencies_ms.append(float(event["ms"]))
+        elif kind == "error":
+            key = f"{event.get('where')}: {event.get('type')}"
+            summary.errors[key] = summary.errors.get(key, 0) + 1
+    return summary
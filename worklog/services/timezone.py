@@ -0,0 +1,197 @@
+"""Local-time conversion for grouping and displaying worklogs.
+
+``record_time`` values are stored in UTC; everything the user sees (the
+HH:MM on a row, which day card and month a log belongs to) uses one
+:class:`TimezoneService`.  Its zone is an IANA ``zoneinfo`` zone, so DST
+transitions are handled, and defaults to the system zone unless the user
+picked one (``WORKLOG_TIMEZONE`` or ``~/.config/worklog/settings.json``).
+Conversions are memoized since the same timestamps are converted on every
+redraw.
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+_CACHE_SIZE = 64 * 1024
+_UTC = _dt.timezone.utc
+
+
+def _get_settings_path() -> Path:
+    return Path.home() / ".config" / "worklog" / "settings.json"
+
+
+def _read_settings() -> dict:
+    try:
+        with _get_settings_path().open("r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def load_zone_name() -> Optional[str]:
+    """The user's chosen zone: ``WORKLOG_TIMEZONE``, then the settings file."""
+    name = os.getenv("WORKLOG_TIMEZONE") or _read_settings().get("timezone")
+    return name or None
+
+
+def save_zone_name(name: Optional[str]) -> None:
+    """Persist the chosen zone (``None`` follows the system zone)."""
+    path = _get_settings_path()
+    data = _read_settings()
+    if name:
+        data["timezone"] = name
+    else:
+        data.pop("timezone", None)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def zone_names() -> list:
+    """All IANA zone names, sorted (for pickers)."""
+    return sorted(available_timezones())
+
+
+def resolve_zone(name: str) -> ZoneInfo:
+    """Return the zone called ``name``; raise ``ValueError`` if unknown."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"unknown timezone {name!r}") from None
+
+
+def system_zone() -> _dt.tzinfo:
+    """Best-effort IANA zone of the host (``TZ``, then ``/etc/localtime``)."""
+    candidates = [os.environ.get("TZ", "").lstrip(":")]
+    try:
+        target = os.path.realpath("/etc/localtime")
+        if "zoneinfo/" in target:
+            candidates.append(target.split("zoneinfo/", 1)[1])
+    except OSError:
+        pass
+    try:
+        candidates.append(Path("/etc/timezone").read_text(encoding="utf-8").strip())
+    except OSError:
+        pass
+    for name in candidates:
+        if name:
+            try:
+                return resolve_zone(name)
+            except ValueError:
+                continue
+    # Last resort: the current fixed offset (not DST-aware).
+    return _dt.datetime.now().astimezone().tzinfo or _UTC
+
+
+def _parse_utc(record_time: str) -> Optional[_dt.datetime]:
+    try:
+        dt = _dt.datetime.fromisoformat(record_time)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=_UTC)  # the API's record_time is UTC
+    return dt
+
+
+class TimezoneService:
+    """Convert UTC ``record_time`` strings to the selected local zone."""
+
+    def __init__(self, zone_name: Optional[str] = None, *, cache_size: int = _CACHE_SIZE) -> None:
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._listeners: list = []
+        self.zone_name: Optional[str] = None
+        self.zone: _dt.tzinfo = _UTC
+        self._apply(zone_name)
+
+    def _apply(self, zone_name: Optional[str]) -> None:
+        zone = resolve_zone(zone_name) if zone_name else system_zone()
+        with self._lock:
+            self.zone_name = zone_name or None
+            self.zone = zone
+
+            @lru_cache(maxsize=self._cache_size)
+            def convert(record_time: str) -> Optional[_dt.datetime]:
+                dt = _parse_utc(record_time)
+                return dt.astimezone(zone) if dt is not None else None
+
+            self._convert = convert
+
+    def set_zone(self, zone_name: Optional[str], *, persist: bool = False) -> None:
+        """Switch zones (``None`` = system zone) and notify listeners.
+
+        Raises ``ValueError`` for an unknown zone name.
+        """
+        self._apply(zone_name)
+        if persist:
+            save_zone_name(zone_name)
+        for listener in list(self._listeners):
+            listener()
+
+    def connect(self, listener: Callable[[], None]) -> None:
+        """Call ``listener()`` after every zone change."""
+        self._listeners.append(listener)
+
+    def disconnect(self, listener: Callable[[], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @property
+    def label(self) -> str:
+        return self.zone_name or getattr(self.zone, "key", None) or str(self.zone)
+
+    # ── Conversions ──────────────────────────────────────────────────
+    def to_local(self, record_time: Any) -> Optional[_dt.datetime]:
+        """``record_time`` as an aware datetime in the selected zone."""
+        if not isinstance(record_time, str) or not record_time:
+            return None
+        return self._convert(record_time)
+
+    def local_date(self, record_time: Any) -> Optional[_dt.date]:
+        dt = self.to_local(record_time)
+        return dt.date() if dt is not None else None
+
+    def time_str(self, record_time: Any) -> str:
+        """HH:MM in the selected zone (best effort for unparsable values)."""
+        dt = self.to_local(record_time)
+        if dt is None:
+            s = str(record_time or "")
+            return s[11:16] if len(s) >= 16 else s
+        return dt.strftime("%H:%M")
+
+    def month_bounds(self, year: int, month: int) -> Tuple[str, str]:
+        """UTC ``[start, end)`` of a local month, comparable with ``record_time``.
+
+        The bounds have no ``Z`` suffix so they sort correctly against both
+        ``...Z`` and naive timestamps.
+        """
+        start = _dt.datetime(year, month, 1, tzinfo=self.zone)
+        end = _dt.datetime(year + month // 12, month % 12 + 1, 1, tzinfo=self.zone)
+        return tuple(  # type: ignore[return-value]
+            d.astimezone(_UTC).replace(tzinfo=None).isoformat(timespec="seconds") for d in (start, end)
+        )
+
+    def cache_info(self):
+        return self._convert.cache_info()
+
+
+_default: Optional[TimezoneService] = None
+
+
+def get_timezone_service() -> TimezoneService:
+    """The shared service, created from the saved preference on first use."""
+    global _default
+    if _default is None:
+        try:
+            _default = TimezoneService(load_zone_name())
+        except ValueError:
+            _default = TimezoneService()
+    return _default
@@ -0,0 +1,305 @@
+"""On-disk SQLite cache for worklogs and queued offline mutations.
+
+The cache mirrors the last successful ``GET /worklogs`` response so the main
+window can still show data when the backend is unreachable.  Edits and deletes
+made while offline are written through to the cached rows and recorded in a
+``pending`` table that :class:`~worklog.services.sync_engine.SyncEngine`
+replays once the network comes back.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+from ..services.ingest import LogRecord, loads
+from ..services.timezone import get_timezone_service
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS worklogs (
+    id TEXT PRIMARY KEY,
+    record_time TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS worklogs_record_time ON worklogs (record_time);
+-- Logs per UTC quarter hour ("YYYY-MM-DDTHH:MM"), kept in step with
+-- ``worklogs`` by triggers.  Quarter hours line up with every zone offset,
+-- so per-day totals in any zone come from these rows alone.
+CREATE TABLE IF NOT EXISTS slot_counts (
+    slot TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pending (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    worklog_id TEXT NOT NULL,
+    payload TEXT,
+    created_at REAL NOT NULL
+);
+-- Unsaved editor text, so a crash or an accidental close loses nothing.
+CREATE TABLE IF NOT EXISTS drafts (
+    worklog_id TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    saved_at REAL NOT NULL
+);
+-- Small bookkeeping values, e.g. the ETag of the cached /worklogs response.
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+_SCHEMA_VERSION = 1
+
+
+def _slot(col: str) -> str:
+    return f"substr({col}, 1, 14) || printf('%02d', CAST(substr({col}, 15, 2) AS INTEGER) / 15 * 15)"
+
+
+_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS worklogs_count_insert AFTER INSERT ON worklogs
+    WHEN NEW.record_time IS NOT NULL BEGIN
+        INSERT INTO slot_counts VALUES ({_slot("NEW.record_time")}, 1)
+        ON CONFLICT (slot) DO UPDATE SET n = n + 1;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS worklogs_count_delete AFTER DELETE ON worklogs
+    WHEN OLD.record_time IS NOT NULL BEGIN
+        UPDATE slot_counts SET n = n - 1 WHERE slot = {_slot("OLD.record_time")};
+        DELETE FROM slot_counts WHERE n <= 0;
+    END""",
+)
+
+
+def _rebuild_slot_counts(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM slot_counts")
+    conn.execute(
+        f"INSERT INTO slot_counts SELECT {_slot('record_time')}, COUNT(*)"
+        " FROM worklogs WHERE record_time IS NOT NULL GROUP BY 1"
+    )
+
+
+def _get_cache_path() -> Path:
+    return Path.home() / ".cache" / "worklog" / "cache.sqlite3"
+
+
+def space_cache_path(space_id: Optional[str]) -> Path:
+    """Cache file of one space; ``None`` is the single-space cache."""
+    if space_id is None:
+        return _get_cache_path()
+    return _get_cache_path().parent / "spaces" / f"{quote(str(space_id), safe='')}.sqlite3"
+
+
+class LogCache:
+    """Thread-safe SQLite store for cached worklogs and pending mutations."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self._path = path or _get_cache_path()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if str(self._path) != ":memory:":
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), check_same_thread=False)
+            # Let INSERT OR REPLACE fire the delete trigger for the old row.
+            conn.execute("PRAGMA recursive_triggers = ON")
+            conn.executescript(_SCHEMA)
+            with conn:
+                for trigger in _TRIGGERS:
+                    conn.execute(trigger)
+                (version,) = conn.execute("PRAGMA user_version").fetchone()
+                if version < _SCHEMA_VERSION:  # aggregate table is new
+                    _rebuild_slot_counts(conn)
+                    conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ── Cached worklogs ──────────────────────────────────────────────
+    def replace_all(self, logs: Iterable[Mapping[str, Any]]) -> None:
+        """Replace every cached worklog with ``logs`` in one transaction."""
+        rows = [
+            (str(rec["id"]), rec.get("record_time"), json.dumps(rec))
+            for rec in logs
+            if rec.get("id") is not None
+        ]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                # Rebuilding the aggregate in one pass is much cheaper than
+                # letting the triggers fire for every deleted/inserted row.
+                conn.execute("BEGIN")  # make the trigger swap part of the transaction
+                conn.execute("DROP TRIGGER worklogs_count_insert")
+                conn.execute("DROP TRIGGER worklogs_count_delete")
+                conn.execute("DELETE FROM worklogs")
+                conn.executemany("INSERT INTO worklogs VALUES (?, ?, ?)", rows)
+                _rebuild_slot_counts(conn)
+                for trigger in _TRIGGERS:
+                    conn.execute(trigger)
+
+    def load_all(self) -> List[LogRecord]:
+        """Return all cached worklogs, newest first."""
+        with self._lock:
+            cur = self._connect().execute(
+                "SELECT payload FROM worklogs ORDER BY record_time DESC"
+            )
+            rows = cur.fetchall()
+        # Rows were validated when they were fetched or created.
+        return [loads(payload) for (payload,) in rows]
+
+    def load_month(self, year: int, month: int) -> List[LogRecord]:
+        """Return cached worklogs whose local ``record_time`` falls in ``year-month``."""
+        start, end = get_timezone_service().month_bounds(year, month)
+        with self._lock:
+            cur = self._connect().execute(
+                "SELECT payload FROM worklogs WHERE record_time >= ? AND record_time < ?"
+                " ORDER BY record_time DESC",
+                (start, end),
+            )
+            rows = cur.fetchall()
+        # Rows were validated when they were fetched or created.
+        return [loads(payload) for (payload,) in rows]
+
+    def slot_counts(self, start: str, end: str) -> List[Tuple[str, int]]:
+        """Return ``(slot, count)`` per UTC quarter hour in ``[start, end)``.
+
+        Slots are ``YYYY-MM-DDTHH:MM`` strings.  Answered from the aggregate
+        table, so the cost does not grow with the number of logs.
+        """
+        with self._lock:
+            cur = self._connect().execute(
+                "SELECT slot, n FROM slot_counts WHERE slot >= ? AND slot < ? ORDER BY slot",
+                (start[:16], end[:16]),
+            )
+            return cur.fetchall()
+
+    def newest_record_time(self) -> Optional[str]:
+        with self._lock:
+            (value,) = self._connect().execute("SELECT MAX(record_time) FROM worklogs").fetchone()
+            return value
+
+    def contains(self, worklog_id: str) -> bool:
+        with self._lock:
+            row = self._connect().execute("SELECT 1 FROM worklogs WHERE id = ?", (str(worklog_id),)).fetchone()
+            return row is not None
+
+    def upsert(self, rec: Mapping[str, Any]) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO worklogs VALUES (?, ?, ?)",
+                    (str(rec["id"]), rec.get("record_time"), json.dumps(rec)),
+                )
+
+    def delete(self, worklog_id: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM worklogs WHERE id = ?", (str(worklog_id),))
+
+    # ── Pending mutation queue ───────────────────────────────────────
+    def enqueue(self, op: str, worklog_id: str, payload: Optional[Mapping[str, Any]] = None) -> int:
+        """Append a mutation to the pending queue and return its sequence number."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cur = conn.execute(
+                    "INSERT INTO pending (op, worklog_id, payload, created_at) VALUES (?, ?, ?, ?)",
+                    (
+                        op,
+                        str(worklog_id),
+                        json.dumps(payload) if payload is not None else None,
+                        time.time(),
+                    ),
+                )
+            return int(cur.lastrowid)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Return queued mutations in the order they were made."""
+        with self._lock:
+            cur = self._connect().execute(
+                "SELECT seq, op, worklog_id, payload FROM pending ORDER BY seq"
+            )
+            return [
+                {
+                    "seq": seq,
+                    "op": op,
+                    "worklog_id": worklog_id,
+                    "payload": json.loads(payload) if payload else None,
+                }
+                for seq, op, worklog_id, payload in cur.fetchall()
+            ]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            (count,) = self._connect().execute("SELECT COUNT(*) FROM pending").fetchone()
+            return int(count)
+
+    def remove_pending(self, seqs: Iterable[int]) -> None:
+        seqs = [(int(s),) for s in seqs]
+        if not seqs:
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("DELETE FROM pending WHERE seq = ?", seqs)
+
+    # ── Editor drafts ────────────────────────────────────────────────
+    def save_draft(self, worklog_id: str, content: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO drafts VALUES (?, ?, ?)",
+                    (str(worklog_id), content, time.time()),
+                )
+
+    def load_draft(self, worklog_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT content FROM drafts WHERE worklog_id = ?", (str(worklog_id),)
+            ).fetchone()
+            return row[0] if row else None
+
+    def discard_draft(self, worklog_id: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM drafts WHERE worklog_id = ?", (str(worklog_id),))
+
+    # ── Bookkeeping ──────────────────────────────────────────────────
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+
+    def set_meta(self, key: str, value: Optional[str]) -> None:
+        """Store ``value`` under ``key`` (``None`` deletes it)."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if value is None:
+                    conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+                else:
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def clear(self) -> None:
+        """Drop all cached data, e.g. on sign-out."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM worklogs")
+                conn.execute("DELETE FROM pending")
+                conn.execute("DELETE FROM drafts")
+                conn.execute("DELETE FROM meta")
@@ -0,0 +1,238 @@
+"""In-memory working set of worklogs, partitioned by month.
+
+Only recently viewed months stay resident; once the approximate size of the
+resident records exceeds the configured budget, the least recently used
+months are evicted.  Evicted months are transparently reloaded from the
+on-disk :class:`~worklog.stores.log_cache.LogCache` when viewed again.
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ..services.memory import env_megabytes
+from ..services.timezone import TimezoneService, get_timezone_service
+from .log_cache import LogCache
+
+_log = logging.getLogger(__name__)
+
+_DEFAULT_BUDGET_MB = 16
+
+MonthKey = Tuple[int, int]
+
+
+def record_date(rec: Mapping[str, Any], tz: Optional[TimezoneService] = None) -> Optional[_dt.date]:
+    """Return the local calendar date of a record's ``record_time`` (``None`` if unknown)."""
+    rt = rec.get("record_time")
+    if not rt:
+        return None
+    d = (tz or get_timezone_service()).local_date(rt)
+    if d is not None:
+        return d
+    try:
+        return _dt.date.fromisoformat(str(rt)[:10])
+    except ValueError:
+        return None
+
+
+def group_by_day(
+    records: Iterable[Mapping[str, Any]], tz: Optional[TimezoneService] = None
+) -> Dict[_dt.date, List[Mapping[str, Any]]]:
+    """Group records by local date (undated ones under today), keeping their order."""
+    tz = tz or get_timezone_service()
+    today = _dt.date.today()
+    groups: Dict[_dt.date, List[Mapping[str, Any]]] = {}
+    for rec in records:
+        groups.setdefault(record_date(rec, tz) or today, []).append(rec)
+    return groups
+
+
+def _month_key(rec: Mapping[str, Any]) -> MonthKey:
+    d = record_date(rec) or _dt.date.today()
+    return d.year, d.month
+
+
+def approx_record_size(rec: Mapping[str, Any]) -> int:
+    """Shallow size estimate of a record dict and its keys/values in bytes."""
+    size = sys.getsizeof(rec)
+    for key, value in rec.items():
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+@dataclass(frozen=True)
+class WorkingSetStats:
+    months: int
+    records: int
+    approx_bytes: int
+
+
+@dataclass(frozen=True)
+class YearSummary:
+    """Logs per local day and per month of one year."""
+
+    year: int
+    days: Dict[_dt.date, int]
+    months: Tuple[int, ...]  # 12 counts, January first
+
+    @property
+    def total(self) -> int:
+        return sum(self.months)
+
+    @property
+    def busiest_day(self) -> int:
+        return max(self.days.values(), default=0)
+
+
+class LogStore:
+    """Thread-safe, size-bounded LRU of month partitions."""
+
+    def __init__(self, cache: LogCache, budget_bytes: Optional[int] = None) -> None:
+        self._cache = cache
+        if budget_bytes is None:
+            budget_bytes = env_megabytes("WORKLOG_LOG_CACHE_MB", _DEFAULT_BUDGET_MB)
+        self.budget_bytes = budget_bytes
+        self._lock = threading.RLock()
+        # Month -> records, least recently used first.
+        self._months: "OrderedDict[MonthKey, List[Dict[str, Any]]]" = OrderedDict()
+        self._sizes: Dict[MonthKey, int] = {}
+        self._newest: Optional[MonthKey] = None
+
+    # ── Loading ──────────────────────────────────────────────────────
+    def replace(self, logs: Iterable[Dict[str, Any]]) -> None:
+        """Load a fresh full result set (e.g. after a fetch).
+
+        Months viewed before keep their recency; the remaining months are
+        added oldest first, so under a tight budget the newest ones survive.
+        """
+        parts: Dict[MonthKey, List[Dict[str, Any]]] = {}
+        for rec in logs:
+            parts.setdefault(_month_key(rec), []).append(rec)
+        with self._lock:
+            viewed = [key for key in self._months if key in parts]
+            self._months.clear()
+            self._sizes.clear()
+            for key in sorted(k for k in parts if k not in viewed):
+                self._put(key, parts[key])
+            for key in viewed:
+                self._put(key, parts[key])
+            self._newest = max(parts) if parts else None
+            self._evict(keep=viewed[-1:] or ([self._newest] if self._newest else []))
+        self._report()
+
+    def month(self, month: _dt.date) -> List[Dict[str, Any]]:
+        """Return the live records of ``month``, loading it from disk if evicted."""
+        key = (month.year, month.month)
+        with self._lock:
+            recs = self._months.get(key)
+            if recs is not None:
+                self._months.move_to_end(key)
+            else:
+                recs = self._cache.load_month(*key)
+                self._put(key, recs)
+                self._evict(keep=[key])
+            result = [rec for rec in recs if not rec.get("_deleted")]
+        self._report()
+        return result
+
+    def newest_month(self) -> Optional[_dt.date]:
+        with self._lock:
+            key = self._newest
+        if key is None:
+            newest = self._cache.newest_record_time()
+            d = record_date({"record_time": newest}) if newest else None
+            if d is None:
+                return None
+            key = (d.year, d.month)
+        return _dt.date(key[0], key[1], 1)
+
+    def add(self, rec: Dict[str, Any]) -> None:
+        """Add a newly created record to its month if that month is resident."""
+        key = _month_key(rec)
+        with self._lock:
+            recs = self._months.get(key)
+            if recs is not None:
+                recs.append(rec)
+                self._sizes[key] += approx_record_size(rec)
+            if self._newest is None or key > self._newest:
+                self._newest = key
+
+    def upsert(self, rec: Dict[str, Any]) -> None:
+        """Insert or replace a record by id (e.g. from the change feed)."""
+        with self._lock:
+            self._discard(str(rec["id"]))
+        self.add(rec)
+
+    def remove(self, worklog_id: str) -> None:
+        with self._lock:
+            self._discard(str(worklog_id))
+
+    def _discard(self, worklog_id: str) -> None:
+        for key, recs in self._months.items():
+            for i, other in enumerate(recs):
+                if str(other["id"]) == worklog_id:
+                    self._sizes[key] -= approx_record_size(recs.pop(i))
+                    return
+
+    def clear(self) -> None:
+        """Drop every resident month (the disk cache is untouched)."""
+        with self._lock:
+            self._months.clear()
+            self._sizes.clear()
+            self._newest = None
+
+    def year_summary(self, year: int, tz: Optional[TimezoneService] = None) -> YearSummary:
+        """Per-day and per-month counts for ``year`` in the selected zone.
+
+        Built from the cache's quarter-hour aggregates, so no individual log
+        is loaded (at most ~35k aggregate rows per year).
+        """
+        tz = tz or get_timezone_service()
+        start = tz.month_bounds(year, 1)[0]
+        end = tz.month_bounds(year, 12)[1]
+        days: Dict[_dt.date, int] = {}
+        months = [0] * 12
+        for slot, count in self._cache.slot_counts(start, end):
+            d = tz.local_date(slot + ":00Z")
+            if d is None or d.year != year:
+                continue
+            days[d] = days.get(d, 0) + count
+            months[d.month - 1] += count
+        return YearSummary(year, days, tuple(months))
+
+    # ── Accounting ───────────────────────────────────────────────────
+    def stats(self) -> WorkingSetStats:
+        with self._lock:
+            return WorkingSetStats(
+                months=len(self._months),
+                records=sum(len(recs) for recs in self._months.values()),
+                approx_bytes=sum(self._sizes.values()),
+            )
+
+    def _put(self, key: MonthKey, recs: List[Dict[str, Any]]) -> None:
+        self._months[key] = recs
+        self._months.move_to_end(key)
+        self._sizes[key] = sum(approx_record_size(rec) for rec in recs)
+
+    def _evict(self, keep: Iterable[MonthKey]) -> None:
+        keep = set(keep)
+        total = sum(self._sizes.values())
+        for key in list(self._months):
+            if total <= self.budget_bytes:
+                break
+            if key in keep:
+                continue
+            total -= self._sizes.pop(key)
+            del self._months[key]
+
+    def _report(self) -> None:
+        if _log.isEnabledFor(logging.DEBUG):
+            s = self.stats()
+            _log.debug("log working set: %d months, %d records, ~%d KiB",
+                       s.months, s.records, s.approx_bytes // 1024)
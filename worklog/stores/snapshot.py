@@ -0,0 +1,121 @@
+"""Startup snapshot of the last-viewed month, for an instant first paint.
+
+On shutdown (or when the main window is hidden) the app writes the month on
+screen to a small file: the records' grid fields and their rendered
+markup.  On the next start the window paints from it before the log cache
+database is opened or the network is touched, then reconciles with the
+store.  The file starts with a fixed header (magic, format version, payload
+length) so a snapshot from another version is ignored rather than misread;
+the payload is JSON, decoded by the fastest available backend.
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import json
+import logging
+import os
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from ..services.ingest import TRUNCATED_FLAG, loads
+
+_log = logging.getLogger(__name__)
+
+MAGIC = b"WLSN"
+VERSION = 1
+_HEADER = struct.Struct("<4sHI")  # magic, version, payload length
+# What a day card needs; anything else is reloaded from the store.
+_FIELDS = ("id", "record_time", "content", "tag_id", "updated_at", TRUNCATED_FLAG)
+
+
+def _get_snapshot_path() -> Path:
+    return Path.home() / ".cache" / "worklog" / "snapshot.bin"
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    month: _dt.date
+    records: List[Dict[str, Any]]
+    space_id: Optional[str] = None
+    zone: str = ""
+    # Record id -> Pango markup of what its row shows (a preview if long).
+    markup: Dict[str, str] = field(default_factory=dict)
+    saved_at: float = 0.0
+
+    def matches(self, *, space_id: Optional[str], zone: str) -> bool:
+        """Whether it shows what the window would show (same space and zone)."""
+        return self.space_id == space_id and self.zone == zone
+
+
+def encode(snapshot: Snapshot) -> bytes:
+    payload = json.dumps(
+        {
+            "month": snapshot.month.isoformat(),
+            "space_id": snapshot.space_id,
+            "zone": snapshot.zone,
+            "saved_at": snapshot.saved_at or time.time(),
+            "records": [
+                {k: rec[k] for k in _FIELDS if rec.get(k) is not None}
+                for rec in snapshot.records
+                if not rec.get("_deleted")
+            ],
+            "markup": snapshot.markup,
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return _HEADER.pack(MAGIC, VERSION, len(payload)) + payload
+
+
+def decode(data: bytes) -> Optional[Snapshot]:
+    """Parse a snapshot; ``None`` if it is from another version or damaged."""
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, length = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or len(data) != _HEADER.size + length:
+        return None
+    try:
+        doc: Mapping[str, Any] = loads(data[_HEADER.size:])
+        return Snapshot(
+            month=_dt.date.fromisoformat(doc["month"]),
+            records=list(doc["records"]),
+            space_id=doc.get("space_id"),
+            zone=doc.get("zone") or "",
+            markup=dict(doc.get("markup") or {}),
+            saved_at=float(doc.get("saved_at") or 0),
+        )
+    except Exception:
+        return None
+
+
+def save(snapshot: Snapshot, path: Optional[Path] = None) -> None:
+    """Write ``snapshot`` atomically (a crash leaves the previous one)."""
+    path = path or _get_snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(encode(snapshot))
+    os.replace(tmp, path)
+
+
+def load(path: Optional[Path] = None) -> Optional[Snapshot]:
+    path = path or _get_snapshot_path()
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    snapshot = decode(data)
+    if snapshot is None:
+        _log.info("ignoring unreadable startup snapshot %s", path)
+    return snapshot
+
+
+def discard(path: Optional[Path] = None) -> None:
+    """Delete the snapshot (e.g. on sign-out)."""
+    try:
+        (path or _get_snapshot_path()).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,111 @@
+"""Tag → record bitset index for include/exclude filtering.
+
+Every indexed record gets a bit position; each tag keeps an ``int`` whose set
+bits are the records carrying it.  A filter is then a couple of big-int
+``&`` / ``~`` operations, and only records whose visibility actually changed
+need to be touched (``old_mask ^ new_mask``).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class TagFilter:
+    """Show only ``include`` (if set), minus every tag in ``exclude``."""
+
+    include: Optional[str] = None
+    exclude: FrozenSet[str] = field(default_factory=frozenset)
+
+    @property
+    def active(self) -> bool:
+        return self.include is not None or bool(self.exclude)
+
+
+def _tag_of(rec: Mapping[str, Any]) -> Optional[str]:
+    tag = rec.get("tag_id")
+    return str(tag) if tag else None
+
+
+class TagIndex:
+    """Bitsets of record positions per ``tag_id`` (``None`` = untagged)."""
+
+    def __init__(self, records: Iterable[Mapping[str, Any]] = ()) -> None:
+        self._ids: List[Optional[str]] = []  # position -> id (None once removed)
+        self._pos: Dict[str, int] = {}
+        self._tag_at: Dict[int, Optional[str]] = {}
+        self._tags: Dict[Optional[str], int] = {}
+        self._all = 0
+        for rec in records:
+            self.add(rec)
+
+    def __len__(self) -> int:
+        return self._all.bit_count()
+
+    def __contains__(self, worklog_id: object) -> bool:
+        return worklog_id in self._pos
+
+    # ── Maintenance ──────────────────────────────────────────────────
+    def add(self, rec: Mapping[str, Any]) -> None:
+        """Index ``rec``; re-adding an id updates its tag."""
+        worklog_id = str(rec["id"])
+        if worklog_id in self._pos:
+            self.remove(worklog_id)
+        pos = len(self._ids)
+        self._ids.append(worklog_id)
+        self._pos[worklog_id] = pos
+        tag = _tag_of(rec)
+        self._tag_at[pos] = tag
+        bit = 1 << pos
+        self._tags[tag] = self._tags.get(tag, 0) | bit
+        self._all |= bit
+
+    def remove(self, worklog_id: str) -> None:
+        pos = self._pos.pop(str(worklog_id), None)
+        if pos is None:
+            return
+        self._ids[pos] = None
+        tag = self._tag_at.pop(pos)
+        bit = 1 << pos
+        self._all &= ~bit
+        remaining = self._tags[tag] & ~bit
+        if remaining:
+            self._tags[tag] = remaining
+        else:
+            del self._tags[tag]
+
+    # ── Queries ──────────────────────────────────────────────────────
+    def tags(self) -> List[Tuple[str, int]]:
+        """``(tag_id, record count)`` for every tag in use, by tag id."""
+        return sorted((tag, mask.bit_count()) for tag, mask in self._tags.items() if tag is not None)
+
+    def mask(self, tag_filter: TagFilter) -> int:
+        """Bitset of the records ``tag_filter`` lets through."""
+        if tag_filter.include is not None:
+            result = self._tags.get(tag_filter.include, 0)
+        else:
+            result = self._all
+        for tag in tag_filter.exclude:
+            result &= ~self._tags.get(tag, 0)
+        return result
+
+    def matches(self, worklog_id: str, mask: int) -> bool:
+        pos = self._pos.get(str(worklog_id))
+        return pos is not None and bool(mask >> pos & 1)
+
+    def ids(self, mask: int) -> Iterator[str]:
+        """Ids of the records whose bits are set in ``mask``."""
+        ids = self._ids
+        while mask:
+            low = mask & -mask
+            worklog_id = ids[low.bit_length() - 1]
+            if worklog_id is not None:
+                yield worklog_id
+            mask ^= low
+
+    @property
+    def all(self) -> int:
+        """Bitset of every indexed record."""
+        return self._all
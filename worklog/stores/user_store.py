@@ -36,6 +36,9 @@ from ..auth.firebase import load_firebase_config
 
 _ENC_KEY = b"worklog"
 _DEFAULT_REFRESH_INTERVAL = 55 * 60  # 55 minutes
+# securetoken answers these when the refresh token itself is no longer valid;
+# only then is the user signed out.
+_INVALID_REFRESH_STATUSES = (400, 401, 403)
 
 
 def _get_cred_path() -> Path:
@@ -75,6 +78,7 @@ if GI_AVAILABLE:
         """Store and refresh authentication tokens."""
 
         token = GObject.Property(type=str, default=None)
+        offline = GObject.Property(type=bool, default=False)
 
         def __init__(
             self,
@@ -84,6 +88,7 @@ if GI_AVAILABLE:
             super().__init__()
             self.token: str | None = None
             self.refresh_token: str | None = None
+            self.offline = False
             self._cred_path = _get_cred_path()
             self._firebase_cfg = load_firebase_config()
             self._refresh_interval = refresh_interval
@@ -139,7 +144,7 @@ if GI_AVAILABLE:
             if not self.refresh_token:
                 return
             import json as _json
-            from urllib import request, parse
+            from urllib import error, request, parse
 
             data = parse.urlencode(
                 {
@@ -160,7 +165,19 @@ if GI_AVAILABLE:
                 with request.urlopen(req, timeout=10) as resp:
                     payload = _json.loads(resp.read().decode())
                 self.token = payload.get("id_token")
+                self.offline = False
                 self.save_credentials()
+            except error.HTTPError as exc:
+                if exc.code in _INVALID_REFRESH_STATUSES:
+                    self.sign_out()
+                else:
+                    # Throttled or a server error: keep the credentials and
+                    # retry on the next refresh.
+                    self.offline = True
+            except (error.URLError, OSError):
+                # Network unreachable: keep the credentials and operate
+                # offline until the next refresh succeeds.
+                self.offline = True
             except Exception:
                 self.sign_out()
 
@@ -182,6 +199,7 @@ else:
         ):
             self.token: str | None = None
             self.refresh_token: str | None = None
+            self.offline = False
             self._cred_path = _get_cred_path()
             self._firebase_cfg = load_firebase_config()
             self._refresh_interval = refresh_interval
@@ -239,7 +257,7 @@ else:
             if not self.refresh_token:
                 return
             import json as _json
-            from urllib import request, parse
+            from urllib import error, request, parse
 
             data = parse.urlencode(
                 {
@@ -260,7 +278,19 @@ else:
                 with request.urlopen(req, timeout=10) as resp:
                     payload = _json.loads(resp.read().decode())
                 self.token = payload.get("id_token")
+                self.offline = False
                 self.save_credentials()
+            except error.HTTPError as exc:
+                if exc.code in _INVALID_REFRESH_STATUSES:
+                    self.sign_out()
+                else:
+                    # Throttled or a server error: keep the credentials and
+                    # retry on the next refresh.
+                    self.offline = True
+            except (error.URLError, OSError):
+                # Network unreachable: keep the credentials and operate
+                # offline until the next refresh succeeds.
+                self.offline = True
             except Exception:
                 self.sign_out()
 
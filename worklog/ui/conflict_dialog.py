@@ -0,0 +1,99 @@
+"""Dialog shown when a log was edited here and elsewhere in the same place."""
+
+from typing import Any, Callable, Mapping, Optional
+
+from .tasks import run_in_background
+
+try:
+    import gi
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("Pango", "1.0")
+    from gi.repository import Gtk, Pango
+    GTK_AVAILABLE = True
+except Exception:  # pragma: no cover - gi not installed
+    Gtk = Pango = None  # type: ignore
+    GTK_AVAILABLE = False
+
+
+if GTK_AVAILABLE:
+
+    class ConflictDialog(Gtk.Window):  # pragma: no cover - UI code
+        """Let the user keep either version or edit the marked-up merge.
+
+        Only overlapping edits reach this dialog; everything else is merged
+        automatically by the sync engine.
+        """
+
+        def __init__(
+            self,
+            sync_engine: Any,
+            conflict: Any,
+            on_resolved: Optional[Callable[[Mapping[str, Any]], None]] = None,
+            **kwargs,
+        ) -> None:
+            super().__init__(**kwargs)
+            self._sync_engine = sync_engine
+            self._conflict = conflict
+            self._on_resolved = on_resolved
+
+            self.set_title("編輯衝突")
+            self.set_modal(True)
+            self.set_default_size(480, 320)
+
+            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+            box.set_margin_top(16)
+            box.set_margin_bottom(16)
+            box.set_margin_start(16)
+            box.set_margin_end(16)
+
+            hint = Gtk.Label(
+                label="這則紀錄在其他裝置上也被修改了，請選擇要保留的版本或手動合併。",
+                xalign=0,
+            )
+            hint.set_wrap(True)
+            box.append(hint)
+
+            scrolled = Gtk.ScrolledWindow()
+            scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+            scrolled.set_vexpand(True)
+            self._textview = Gtk.TextView()
+            self._textview.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
+            self._textview.set_monospace(True)
+            self._textview.get_buffer().set_text(conflict.merged)
+            scrolled.set_child(self._textview)
+            box.append(scrolled)
+
+            buttons = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+            buttons.set_halign(Gtk.Align.END)
+            for label, handler in (
+                ("保留我的", lambda *_: self._resolve(conflict.mine)),
+                ("保留對方的", lambda *_: self._resolve(conflict.theirs["content"])),
+                ("儲存", lambda *_: self._resolve(self._text())),
+            ):
+                btn = Gtk.Button.new_with_label(label)
+                btn.connect("clicked", handler)
+                buttons.append(btn)
+            buttons.get_last_child().add_css_class("suggested-action")
+            box.append(buttons)
+
+            self.set_child(box)
+
+        def _text(self) -> str:
+            buffer = self._textview.get_buffer()
+            start, end = buffer.get_bounds()
+            return buffer.get_text(start, end, True)
+
+        def _resolve(self, content: str) -> None:
+            rec = dict(self._conflict.theirs, content=content)
+            if self._on_resolved:
+                self._on_resolved(rec)
+            self.close()
+            if content != self._conflict.theirs["content"]:
+                run_in_background(
+                    self._sync_engine.resolve_conflict, self._conflict, content, name="conflict.resolve"
+                )
+
+else:
+
+    class ConflictDialog:  # type: ignore[misc]
+        pass
@@ -5,74 +5,62 @@ DayCard widget: shows a single day's worklog entries in a card layout suitable
 for placement inside a Gtk.FlowBox (wrapping grid).  Designed to match the
 multi-column card look in the screenshot spec.
 
-We pass raw log dicts (each with at least ``record_time`` and ``content``) so
-callers don't need to build intermediate GObject models.
+We pass plain log dicts (validated ``LogRecord``s, see ``services/ingest.py``)
+so callers don't need to build intermediate GObject models.
+
+Long logs are shown collapsed to a preview (``services/markdown.preview``)
+with a "Show more" button; expanding a server excerpt fetches the full log.
 """
 
-import os
 import datetime as _dt
-import time as _time
 from typing import Iterable, Mapping, Any
 
+from ..services.ingest import TRUNCATED_FLAG, is_partial
+from ..services.markdown import get_markup_cache, preview
+from ..services.timezone import get_timezone_service
+from .tasks import run_in_background
+
 try:
     import gi  # type: ignore
     gi.require_version("Gtk", "4.0")
     gi.require_version("Pango", "1.0")
-    from gi.repository import Gtk, Pango
+    from gi.repository import GLib, Gtk, Pango
 except Exception:  # pragma: no cover - gi not installed
-    Gtk = Pango = None  # type: ignore
-
+    GLib = Gtk = Pango = None  # type: ignore
 
-def _get_local_timezone():
-    try:
-        # 1. 優先用 TZ 環境變數
-        tz_env = os.environ.get("TZ")
-        if tz_env:
-            import zoneinfo
-            return zoneinfo.ZoneInfo(tz_env)
-        # 2. 其次用 time.localtime
-        if _time.daylight and _time.tzname[1]:
-            return _dt.timezone(_dt.timedelta(seconds=-_time.altzone), _time.tzname[1])
-        return _dt.timezone(_dt.timedelta(seconds=-_time.timezone), _time.tzname[0])
-    except Exception:
-        return None
-
-LOCAL_TZ = _get_local_timezone()
 
 def _coerce_time_str(record_time: Any) -> str:
-    """Return HH:MM best-effort from a backend ``record_time`` field, local time."""
+    """Return HH:MM from a backend ``record_time`` field, in the selected zone."""
     if not record_time:
         return ""
-    s = str(record_time)
-    try:
-        dt = _dt.datetime.fromisoformat(s.replace("Z", "+00:00"))
-        if LOCAL_TZ:
-            dt = dt.astimezone(LOCAL_TZ)
-    except Exception:  # degrade gracefully
-        return s[11:16] if len(s) >= 16 else s
-    return dt.strftime("%H:%M")
+    return get_timezone_service().time_str(record_time)
 
 
 if Gtk:
 
     class LogEntryRow(Gtk.Box):  # pragma: no cover - pure UI glue
-        def __init__(self, time_str: str, text: str, on_edit=None, get_token=None) -> None:
+        def __init__(self, time_str: str, text: str, on_edit=None, sync_engine=None, partial: bool = False) -> None:
             super().__init__(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
             self.add_css_class("log-entry-row")
             self.set_margin_top(2)
             self.set_margin_bottom(2)
             self.on_edit = on_edit
-            self._editing = False
             self._orig_text = text
             self._time_str = time_str
-            self._get_token = get_token  # 新增：token getter
+            self._sync_engine = sync_engine  # 離線時由 sync engine 排入佇列
+            # Long (or excerpted) text shows a preview until expanded.
+            self._partial = partial
+            self._preview = preview(text)
+            self._expanded = False
+            self._more_btn = None
 
             self.time_label = Gtk.Label(label=time_str, xalign=0)
             self.time_label.set_width_chars(5)
             self.time_label.add_css_class("log-entry-time")
             self.append(self.time_label)
 
-            self.text_label = Gtk.Label(label=text, xalign=0)
+            self._column = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+            self.text_label = Gtk.Label(label=self._shown_text(), xalign=0)
             self.text_label.add_css_class("log-entry-text")
             self.text_label.set_wrap(True)
             self.text_label.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
@@ -80,7 +68,9 @@ if Gtk:
             self.text_label.set_halign(Gtk.Align.FILL)
             self.text_label.set_max_width_chars(42)  # 強制最大寬度
             self.text_label.set_ellipsize(Pango.EllipsizeMode.NONE)  # 不要省略號，強制換行
-            self.append(self.text_label)
+            self._column.append(self.text_label)
+            self.append(self._column)
+            self._update_more()
 
             # 新增：點擊文字可編輯
             click_controller = Gtk.GestureClick()
@@ -88,110 +78,114 @@ if Gtk:
             click_controller.connect("released", self._on_text_clicked)
             self.text_label.add_controller(click_controller)
 
+            # Markdown is rendered on first map, so rows hidden by a filter
+            # or in an unshown view stay plain text until they are seen.
+            self._rendered = False
+            self.connect("map", lambda *_: self._render_markup())
+
+        def set_content(self, text: str, partial: bool = False) -> None:
+            self._orig_text = text
+            self._partial = partial
+            self._preview = preview(text)
+            self._update_more()
+            self._show_text()
+
+        def _shown_text(self) -> str:
+            if self._expanded or self._preview is None:
+                return self._orig_text
+            return self._preview
+
+        def _show_text(self) -> None:
+            self._rendered = False
+            self.text_label.set_use_markup(False)
+            self.text_label.set_text(self._shown_text())
+            if self.get_mapped():
+                self._render_markup()
+
+        def _render_markup(self) -> None:
+            if self._rendered:
+                return
+            self._rendered = True
+            markup = get_markup_cache().get(self._shown_text())
+            try:
+                Pango.parse_markup(markup, -1, "\0")
+            except GLib.Error:
+                return  # keep the plain text rather than an empty label
+            self.text_label.set_markup(markup)
+
+        # ── Expand / collapse ────────────────────────────────────────
+        def _update_more(self) -> None:
+            expandable = self._partial or self._preview is not None
+            if self._more_btn is None:
+                if not expandable:
+                    return  # most rows never need the button
+                self._more_btn = Gtk.Button(halign=Gtk.Align.START)
+                self._more_btn.add_css_class("flat")
+                self._more_btn.add_css_class("log-entry-more")
+                self._more_btn.connect("clicked", self._on_more_clicked)
+                self._column.append(self._more_btn)
+            self._more_btn.set_visible(expandable)
+            self._more_btn.set_label("Show less" if self._expanded and not self._partial else "Show more")
+
+        def _on_more_clicked(self, _btn: Gtk.Button) -> None:
+            if self._partial:
+                self._load_full()
+                return
+            self._expanded = not self._expanded
+            self._update_more()
+            self._show_text()
+
+        def _load_full(self) -> None:
+            rec = getattr(self, "_rec", None)
+            if rec is None or self._sync_engine is None:
+                return
+            self._more_btn.set_sensitive(False)
+            self._more_btn.set_label("Loading…")
+            run_in_background(
+                self._sync_engine.load_full, dict(rec), name="day_card.load_full",
+                on_done=self._on_full_loaded, on_error=lambda _exc: self._on_full_loaded(None),
+            )
+
+        def _on_full_loaded(self, full) -> None:
+            self._more_btn.set_sensitive(True)
+            if full is None or is_partial(full):
+                self._more_btn.set_tooltip_text("Connect to load the full log")
+                self._update_more()
+                return
+            self._rec.pop(TRUNCATED_FLAG, None)
+            self._rec.update(full)
+            self._expanded = True
+            self.set_content(full["content"])
+
         def _on_text_clicked(self, gesture, n_press, x, y):
-            if n_press == 1 and not self._editing:
+            if n_press == 1:
                 self._show_edit_dialog()
 
         def _show_edit_dialog(self):
-            self._editing = True
-            parent_win = self.get_root()
-            dialog = Gtk.Dialog(title="編輯內容", transient_for=parent_win, modal=True)
-            dialog.set_default_size(400, 320)
-            box = dialog.get_content_area()
-            box.set_margin_top(16)
-            box.set_margin_bottom(16)
-            box.set_margin_start(16)
-            box.set_margin_end(16)
-            # 改用 TextView
-            # 用 ScrolledWindow 包住 TextView，避免內容過多時擠掉按鈕
-            scrolled = Gtk.ScrolledWindow()
-            scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
-            scrolled.set_min_content_height(120)
-            scrolled.set_max_content_height(220)
-            scrolled.set_hexpand(True)
-            scrolled.set_vexpand(True)
-            textview = Gtk.TextView()
-            textview.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
-            textview.set_vexpand(True)
-            textview.set_hexpand(True)
-            buffer = textview.get_buffer()
-            buffer.set_text(self._orig_text)
-            scrolled.set_child(textview)
-            box.append(scrolled)
-            btn_save = Gtk.Button.new_with_label("儲存")
-            btn_cancel = Gtk.Button.new_with_label("取消")
-            btn_delete = Gtk.Button.new_with_label("刪除")
-            btn_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
-            btn_box.set_margin_top(16)
-            btn_box.set_vexpand(False)
-            btn_box.set_hexpand(True)
-            btn_box.append(btn_save)
-            btn_box.append(btn_cancel)
-            btn_box.append(btn_delete)
-            box.append(btn_box)
-            dialog.connect("close-request", lambda *_: self._set_editing_false())
-            def on_save(_btn):
-                start, end = buffer.get_bounds()
-                new_text = buffer.get_text(start, end, True)
-                if new_text != self._orig_text:
-                    if self.on_edit:
-                        import threading
-                        def do_patch():
-                            from worklog.services import api_client
-                            rec = getattr(self, '_rec', None)
-                            token = self._get_token() if self._get_token else getattr(self, '_token', None)
-                            if rec and token:
-                                try:
-                                    api_client.update_worklog(
-                                        token=token,
-                                        worklog_id=rec['id'],
-                                        content=new_text,
-                                        record_time=rec.get('record_time'),
-                                        tag_id=rec.get('tag_id'),
-                                    )
-                                except Exception:
-                                    pass  # 可加上錯誤提示
-                            # UI 更新必須回到主執行緒
-                            import gi
-                            from gi.repository import GLib
-                            GLib.idle_add(lambda: self.on_edit(self._time_str, new_text))
-                        threading.Thread(target=do_patch, daemon=True).start()
-                    self.text_label.set_text(new_text)
-                    self._orig_text = new_text
-                self._editing = False
-                dialog.close()
-            def on_delete(_btn):
-                import threading
-                def do_delete():
-                    from worklog.services import api_client
-                    rec = getattr(self, '_rec', None)
-                    token = self._get_token() if self._get_token else getattr(self, '_token', None)
-                    if rec and token:
-                        try:
-                            api_client.delete_worklog(token=token, worklog_id=rec['id'])
-                        except Exception:
-                            pass  # 可加上錯誤提示
-                    # UI 更新必須回到主執行緒
-                    import gi
-                    from gi.repository import GLib
-                    GLib.idle_add(lambda: self.on_edit(self._time_str, None))
-                threading.Thread(target=do_delete, daemon=True).start()
-                self._editing = False
-                dialog.close()
-            def on_cancel(_btn):
-                self._editing = False
-                dialog.close()
-            def _set_editing_false():
-                self._editing = False
-            self._set_editing_false = _set_editing_false
-            btn_save.connect("clicked", on_save)
-            btn_cancel.connect("clicked", on_cancel)
-            btn_delete.connect("clicked", on_delete)
-            dialog.show()
-            textview.grab_focus()
+            from .log_editor import get_log_editor  # local import
+            rec = getattr(self, '_rec', None)
+            if rec is None or self._sync_engine is None:
+                return
+
+            def on_saved(new_text):
+                self.set_content(new_text)
+                if self.on_edit:
+                    self.on_edit(self._time_str, new_text)
+
+            def on_deleted():
+                if self.on_edit:
+                    self.on_edit(self._time_str, None)
+
+            get_log_editor(self._sync_engine).edit(
+                rec,
+                on_saved=on_saved,
+                on_deleted=on_deleted,
+                on_loaded=self.set_content,
+                parent=self.get_root(),
+            )
 
     class DayCard(Gtk.FlowBoxChild):  # pragma: no cover - pure UI glue
-        def __init__(self, date_obj: _dt.date, logs: Iterable[dict], token: str = None, get_token=None) -> None:
+        def __init__(self, date_obj: _dt.date, logs: Iterable[dict], sync_engine=None) -> None:
             super().__init__()
 
             frame = Gtk.Frame()
@@ -225,32 +219,84 @@ if Gtk:
             sep.add_css_class("day-card-separator")
             outer.append(sep)
 
+            self._outer = outer
+            self._sync_engine = sync_engine
             self._log_rows = []  # 新增：記錄 row 物件
             for rec in logs:
-                time_str = _coerce_time_str(rec.get("record_time"))
-                text = str(rec.get("content", ""))
-                def on_edit(time_str, new_text, rec=rec, row_ref=None):
-                    if new_text is None:
-                        # 刪除：移除 row
-                        if row_ref and row_ref in self._log_rows:
-                            outer.remove(row_ref)
-                            self._log_rows.remove(row_ref)
-                        rec["_deleted"] = True
-                    else:
-                        rec["content"] = new_text
-                        # 可加上通知父元件或觸發資料儲存的邏輯
-                row = LogEntryRow(time_str, text, on_edit=None, get_token=get_token)
-                row._rec = rec  # 傳遞 rec 給 LogEntryRow 以便 PATCH/DELETE
-                # row._token = token  # 不再直接傳 token，改用 get_token
-                # 綁定 on_edit 並傳遞 row 參考
-                import functools
-                row.on_edit = functools.partial(on_edit, rec=rec, row_ref=row)
+                row = self._make_row(rec)
                 self._log_rows.append(row)
                 outer.append(row)
 
             frame.set_child(outer)
             self.set_child(frame)
 
+        def _make_row(self, rec: dict) -> "LogEntryRow":
+            time_str = _coerce_time_str(rec["record_time"])
+            text = rec["content"]
+            def on_edit(time_str, new_text, rec=rec, row_ref=None):
+                if new_text is None:
+                    # 刪除：移除 row
+                    if row_ref and row_ref in self._log_rows:
+                        self._outer.remove(row_ref)
+                        self._log_rows.remove(row_ref)
+                    rec["_deleted"] = True
+                else:
+                    rec["content"] = new_text
+                    # 可加上通知父元件或觸發資料儲存的邏輯
+            row = LogEntryRow(time_str, text, on_edit=None, sync_engine=self._sync_engine, partial=is_partial(rec))
+            row._rec = rec  # 傳遞 rec 給 LogEntryRow 以便 PATCH/DELETE
+            # 綁定 on_edit 並傳遞 row 參考
+            import functools
+            row.on_edit = functools.partial(on_edit, rec=rec, row_ref=row)
+            return row
+
+        def add_log(self, rec: dict) -> None:
+            """Insert a newly created log, keeping rows newest-first."""
+            row = self._make_row(rec)
+            new_rt = rec["record_time"]
+            index = len(self._log_rows)
+            for i, other in enumerate(self._log_rows):
+                if other._rec["record_time"] < new_rt:
+                    index = i
+                    break
+            # The header box and separator precede the first row.
+            sibling = self._log_rows[index - 1] if index else self._outer.get_first_child().get_next_sibling()
+            self._outer.insert_child_after(row, sibling)
+            self._log_rows.insert(index, row)
+
+        def find_row(self, worklog_id: str):
+            return next((r for r in self._log_rows if str(r._rec["id"]) == worklog_id), None)
+
+        def update_log(self, rec: dict) -> bool:
+            """Show new content for an existing log; ``False`` if it is not here."""
+            row = self.find_row(str(rec["id"]))
+            if row is None:
+                return False
+            if not is_partial(rec):
+                row._rec.pop(TRUNCATED_FLAG, None)
+            row._rec.update(rec)
+            row.set_content(rec["content"], partial=is_partial(row._rec))
+            return True
+
+        def remove_log(self, worklog_id: str) -> bool:
+            row = self.find_row(worklog_id)
+            if row is None:
+                return False
+            self._outer.remove(row)
+            self._log_rows.remove(row)
+            return True
+
+        def is_empty(self) -> bool:
+            return not self._log_rows
+
+        def set_log_visible(self, worklog_id: str, visible: bool) -> None:
+            """Show or hide one log (tag filter); the card hides with its last row."""
+            row = self.find_row(worklog_id)
+            if row is None:
+                return
+            row.set_visible(visible)
+            self.set_visible(any(r.get_visible() for r in self._log_rows))
+
 else:  # pragma: no cover - non-GTK runtime
     class DayCard:  # type: ignore[misc]
         def __init__(self, *_args, **_kwargs) -> None:
@@ -0,0 +1,295 @@
+"""Shared editor for existing logs (click a row's text to edit).
+
+One window is built on first use and rebound to whichever log is edited
+next, so opening it costs a buffer swap instead of constructing a dialog.
+Typing is autosaved as a draft in the log cache and restored the next time
+the same log is opened.  The grid only holds content excerpts, so the full
+log is fetched when it is opened and editing starts once it has arrived.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from ..services.executor import SerialQueue
+from ..services.ingest import TRUNCATED_FLAG, is_partial
+from .tasks import run_in_background
+
+try:
+    import gi
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("Gdk", "4.0")
+    gi.require_version("Pango", "1.0")
+    from gi.repository import Gdk, GLib, Gtk, Pango
+    GTK_AVAILABLE = True
+except Exception:  # pragma: no cover - gi not installed
+    Gdk = GLib = Gtk = Pango = None  # type: ignore
+    GTK_AVAILABLE = False
+
+try:
+    gi.require_version("GtkSource", "5")
+    from gi.repository import GtkSource
+except Exception:  # pragma: no cover - GtkSourceView not installed
+    GtkSource = None  # type: ignore
+
+_log = logging.getLogger(__name__)
+
+_AUTOSAVE_MS = 800
+
+
+def _save_edit(
+    rec: Dict[str, Any],
+    text: str,
+    on_saved: Optional[Callable[[str], None]],
+    send: Callable[[Dict[str, Any], str], Any],
+) -> None:
+    """Show ``text`` right away, then ``send`` the edit.
+
+    ``on_saved`` (the day card) writes the new text into ``rec`` itself, so
+    the version the edit was based on is copied first; merging a concurrent
+    server edit needs it.
+    """
+    base = dict(rec)
+    if on_saved:
+        on_saved(text)  # local first; the sync engine queues when offline
+    send(base, text)
+
+
+if GTK_AVAILABLE:
+
+    class LogEditorWindow(Gtk.Window):  # pragma: no cover - UI code
+        """Markdown editor (GtkSourceView when available, else a TextView).
+
+        ``Ctrl+Enter`` saves; ``Esc`` or 取消 cancels and drops the draft.
+        Closing the window any other way keeps the draft.
+        """
+
+        def __init__(self, sync_engine: Any, **kwargs) -> None:
+            super().__init__(**kwargs)
+            self.sync_engine = sync_engine
+            self._rec: Optional[Dict[str, Any]] = None
+            self._on_saved: Optional[Callable[[str], None]] = None
+            self._on_loaded: Optional[Callable[[str], None]] = None
+            self._on_deleted: Optional[Callable[[], None]] = None
+            self._autosave_id = 0
+            self._loading = False
+            # Draft writes and server writes each stay in order, off the UI thread.
+            self._drafts = SerialQueue("editor.draft")
+            self._writes = SerialQueue("editor.save")
+
+            self.set_title("編輯內容")
+            self.set_modal(True)
+            self.set_default_size(480, 360)
+            self.set_hide_on_close(True)
+            self.connect("close-request", self._on_close_request)
+
+            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+            box.set_margin_top(16)
+            box.set_margin_bottom(16)
+            box.set_margin_start(16)
+            box.set_margin_end(16)
+
+            self._status_lbl = Gtk.Label(xalign=0)
+            self._status_lbl.add_css_class("dim-label")
+            self._status_lbl.set_visible(False)
+            box.append(self._status_lbl)
+
+            scrolled = Gtk.ScrolledWindow()
+            scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+            scrolled.set_min_content_height(160)
+            scrolled.set_vexpand(True)
+            self._textview = self._make_view()
+            self._textview.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
+            self._textview.get_buffer().connect("changed", self._on_buffer_changed)
+            scrolled.set_child(self._textview)
+            box.append(scrolled)
+
+            buttons = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+            btn_delete = Gtk.Button.new_with_label("刪除")
+            btn_delete.add_css_class("destructive-action")
+            btn_delete.set_hexpand(True)
+            btn_delete.set_halign(Gtk.Align.START)
+            btn_delete.connect("clicked", lambda *_: self._delete())
+            btn_cancel = Gtk.Button.new_with_label("取消")
+            btn_cancel.connect("clicked", lambda *_: self._cancel())
+            btn_save = Gtk.Button.new_with_label("儲存")
+            btn_save.add_css_class("suggested-action")
+            btn_save.set_tooltip_text("Ctrl+Enter")
+            btn_save.connect("clicked", lambda *_: self._save())
+            self._btn_save = btn_save
+            for btn in (btn_delete, btn_cancel, btn_save):
+                buttons.append(btn)
+            box.append(buttons)
+
+            keys = Gtk.EventControllerKey()
+            keys.connect("key-pressed", self._on_key_pressed)
+            self.add_controller(keys)
+
+            self.set_child(box)
+
+        @staticmethod
+        def _make_view() -> Gtk.TextView:
+            if GtkSource is None:
+                return Gtk.TextView()
+            buffer = GtkSource.Buffer()
+            language = GtkSource.LanguageManager.get_default().get_language("markdown")
+            if language is not None:
+                buffer.set_language(language)
+            view = GtkSource.View.new_with_buffer(buffer)
+            view.set_auto_indent(True)
+            return view
+
+        # ── Binding ──────────────────────────────────────────────────
+        def edit(
+            self,
+            rec: Dict[str, Any],
+            *,
+            on_saved: Optional[Callable[[str], None]] = None,
+            on_deleted: Optional[Callable[[], None]] = None,
+            on_loaded: Optional[Callable[[str], None]] = None,
+            parent: Optional[Gtk.Window] = None,
+        ) -> None:
+            """Show ``rec`` (or its saved draft) in the editor.
+
+            ``on_loaded`` gets the full content if ``rec`` was an excerpt.
+            """
+            self._flush_draft()
+            self._rec = rec
+            self._on_saved = on_saved
+            self._on_deleted = on_deleted
+            self._on_loaded = on_loaded
+            if parent is not None:
+                self.set_transient_for(parent)
+            self._bind()
+            if is_partial(rec):
+                run_in_background(
+                    self.sync_engine.load_full, dict(rec), name="editor.load_full",
+                    on_done=lambda full, rec=rec: self._on_full_loaded(rec, full),
+                    on_error=lambda _exc, rec=rec, copy=dict(rec): self._on_full_loaded(rec, copy),
+                )
+            self.present()
+            self._textview.grab_focus()
+
+        def _bind(self) -> None:
+            rec = self._rec
+            partial = is_partial(rec)
+            draft = None if partial else self.sync_engine.cache.load_draft(str(rec["id"]))
+            restored = draft is not None and draft != rec["content"]
+            if partial:
+                self._status_lbl.set_text("載入完整內容…")
+            elif restored:
+                self._status_lbl.set_text("已還原未儲存的草稿")
+            self._status_lbl.set_visible(partial or restored)
+            self._textview.set_editable(not partial)
+            self._btn_save.set_sensitive(not partial)
+            self._loading = True
+            self._textview.get_buffer().set_text(draft if restored else rec["content"])
+            self._loading = False
+
+        def _on_full_loaded(self, rec: Dict[str, Any], full: Dict[str, Any]) -> bool:
+            if is_partial(full):
+                if self._rec is rec:
+                    self._status_lbl.set_text("離線中：只有摘要，連線後才能編輯")
+                return False
+            rec.pop(TRUNCATED_FLAG, None)
+            rec.update(full)
+            if self._on_loaded and self._rec is rec:
+                self._on_loaded(rec["content"])
+            if self._rec is rec:
+                self._bind()
+            return False
+
+        def _text(self) -> str:
+            buffer = self._textview.get_buffer()
+            start, end = buffer.get_bounds()
+            return buffer.get_text(start, end, True)
+
+        # ── Drafts ───────────────────────────────────────────────────
+        def _on_buffer_changed(self, _buffer) -> None:
+            if self._loading or self._rec is None:
+                return
+            if self._autosave_id:
+                GLib.source_remove(self._autosave_id)
+            self._autosave_id = GLib.timeout_add(_AUTOSAVE_MS, self._on_autosave)
+
+        def _on_autosave(self) -> bool:
+            self._autosave_id = 0
+            self._flush_draft()
+            return False
+
+        def _flush_draft(self) -> None:
+            if self._autosave_id:
+                GLib.source_remove(self._autosave_id)
+                self._autosave_id = 0
+            if self._rec is None or is_partial(self._rec):
+                return
+            worklog_id, text = str(self._rec["id"]), self._text()
+            cache = self.sync_engine.cache
+            if text == self._rec["content"]:
+                self._drafts.submit(cache.discard_draft, worklog_id)
+            else:
+                self._drafts.submit(cache.save_draft, worklog_id, text)
+
+        def _finish(self, *, keep_draft: bool) -> None:
+            if keep_draft:
+                self._flush_draft()
+            else:
+                if self._autosave_id:
+                    GLib.source_remove(self._autosave_id)
+                    self._autosave_id = 0
+                if self._rec is not None and not is_partial(self._rec):
+                    self._drafts.submit(self.sync_engine.cache.discard_draft, str(self._rec["id"]))
+            self._rec = self._on_saved = self._on_deleted = self._on_loaded = None
+            self.set_visible(False)
+
+        # ── Actions ──────────────────────────────────────────────────
+        def _on_key_pressed(self, _ctrl, keyval, _keycode, state) -> bool:
+            if keyval == Gdk.KEY_Escape:
+                self._cancel()
+                return True
+            if keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter) and state & Gdk.ModifierType.CONTROL_MASK:
+                self._save()
+                return True
+            return False
+
+        def _on_close_request(self, _win) -> bool:
+            self._finish(keep_draft=True)
+            return True
+
+        def _cancel(self) -> None:
+            self._finish(keep_draft=False)
+
+        def _save(self) -> None:
+            rec, on_saved, text = self._rec, self._on_saved, self._text()
+            self._finish(keep_draft=False)
+            if rec is None or is_partial(rec) or text == rec["content"]:
+                return
+            update = self.sync_engine.update_worklog
+            _save_edit(rec, text, on_saved, lambda base, new: self._writes.submit(update, base, new))
+
+        def _delete(self) -> None:
+            rec, on_deleted = self._rec, self._on_deleted
+            self._finish(keep_draft=False)
+            if rec is None:
+                return
+            if on_deleted:
+                on_deleted()
+            self._writes.submit(self.sync_engine.delete_worklog, rec["id"])
+
+    _editor: Optional[LogEditorWindow] = None
+
+    def get_log_editor(sync_engine: Any) -> LogEditorWindow:  # pragma: no cover - UI code
+        """The shared editor, rebuilt only if the sync engine changed."""
+        global _editor
+        if _editor is None or _editor.sync_engine is not sync_engine:
+            if _editor is not None:
+                _editor.destroy()
+            _editor = LogEditorWindow(sync_engine)
+        return _editor
+
+else:
+
+    class LogEditorWindow:  # type: ignore[misc]
+        pass
+
+    def get_log_editor(sync_engine: Any) -> Any:  # type: ignore[misc]
+        raise RuntimeError("GTK not available")
@@ -1,6 +1,9 @@
 """Login window – Google sign-in entry point."""
 
 import logging
+import threading
+
+from .tasks import on_main_thread, run_in_background
 
 try:
     import gi
@@ -41,41 +44,115 @@ if GTK_AVAILABLE:
 
             google_btn = Gtk.Button(label="Google")
             google_btn.connect("clicked", self.on_google)
+            self._google_btn = google_btn
 
             btn_box = Gtk.Box(spacing=12)
             btn_box.append(google_btn)
             box.append(btn_box)
 
+            # Shown while the browser sign-in is in progress.
+            busy_box = Gtk.Box(spacing=8)
+            self._spinner = Gtk.Spinner(visible=False)
+            self._status_lbl = Gtk.Label(label="Waiting for the browser…", visible=False)
+            self._status_lbl.add_css_class("dim-label")
+            self._cancel_btn = Gtk.Button(label="Cancel", visible=False)
+            self._cancel_btn.connect("clicked", self._on_cancel)
+            busy_box.append(self._spinner)
+            busy_box.append(self._status_lbl)
+            busy_box.append(self._cancel_btn)
+            box.append(busy_box)
+
             self.set_child(box)
+            self._cancel: threading.Event | None = None
+            # Stop waiting for the browser if the window goes away.
+            self.connect("destroy", lambda *_: self._cancel is not None and self._cancel.set())
+            run_in_background(self._prewarm, name="login.prewarm")
+
+        # ── Sign-in pipeline ─────────────────────────────────────────
+        @staticmethod
+        def _prewarm() -> None:
+            """Import the OAuth stack and read config while the user looks on."""
+            try:
+                from ..auth import google
+                from ..auth.firebase import load_firebase_config
+                google.prewarm()
+                load_firebase_config()
+            except Exception:
+                pass  # reported properly when the user clicks sign-in
 
         def on_google(self, _button: Gtk.Button) -> None:  # pragma: no cover - UI code
-            """Run Google OAuth → exchange for Firebase → sign in."""
-            from ..auth.firebase import load_firebase_config
-            from ..auth.google import do_google_oauth, exchange_google_to_firebase
-
-            app = self.get_application()  # type: ignore[assignment]
+            """Run Google OAuth → Firebase exchange off the UI thread."""
+            self._cancel = threading.Event()
+            self._set_busy(True)
+            # The browser wait can take minutes, so it gets its own thread
+            # rather than holding one of the shared workers.
+            threading.Thread(
+                target=self._wait_for_browser, args=(self._cancel,), name="worklog-login", daemon=True
+            ).start()
+
+        def _on_cancel(self, _button: Gtk.Button) -> None:
+            if self._cancel is not None:
+                self._cancel.set()
+                self._cancel = None
+            self._set_busy(False)
+
+        def _set_busy(self, busy: bool) -> None:
+            self._google_btn.set_sensitive(not busy)
+            self._spinner.set_visible(busy)
+            self._spinner.set_spinning(busy)
+            self._status_lbl.set_visible(busy)
+            self._cancel_btn.set_visible(busy)
+
+        def _wait_for_browser(self, cancel: threading.Event) -> None:
+            from ..auth.google import do_google_oauth
 
             try:
-                # Step 1: Browser OAuth
-                google_id_token, _google_refresh = do_google_oauth()
-
-                # Step 2: Firebase exchange
-                fb_cfg = load_firebase_config()
-                api_key = fb_cfg["apiKey"]
-                id_token, refresh_token = exchange_google_to_firebase(api_key, google_id_token)
+                # Step 1: Browser OAuth (waits for the user)
+                google_id_token, _google_refresh = do_google_oauth(cancel=cancel)
             except Exception as exc:  # pragma: no cover - UI error path
-                logging.exception("Google sign-in failed")
-                self._show_error(f"Google sign-in failed:\n{exc}")
+                self._sign_in_failed(cancel, exc)
+                return
+            if cancel.is_set():
                 return
+            on_main_thread(self._status_lbl.set_text, "Signing in…")
+            # Step 2: Firebase exchange, a single request
+            run_in_background(
+                self._exchange,
+                google_id_token,
+                on_done=lambda tokens: self._on_signed_in(cancel, *tokens),
+                on_error=lambda exc: self._sign_in_failed(cancel, exc),
+                name="login.exchange",
+            )
 
-            # Step 3: Persist + open main window
-            app.user_store.sign_in(id_token, refresh_token)
+        @staticmethod
+        def _exchange(google_id_token: str) -> tuple:
+            from ..auth.firebase import load_firebase_config
+            from ..auth.google import exchange_google_to_firebase
 
-            from .main_window import MainWindow
-            win = MainWindow(app.user_store, application=app)
-            app.main_window = win  # keep reference on the app
-            win.present()
+            api_key = load_firebase_config()["apiKey"]
+            return exchange_google_to_firebase(api_key, google_id_token)
+
+        def _sign_in_failed(self, cancel: threading.Event, exc: BaseException) -> None:
+            if cancel.is_set():
+                return
+            logging.error("Google sign-in failed", exc_info=exc)
+            on_main_thread(self._on_sign_in_failed, f"Google sign-in failed:\n{exc}")
+
+        def _on_sign_in_failed(self, message: str) -> bool:
+            self._cancel = None
+            self._set_busy(False)
+            self._show_error(message)
+            return False
+
+        def _on_signed_in(self, cancel: threading.Event, id_token: str, refresh_token: str) -> bool:
+            if cancel.is_set():
+                return False
+            # Step 3: Persist + open main window (its first fetch starts first)
+            app = self.get_application()
+            app.user_store.sign_in(id_token, refresh_token)
+            app.show_main_window()
             self.close()
+            return False
 
         def _show_error(self, message: str) -> None:  # pragma: no cover - UI code
             """Simple inline error dialog."""
@@ -3,9 +3,17 @@ from __future__ import annotations
 """Primary application window showing worklogs as *date cards* in a grid."""
 
 import datetime as _dt
-from collections import defaultdict
+import logging
 from typing import Any, Iterable, Mapping
 
+from ..services import telemetry
+from ..services.markdown import card_text, get_markup_cache, prerender
+from ..services.timezone import get_timezone_service, zone_names
+from ..stores import snapshot as _snapshot
+from ..stores.log_store import group_by_day, record_date
+from ..stores.tag_index import TagFilter, TagIndex
+from .tasks import on_main_thread, run_in_background
+
 try:
     import gi  # type: ignore
     gi.require_version("Gtk", "4.0")
@@ -24,6 +32,8 @@ except Exception:  # pragma: no cover
     _ADW = False
     GTK_AVAILABLE = False
 
+_log = logging.getLogger(__name__)
+
 # NOTE: To avoid fragile imports across package refactors we do *lazy* imports
 # of LoginWindow and DayCard inside the methods that need them.  This makes the
 # module more resilient when used in unit tests with partial stubs.
@@ -48,11 +58,45 @@ def _load_css(display: "Gtk.Display") -> None:
 if GTK_AVAILABLE:
 
     class MainWindow(Gtk.ApplicationWindow):  # pragma: no cover - UI glue
-        def __init__(self, user_store: Any, **kwargs):
+        def __init__(
+            self,
+            user_store: Any,
+            sync_engine: Any = None,
+            log_store: Any = None,
+            spaces: Any = None,
+            snapshot: Any = None,
+            **kwargs,
+        ):
             super().__init__(**kwargs)
             self.user_store = user_store
+            # Optional SpaceManager: shows the spaces sidebar and switches
+            # sync_engine/log_store to the selected space's.
+            self._spaces = spaces
+            self._spaces_loaded = self._spaces_warmed = spaces is None
+            # Optional startup Snapshot: painted before the space's cache is
+            # opened; the store is attached once that frame is on screen.
+            deferred = snapshot is not None and spaces is not None and sync_engine is None
+            if deferred:
+                sync_engine = log_store = None
+            elif spaces is not None and sync_engine is None:
+                sync_engine, log_store = spaces.current.engine, spaces.current.store
+            if sync_engine is None and not deferred:
+                from ..services.sync_engine import SyncEngine
+                from ..stores.log_cache import LogCache
+                sync_engine = SyncEngine(LogCache(), lambda: getattr(self.user_store, "token", None))
+            self.sync_engine = sync_engine
+            if log_store is None and not deferred:
+                from ..stores.log_store import LogStore
+                log_store = LogStore(sync_engine.cache)
+            self.log_store = log_store
             self._current_month: _dt.date | None = None
-            self._logs: list[Mapping[str, Any]] = []
+            self._cards: dict[_dt.date, Any] = {}
+            self._year_generation = 0
+            # Tag filter: the current month's tag bitsets and the visible set.
+            self._tag_filter = TagFilter()
+            self._tag_index = TagIndex()
+            self._visible_mask = 0
+            self._row_cards: dict[str, Any] = {}
 
             self.set_title("Worklog")
             self.set_default_size(1024, 768)
@@ -71,6 +115,11 @@ if GTK_AVAILABLE:
 
             self._month_lbl = Gtk.Label(label="Month")
 
+            self._offline_lbl = Gtk.Label(label="Offline")
+            self._offline_lbl.add_css_class("dim-label")
+            self._offline_lbl.set_tooltip_text("Showing cached logs; edits will sync when back online")
+            self._offline_lbl.set_visible(False)
+
             prev_btn = Gtk.Button()
             prev_btn.set_child(Gtk.Image.new_from_icon_name("go-previous-symbolic"))
             prev_btn.connect("clicked", self._on_prev_month)
@@ -83,12 +132,32 @@ if GTK_AVAILABLE:
             month_box.append(self._month_lbl)
             month_box.append(next_btn)
 
+            self._tz = get_timezone_service()
+            tz_btn = Gtk.MenuButton()
+            tz_btn.set_icon_name("preferences-system-time-symbolic")
+            tz_btn.set_tooltip_text(f"Time zone: {self._tz.label}")
+            tz_btn.set_popover(self._build_zone_popover())
+            self._tz_btn = tz_btn
+            self._tz.connect(self._on_zone_changed)
+            self.connect("destroy", lambda *_: self._tz.disconnect(self._on_zone_changed))
+
+            tag_btn = Gtk.MenuButton()
+            tag_btn.set_label("Tags")
+            tag_btn.set_tooltip_text("Filter by tag")
+            tag_popover = Gtk.Popover()
+            tag_popover.connect("show", self._on_tag_popover_show)
+            tag_btn.set_popover(tag_popover)
+            self._tag_btn = tag_btn
+
             logout_btn = Gtk.Button()
             logout_btn.set_child(Gtk.Image.new_from_icon_name("system-log-out-symbolic"))
             logout_btn.connect("clicked", self.on_logout)
 
             header.pack_start(month_box)
+            header.pack_start(self._offline_lbl)
             header.pack_end(logout_btn)
+            header.pack_end(tz_btn)
+            header.pack_end(tag_btn)
             header.pack_end(search_entry)
             self.set_titlebar(header)
 
@@ -102,80 +171,273 @@ if GTK_AVAILABLE:
 
             scrolled = Gtk.ScrolledWindow()
             scrolled.set_child(self._flow)
-            self.set_child(scrolled)
 
+            # FAB (+) 固定在畫面右下角
+            fab = Gtk.Button()
+            fab.set_child(Gtk.Image.new_from_icon_name("list-add-symbolic"))
+            fab.add_css_class("circular")
+            fab.add_css_class("suggested-action")
+            fab.add_css_class("fab")
+            fab.set_halign(Gtk.Align.END)
+            fab.set_valign(Gtk.Align.END)
+            fab.set_tooltip_text("New log (Ctrl+Alt+L)")
+            fab.connect("clicked", self._on_fab_clicked)
+
+            overlay = Gtk.Overlay()
+            overlay.set_child(scrolled)
+            overlay.add_overlay(fab)
+
+            # 月視圖 | 年視圖
+            from .year_view import YearView  # local import
+            self._year_view = YearView(on_month_selected=self._open_month)
+            year_scrolled = Gtk.ScrolledWindow()
+            year_scrolled.set_child(self._year_view)
+
+            self._stack = Gtk.Stack()
+            self._stack.set_transition_type(Gtk.StackTransitionType.CROSSFADE)
+            self._stack.add_titled(overlay, "month", "月")
+            self._stack.add_titled(year_scrolled, "year", "年")
+            self._stack.connect("notify::visible-child-name", self._on_view_changed)
+            switcher = Gtk.StackSwitcher()
+            switcher.set_stack(self._stack)
+            header.pack_start(switcher)
+
+            # Spaces sidebar (hidden while there is only one space)
+            self._space_list = Gtk.ListBox()
+            self._space_list.add_css_class("navigation-sidebar")
+            self._space_list.set_selection_mode(Gtk.SelectionMode.SINGLE)
+            self._space_list.connect("row-selected", self._on_space_row_selected)
+            self._populating_spaces = False
+            sidebar = Gtk.ScrolledWindow()
+            sidebar.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+            sidebar.set_size_request(180, -1)
+            sidebar.set_child(self._space_list)
+            self._sidebar = sidebar
+            self._stack.set_hexpand(True)
+            root = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+            root.append(sidebar)
+            root.append(self._stack)
+            self.set_child(root)
+            self._populate_spaces()
+
+            self._refreshing = False
+            if deferred:
+                self._current_month = snapshot.month
+                self._build_grid(snapshot.records)
+                self._after_first_paint(self._attach_current_space)
+                return
+            # Paint whatever the (resident) log store still holds, then
+            # refresh in the background.
+            if self.log_store.stats().months:
+                self._on_logs_loaded(not self.sync_engine.online)
             self.refresh()
 
+        # ── Startup snapshot ─────────────────────────────────────────
+        def _after_first_paint(self, callback: Any) -> None:
+            """Run ``callback`` from the main loop once a frame has been painted."""
+            def on_paint(clock: Any) -> None:
+                clock.disconnect(handler[0])
+                on_main_thread(callback)
+
+            def on_realize(*_args: Any) -> None:
+                handler.append(self.get_frame_clock().connect("after-paint", on_paint))
+
+            handler: list = []
+            self.connect("realize", on_realize)
+
+        def _attach_current_space(self) -> bool:
+            """Open the current space's store and reconcile the snapshot with it."""
+            if self.log_store is not None:
+                return False
+            data = self._spaces.current
+            self.sync_engine, self.log_store = data.engine, data.store
+            if self.log_store.stats().months:
+                self._on_logs_loaded(not self.sync_engine.online)
+            self.refresh()
+            return False
+
+        def startup_snapshot(self) -> Any:
+            """The month on screen and its rendered markup, for the next start."""
+            if self.log_store is None or self._current_month is None:
+                return None
+            records = self.log_store.month(self._current_month)
+            cache = get_markup_cache()
+            markup = {}
+            for rec in records:
+                rendered = cache.peek(card_text(rec.get("content") or ""))
+                if rendered is not None:
+                    markup[str(rec["id"])] = rendered
+            return _snapshot.Snapshot(
+                month=self._current_month,
+                records=records,
+                space_id=self.sync_engine.space_id,
+                zone=self._tz.label,
+                markup=markup,
+            )
+
+        # ── Spaces ───────────────────────────────────────────────────
+        def _populate_spaces(self) -> None:
+            if self._spaces is None:
+                self._sidebar.set_visible(False)
+                return
+            self._populating_spaces = True
+            while (row := self._space_list.get_row_at_index(0)) is not None:
+                self._space_list.remove(row)
+            for space in self._spaces.spaces:
+                row = Gtk.ListBoxRow()
+                row.space_id = space.id
+                row.set_child(Gtk.Label(label=space.name, xalign=0))
+                self._space_list.append(row)
+                if space.id == self._spaces.current_id:
+                    self._space_list.select_row(row)
+            self._populating_spaces = False
+            self._sidebar.set_visible(len(self._spaces.spaces) > 1)
+
+        def _on_spaces_loaded(self, switched: bool) -> bool:
+            self._populate_spaces()
+            if switched:
+                self._refreshing = False
+                self._use_space(self._spaces.current)
+            return False
+
+        def _on_space_row_selected(self, _list: Gtk.ListBox, row: Gtk.ListBoxRow | None) -> None:
+            if row is None or self._populating_spaces or row.space_id == self._spaces.current_id:
+                return
+            self._use_space(self._spaces.select(row.space_id))
+
+        def _use_space(self, data: Any) -> None:
+            """Show another space: paint what is resident or cached, then revalidate."""
+            self.sync_engine = data.engine
+            self.log_store = data.store
+            app = self.get_application()
+            if hasattr(app, "on_space_changed"):
+                app.on_space_changed()
+            self._current_month = None
+            self._refreshing = False
+            self._on_logs_loaded(not self.sync_engine.online)
+            self.refresh()
+
+        def _build_zone_popover(self) -> Gtk.Popover:
+            """Searchable zone picker; the first entry follows the system zone."""
+            self._zone_names = [None] + zone_names()
+            labels = ["System"] + self._zone_names[1:]
+            dropdown = Gtk.DropDown.new_from_strings(labels)
+            dropdown.set_enable_search(True)
+            dropdown.set_expression(Gtk.PropertyExpression.new(Gtk.StringObject, None, "string"))
+            if self._tz.zone_name in self._zone_names:
+                dropdown.set_selected(self._zone_names.index(self._tz.zone_name))
+            dropdown.connect("notify::selected", self._on_zone_selected)
+            popover = Gtk.Popover()
+            popover.set_child(dropdown)
+            return popover
+
+        def _on_zone_selected(self, dropdown: Gtk.DropDown, _pspec) -> None:
+            name = self._zone_names[dropdown.get_selected()]
+            if name != self._tz.zone_name:
+                self._tz.set_zone(name, persist=True)
+
+        def _on_zone_changed(self) -> None:
+            # Day and month buckets depend on the zone: re-partition from disk.
+            self._tz_btn.set_tooltip_text(f"Time zone: {self._tz.label}")
+            for data in self._spaces.loaded() if self._spaces is not None else ():
+                data.store.clear()
+            if self.log_store is not None:
+                self.log_store.clear()
+            if self._current_month is not None:
+                self._build_grid()
+                self._refresh_year()
+
         def on_logout(self, _btn: Gtk.Button) -> None:
-            from .login_window import LoginWindow  # local import
             self.user_store.sign_out()
-            win = LoginWindow(application=self.get_application())
+            self._back_to_login()
+
+        def _back_to_login(self) -> None:
+            from .login_window import LoginWindow  # local import
+            _snapshot.discard()
+            if self._spaces is not None:
+                self._spaces.clear()
+            if self.sync_engine is not None:
+                self.sync_engine.cache.clear()
+                self.sync_engine.trim()
+                self.log_store.clear()
+            app = self.get_application()
+            if getattr(app, "main_window", None) is self:
+                app.main_window = None
+            feed = getattr(app, "change_feed", None)
+            if feed is not None:
+                feed.stop()
+            win = LoginWindow(application=app)
             win.present()
-            self.close()
+            self.destroy()
 
         def refresh(self) -> None:
-            """Fetch logs from API and rebuild the grid."""
+            """Fetch logs (from the API, or the cache when offline) off the UI
+            thread and rebuild the grid when they arrive."""
             token = getattr(self.user_store, "token", None)
-            if not token:
-                return
-            from ..services import api_client
+            if not token or self._refreshing or self.log_store is None:
+                return  # without a store yet, attaching it refreshes
+            self._refreshing = True
+            run_in_background(self._fetch_logs, self.sync_engine, self.log_store, name="refresh")
+
+        def _fetch_logs(self, engine: Any, store: Any) -> None:
+            sign_out = lambda: on_main_thread(self._handle_sign_out)  # noqa: E731
+            if not self._spaces_loaded:
+                # First refresh: the space list decides which space to show.
+                self._spaces_loaded = True
+                self._spaces.load_spaces(sign_out=sign_out)
+                if self._spaces.current.store is not store:
+                    on_main_thread(self._on_spaces_loaded, True)
+                    return
+                on_main_thread(self._on_spaces_loaded, False)
             try:
-                logs = api_client.get_worklogs(token, sign_out=self._handle_sign_out) or []
-            except Exception:
+                logs, offline = engine.fetch_worklogs(sign_out=sign_out)
+                if not isinstance(logs, Iterable):
+                    raise TypeError("unexpected worklogs payload")
+                store.replace(logs)
+                # Render the month about to be shown here rather than on map.
+                month = self._current_month or store.newest_month()
+                if month is not None:
+                    prerender(rec["content"] for rec in store.month(month))
+            except Exception as exc:
+                _log.exception("refreshing logs failed")
+                telemetry.record_error("main_window.refresh", exc)
+                on_main_thread(self._on_logs_fetch_failed, store)
                 return
-
-            if not isinstance(logs, Iterable):
-                return
-
-            self._logs = list(logs)
+            on_main_thread(self._on_logs_loaded, offline, store)
+            if not self._spaces_warmed:
+                # The selected space is shown; load the others in the background.
+                self._spaces_warmed = True
+                self._spaces.warm_others()
+
+        def _on_logs_fetch_failed(self, store: Any = None) -> bool:
+            if store is None or store is self.log_store:
+                self._refreshing = False
+            return False
+
+        def _on_logs_loaded(self, offline: bool, store: Any = None) -> bool:
+            if store is not None and store is not self.log_store:
+                return False  # a space switched away from meanwhile
+            self._refreshing = False
+            self._offline_lbl.set_visible(offline)
 
             if self._current_month is None:
-                self._current_month = self._get_newest_month(self._logs)
+                newest = self.log_store.newest_month()
+                self._current_month = newest or _dt.date.today().replace(day=1)
 
             self._build_grid()
+            self._refresh_year()
+            return False
+
+        @staticmethod
+        def _record_date(rec: Mapping[str, Any]) -> _dt.date:
+            return record_date(rec) or _dt.date.today()
 
-        def _get_newest_month(self, logs: Iterable[Mapping[str, Any]]) -> _dt.date:
-            newest: _dt.date | None = None
-            for rec in logs:
-                rt = rec.get("record_time")
-                if not rt:
-                    continue
-                s = str(rt)
-                try:
-                    dt = _dt.datetime.fromisoformat(s.replace("Z", "+00:00"))
-                except Exception:
-                    try:
-                        dt = _dt.datetime.fromisoformat(s[:19])
-                    except Exception:
-                        continue
-                d = dt.date()
-                if newest is None or d > newest:
-                    newest = d
-            if newest is None:
-                newest = _dt.date.today()
-            return newest.replace(day=1)
-
-        def _build_grid(self) -> None:
-            groups: dict[_dt.date, list[Mapping[str, Any]]] = defaultdict(list)
-            for rec in self._logs:
-                rt = rec.get("record_time")
-                if rt:
-                    s = str(rt)
-                    try:
-                        dt = _dt.datetime.fromisoformat(s.replace("Z", "+00:00"))
-                        d = dt.date()
-                    except Exception:
-                        try:
-                            d = _dt.date.fromisoformat(s[:10])
-                        except Exception:
-                            d = _dt.date.today()
-                else:
-                    d = _dt.date.today()
-                if (
-                    d.year == self._current_month.year
-                    and d.month == self._current_month.month
-                ):
-                    groups[d].append(rec)
+        def _build_grid(self, records: list | None = None) -> None:
+            if records is None:
+                if self.log_store is None:
+                    self._attach_current_space()  # navigated before the first frame
+                records = self.log_store.month(self._current_month)
+            groups = group_by_day(records)
 
             child = self._flow.get_first_child()
             while child:
@@ -184,11 +446,171 @@ if GTK_AVAILABLE:
                 child = next_child
 
             from .day_card import DayCard  # local import
-            get_token = (lambda: getattr(self.user_store, "token", None))
+            self._cards = {}
+            self._row_cards = {}
             for d in sorted(groups.keys(), reverse=True):
-                self._flow.append(DayCard(d, groups[d], get_token=get_token))
-
-            self._month_lbl.set_text(self._current_month.strftime("%b %Y"))
+                card = DayCard(d, groups[d], sync_engine=self.sync_engine)
+                self._cards[d] = card
+                self._flow.append(card)
+                for rec in groups[d]:
+                    self._row_cards[str(rec["id"])] = card
+
+            self._tag_index = TagIndex(records)
+            self._visible_mask = self._tag_index.all  # every row starts visible
+            self._apply_tag_filter()
+
+            if not self._in_year_view():
+                self._month_lbl.set_text(self._current_month.strftime("%b %Y"))
+
+        def add_local_log(self, rec: Mapping[str, Any]) -> None:
+            """Show a just-created log in its DayCard without rebuilding the grid."""
+            if self.log_store is None:
+                self._attach_current_space()
+            self.log_store.add(rec)
+            d = self._record_date(rec)
+            if self._current_month != d.replace(day=1):
+                self._current_month = d.replace(day=1)
+                self._build_grid()
+                return
+            self._show_log(rec, d)
+
+        def _show_log(self, rec: Mapping[str, Any], d: _dt.date) -> None:
+            card = self._cards.get(d)
+            if card is not None:
+                card.add_log(rec)
+            else:
+                from .day_card import DayCard  # local import
+                card = DayCard(d, [rec], sync_engine=self.sync_engine)
+                position = sum(1 for other in self._cards if other > d)
+                self._flow.insert(card, position)
+                self._cards[d] = card
+            self._index_log(rec, card)
+
+        def apply_change(self, change: Any) -> bool:
+            """Reflect a server-pushed change (already in the log store) in the grid."""
+            rec = change.record
+            d = self._record_date(rec) if rec is not None else None
+            self._refresh_year()
+            self._tag_index.remove(change.worklog_id)
+            self._row_cards.pop(str(change.worklog_id), None)
+            for day, card in list(self._cards.items()):
+                if day == d and card.update_log(rec):
+                    self._index_log(rec, card)
+                    return False
+                if card.remove_log(change.worklog_id) and card.is_empty():
+                    self._flow.remove(card)
+                    del self._cards[day]
+            if d is not None and self._current_month == d.replace(day=1):
+                self._show_log(rec, d)
+            return False
+
+        def _on_fab_clicked(self, _btn: Gtk.Button) -> None:
+            app = self.get_application()
+            if app is not None:
+                app.activate_action("quick-add", None)
+
+        # ── Tag filter ───────────────────────────────────────────────────
+        def _index_log(self, rec: Mapping[str, Any], card: Any) -> None:
+            worklog_id = str(rec["id"])
+            self._tag_index.add(rec)
+            self._row_cards[worklog_id] = card
+            self._visible_mask = self._tag_index.mask(self._tag_filter)
+            card.set_log_visible(worklog_id, self._tag_index.matches(worklog_id, self._visible_mask))
+
+        def _apply_tag_filter(self) -> None:
+            """Show the filtered set, touching only rows whose visibility changes."""
+            mask = self._tag_index.mask(self._tag_filter)
+            for worklog_id in self._tag_index.ids(self._visible_mask ^ mask):
+                card = self._row_cards.get(worklog_id)
+                if card is not None:
+                    card.set_log_visible(worklog_id, bool(self._tag_index.matches(worklog_id, mask)))
+            self._visible_mask = mask
+            if self._tag_filter.active:
+                self._tag_btn.add_css_class("accent")
+            else:
+                self._tag_btn.remove_css_class("accent")
+
+        def _set_tag_filter(self, tag_filter: TagFilter) -> None:
+            if tag_filter != self._tag_filter:
+                self._tag_filter = tag_filter
+                self._apply_tag_filter()
+
+        def _on_tag_popover_show(self, popover: Gtk.Popover) -> None:
+            """List this month's tags: one 只看 (include) choice, any number of 排除."""
+            counts = dict(self._tag_index.tags())
+            tags = sorted(set(counts) | self._tag_filter.exclude
+                          | ({self._tag_filter.include} - {None}))
+            grid = Gtk.Grid(column_spacing=12, row_spacing=4)
+            for margin in ("top", "bottom", "start", "end"):
+                getattr(grid, f"set_margin_{margin}")(8)
+            grid.attach(Gtk.Label(label="只看", css_classes=["dim-label"]), 1, 0, 1, 1)
+            grid.attach(Gtk.Label(label="排除", css_classes=["dim-label"]), 2, 0, 1, 1)
+
+            everything = Gtk.CheckButton(label="All")
+            everything.set_active(self._tag_filter.include is None)
+            everything.connect("toggled", self._on_include_toggled, None)
+            grid.attach(everything, 0, 1, 2, 1)
+            for row, tag in enumerate(tags, start=2):
+                grid.attach(Gtk.Label(label=f"{tag} ({counts.get(tag, 0)})", xalign=0), 0, row, 1, 1)
+                include = Gtk.CheckButton(group=everything)
+                include.set_active(self._tag_filter.include == tag)
+                include.connect("toggled", self._on_include_toggled, tag)
+                grid.attach(include, 1, row, 1, 1)
+                exclude = Gtk.CheckButton()
+                exclude.set_active(tag in self._tag_filter.exclude)
+                exclude.connect("toggled", self._on_exclude_toggled, tag)
+                grid.attach(exclude, 2, row, 1, 1)
+            if not tags:
+                grid.attach(Gtk.Label(label="No tags this month", css_classes=["dim-label"]), 0, 2, 3, 1)
+            popover.set_child(grid)
+
+        def _on_include_toggled(self, button: Gtk.CheckButton, tag: str | None) -> None:
+            if button.get_active():
+                self._set_tag_filter(TagFilter(tag, self._tag_filter.exclude))
+
+        def _on_exclude_toggled(self, button: Gtk.CheckButton, tag: str) -> None:
+            exclude = set(self._tag_filter.exclude)
+            if button.get_active():
+                exclude.add(tag)
+            else:
+                exclude.discard(tag)
+            self._set_tag_filter(TagFilter(self._tag_filter.include, frozenset(exclude)))
+
+        # ── Year view ────────────────────────────────────────────────────
+        def _in_year_view(self) -> bool:
+            return self._stack.get_visible_child_name() == "year"
+
+        def _on_view_changed(self, _stack, _pspec) -> None:
+            if self._current_month is None:
+                self._current_month = _dt.date.today().replace(day=1)
+            if self._in_year_view():
+                self._refresh_year()
+            else:
+                self._build_grid()
+
+        def _refresh_year(self) -> None:
+            """Recount the shown year from the cache's aggregates off the UI thread."""
+            if self._current_month is None or not self._in_year_view():
+                return
+            year = self._current_month.year
+            self._month_lbl.set_text(str(year))
+            self._year_generation += 1
+            generation = self._year_generation
+            if self.log_store is None:
+                return  # counted once the store is attached
+            run_in_background(
+                self.log_store.year_summary, year, name="year_summary",
+                on_done=lambda summary: self._on_year_loaded(summary, generation),
+            )
+
+        def _on_year_loaded(self, summary: Any, generation: int) -> bool:
+            if generation == self._year_generation:  # ignore superseded counts
+                self._year_view.set_summary(summary)
+            return False
+
+        def _open_month(self, month: _dt.date) -> None:
+            self._current_month = month
+            self._stack.set_visible_child_name("month")  # rebuilds the grid
 
         def _shift_month(self, delta: int) -> None:
             if self._current_month is None:
@@ -205,17 +627,29 @@ if GTK_AVAILABLE:
             self._build_grid()
 
         def _on_prev_month(self, _btn: Gtk.Button) -> None:
-            self._shift_month(-1)
+            if self._in_year_view():
+                self._shift_year(-1)
+            else:
+                self._shift_month(-1)
 
         def _on_next_month(self, _btn: Gtk.Button) -> None:
-            self._shift_month(1)
+            if self._in_year_view():
+                self._shift_year(1)
+            else:
+                self._shift_month(1)
 
-        def _handle_sign_out(self) -> None:
-            from .login_window import LoginWindow  # local import
+        def _shift_year(self, delta: int) -> None:
+            if self._current_month is None:
+                self._current_month = _dt.date.today().replace(day=1)
+            self._current_month = self._current_month.replace(year=self._current_month.year + delta)
+            self._refresh_year()
+
+        def _handle_sign_out(self) -> bool:
+            if self.get_application() is None:
+                return False  # already gone back to the login window
             self.user_store.sign_out()
-            win = LoginWindow(application=self.get_application())
-            win.present()
-            self.close()
+            self._back_to_login()
+            return False
 
 else:  # pragma: no cover
     class MainWindow:  # type: ignore[misc]
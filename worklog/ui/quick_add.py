@@ -0,0 +1,111 @@
+"""Quick-add window for logging a new entry (FAB / ``Ctrl+Alt+L``)."""
+
+import logging
+import time
+from typing import Any, Callable, Mapping, Optional
+
+from .tasks import run_in_background
+
+try:
+    import gi
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("Gdk", "4.0")
+    gi.require_version("Pango", "1.0")
+    from gi.repository import Gdk, Gtk, Pango
+    GTK_AVAILABLE = True
+except Exception:  # pragma: no cover - gi not installed
+    Gdk = Gtk = Pango = None  # type: ignore
+    GTK_AVAILABLE = False
+
+_log = logging.getLogger(__name__)
+
+
+if GTK_AVAILABLE:
+
+    class QuickAddWindow(Gtk.Window):  # pragma: no cover - UI code
+        """Small window that writes the new log locally, then syncs in the background.
+
+        The window is built once and hidden on close so reopening it is
+        instant; the record is shown via ``on_created`` before any network
+        round-trip happens.
+        """
+
+        def __init__(
+            self,
+            sync_engine: Any,
+            on_created: Optional[Callable[[Mapping[str, Any]], None]] = None,
+            **kwargs,
+        ) -> None:
+            super().__init__(**kwargs)
+            self._sync_engine = sync_engine
+            self._on_created = on_created
+
+            self.set_title("新增紀錄")
+            self.set_default_size(420, 180)
+            self.set_hide_on_close(True)
+
+            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+            box.set_margin_top(16)
+            box.set_margin_bottom(16)
+            box.set_margin_start(16)
+            box.set_margin_end(16)
+
+            scrolled = Gtk.ScrolledWindow()
+            scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+            scrolled.set_min_content_height(100)
+            scrolled.set_vexpand(True)
+            self._textview = Gtk.TextView()
+            self._textview.set_wrap_mode(Pango.WrapMode.WORD_CHAR)
+            scrolled.set_child(self._textview)
+            box.append(scrolled)
+
+            btn_save = Gtk.Button.new_with_label("儲存")
+            btn_save.add_css_class("suggested-action")
+            btn_save.set_halign(Gtk.Align.END)
+            btn_save.connect("clicked", lambda *_: self._save())
+            box.append(btn_save)
+
+            keys = Gtk.EventControllerKey()
+            keys.connect("key-pressed", self._on_key_pressed)
+            self.add_controller(keys)
+
+            self.set_child(box)
+
+        def set_sync_engine(self, sync_engine: Any) -> None:
+            """Create logs in another space from now on."""
+            self._sync_engine = sync_engine
+
+        def open(self) -> None:
+            """Clear the editor and show the window focused."""
+            self._textview.get_buffer().set_text("")
+            self.present()
+            self._textview.grab_focus()
+
+        def _on_key_pressed(self, _ctrl, keyval, _keycode, state) -> bool:
+            if keyval == Gdk.KEY_Escape:
+                self.set_visible(False)
+                return True
+            if keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter) and state & Gdk.ModifierType.CONTROL_MASK:
+                self._save()
+                return True
+            return False
+
+        def _save(self) -> None:
+            buffer = self._textview.get_buffer()
+            start, end = buffer.get_bounds()
+            text = buffer.get_text(start, end, True).strip()
+            if not text:
+                return
+            started = time.perf_counter()
+            rec = self._sync_engine.create_worklog(text)
+            if self._on_created:
+                self._on_created(rec)
+            self.set_visible(False)
+            _log.debug("quick-add shown locally in %.1f ms", (time.perf_counter() - started) * 1000)
+            if self._sync_engine.online:
+                run_in_background(self._sync_engine.flush, name="quick_add.flush")
+
+else:
+
+    class QuickAddWindow:  # type: ignore[misc]
+        pass
@@ -0,0 +1,64 @@
+"""Background work for the UI, with results delivered on the main loop.
+
+:func:`run_in_background` submits to the app-wide executor
+(:mod:`..services.executor`) and hands the result, or the exception, to
+callbacks on the GTK main thread; :func:`on_main_thread` schedules any call
+there from a worker.  Without GLib both run the callback directly.
+"""
+
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from ..services.executor import submit
+
+try:
+    import gi
+    gi.require_version("GLib", "2.0")
+    from gi.repository import GLib
+except Exception:  # pragma: no cover - gi not installed
+    GLib = None  # type: ignore
+
+_log = logging.getLogger(__name__)
+
+
+def on_main_thread(func: Callable[..., Any], *args: Any) -> None:
+    """Call ``func(*args)`` once from the main loop; its return value is ignored."""
+    if GLib is None:
+        func(*args)
+        return
+
+    def call() -> bool:
+        try:
+            func(*args)
+        except Exception:
+            _log.exception("main-thread callback %s failed", getattr(func, "__qualname__", func))
+        return False
+
+    GLib.idle_add(call)
+
+
+def run_in_background(
+    func: Callable[..., Any],
+    *args: Any,
+    on_done: Optional[Callable[[Any], None]] = None,
+    on_error: Optional[Callable[[BaseException], None]] = None,
+    name: Optional[str] = None,
+) -> Future:
+    """Run ``func(*args)`` on the executor; ``on_done(result)`` or
+    ``on_error(exc)`` then runs on the main thread."""
+    future = submit(func, *args, name=name)
+    if on_done is not None or on_error is not None:
+
+        def deliver(done: Future) -> None:
+            if done.cancelled():
+                return
+            exc = done.exception()
+            if exc is None:
+                if on_done is not None:
+                    on_main_thread(on_done, done.result())
+            elif on_error is not None:
+                on_main_thread(on_error, exc)
+
+        future.add_done_callback(deliver)
+    return future
@@ -0,0 +1,141 @@
+"""Year view: a per-day heatmap and per-month counts (年視圖).
+
+Only a :class:`~worklog.stores.log_store.YearSummary` is needed to draw it,
+so showing a year never touches individual logs.
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+from typing import Any, Callable, Optional, Tuple
+
+try:
+    import gi
+    gi.require_version("Gtk", "4.0")
+    from gi.repository import Gtk
+    GTK_AVAILABLE = True
+except Exception:  # pragma: no cover - gi not installed
+    Gtk = None  # type: ignore
+    GTK_AVAILABLE = False
+
+_CELL = 13
+_GAP = 3
+_LEVEL_ALPHA = (0.0, 0.35, 0.55, 0.75, 1.0)
+_ACCENT = (0.21, 0.52, 0.89)  # Adwaita blue
+
+
+def heat_level(count: int, busiest: int) -> int:
+    """Bucket ``count`` into 0 (none) .. 4 (busiest quarter)."""
+    if count <= 0 or busiest <= 0:
+        return 0
+    return min(4, 1 + (4 * (count - 1)) // busiest)
+
+
+def cell_position(d: _dt.date) -> Tuple[int, int]:
+    """``(week column, weekday row)`` of ``d`` in its year's grid (Monday = row 0)."""
+    jan1 = _dt.date(d.year, 1, 1)
+    return (d.timetuple().tm_yday - 1 + jan1.weekday()) // 7, d.weekday()
+
+
+if GTK_AVAILABLE:
+
+    class YearView(Gtk.Box):  # pragma: no cover - UI code
+        def __init__(self, on_month_selected: Optional[Callable[[_dt.date], None]] = None) -> None:
+            super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=16)
+            self.set_margin_top(16)
+            self.set_margin_start(16)
+            self.set_margin_end(16)
+            self._on_month_selected = on_month_selected
+            self._summary: Any = None
+
+            self._total_lbl = Gtk.Label(xalign=0)
+            self._total_lbl.add_css_class("dim-label")
+            self.append(self._total_lbl)
+
+            self._heatmap = Gtk.DrawingArea()
+            self._heatmap.set_content_width(54 * (_CELL + _GAP))
+            self._heatmap.set_content_height(7 * (_CELL + _GAP))
+            self._heatmap.set_halign(Gtk.Align.START)
+            self._heatmap.set_draw_func(self._draw)
+            click = Gtk.GestureClick()
+            click.connect("released", self._on_click)
+            self._heatmap.add_controller(click)
+            motion = Gtk.EventControllerMotion()
+            motion.connect("motion", self._on_motion)
+            self._heatmap.add_controller(motion)
+            self.append(self._heatmap)
+
+            self._months = Gtk.FlowBox()
+            self._months.set_selection_mode(Gtk.SelectionMode.NONE)
+            self._months.set_max_children_per_line(12)
+            self._months.set_min_children_per_line(6)
+            self._month_btns = []
+            for m in range(12):
+                btn = Gtk.Button()
+                btn.add_css_class("flat")
+                btn.connect("clicked", self._on_month_clicked, m + 1)
+                self._month_btns.append(btn)
+                self._months.append(btn)
+            self.append(self._months)
+
+        def set_summary(self, summary: Any) -> None:
+            self._summary = summary
+            self._total_lbl.set_text(f"{summary.year} · {summary.total} 筆紀錄")
+            for m, btn in enumerate(self._month_btns):
+                name = _dt.date(summary.year, m + 1, 1).strftime("%b")
+                btn.set_label(f"{name}\n{summary.months[m]}")
+            self._heatmap.queue_draw()
+
+        def _draw(self, _area, cr, _width, _height) -> None:
+            summary = self._summary
+            if summary is None:
+                return
+            fg = self.get_color() if hasattr(self, "get_color") else None
+            base = (fg.red, fg.green, fg.blue) if fg is not None else (0.5, 0.5, 0.5)
+            busiest = summary.busiest_day
+            d = _dt.date(summary.year, 1, 1)
+            one_day = _dt.timedelta(days=1)
+            while d.year == summary.year:
+                col, row = cell_position(d)
+                level = heat_level(summary.days.get(d, 0), busiest)
+                if level:
+                    cr.set_source_rgba(*_ACCENT, _LEVEL_ALPHA[level])
+                else:
+                    cr.set_source_rgba(*base, 0.08)
+                cr.rectangle(col * (_CELL + _GAP), row * (_CELL + _GAP), _CELL, _CELL)
+                cr.fill()
+                d += one_day
+
+        def _date_at(self, x: float, y: float) -> Optional[_dt.date]:
+            if self._summary is None:
+                return None
+            col, row = int(x // (_CELL + _GAP)), int(y // (_CELL + _GAP))
+            if row > 6:
+                return None
+            jan1 = _dt.date(self._summary.year, 1, 1)
+            offset = col * 7 + row - jan1.weekday()
+            d = jan1 + _dt.timedelta(days=offset)
+            return d if offset >= 0 and d.year == jan1.year else None
+
+        def _on_motion(self, _ctrl, x: float, y: float) -> None:
+            d = self._date_at(x, y)
+            if d is None:
+                self._heatmap.set_tooltip_text(None)
+                return
+            count = self._summary.days.get(d, 0)
+            self._heatmap.set_tooltip_text(f"{d.isoformat()}: {count}")
+
+        def _on_click(self, _gesture, _n_press, x: float, y: float) -> None:
+            d = self._date_at(x, y)
+            if d is not None and self._on_month_selected:
+                self._on_month_selected(d.replace(day=1))
+
+        def _on_month_clicked(self, _btn, month: int) -> None:
+            if self._summary is not None and self._on_month_selected:
+                self._on_month_selected(_dt.date(self._summary.year, month, 1))
+
+else:
+
+    class YearView:  # type: ignore[misc]
+        def __init__(self, *_args, **_kwargs) -> None:
+            raise RuntimeError("GTK not available")